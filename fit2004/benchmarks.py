@@ -0,0 +1,376 @@
+"""
+Benchmarks for the assignment solutions in this folder, the solution files have spaces in their names so they are
+loaded by path rather than imported.
+
+Usage:
+    python benchmarks.py <benchmark> [arguments]
+
+    python benchmarks.py query_overhead [num_vertices] [queries]
+    python benchmarks.py priority_queues [num_vertices] [queries]
+    python benchmarks.py dynamic_updates [num_vertices] [updates]
+    python benchmarks.py max_flow [num_vertices] [degree]
+    python benchmarks.py flow_memory [num_vertices] [degree]
+    python benchmarks.py warm_start [num_vertices] [updates]
+"""
+import importlib.util
+import os
+import random
+import sys
+import time
+
+def load(filename):
+    """
+    Function description:
+        Loads one of the solution files in this folder as a module.
+
+    Input:
+        filename: the name of the file.
+
+    Output:
+        The loaded module.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+    name = os.path.splitext(filename)[0].replace(" ", "_")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+
+    # registered so worker processes can unpickle functions of the module
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+routing = load("dijsktra and dynamic programming.py")
+flow = load("network flow and tries.py")
+
+def grid_graph(width, max_weight = 20, seed = 0):
+    """
+    Function description:
+        Builds a frozen road-like test graph, a width * width grid with a random weight on each two way road.
+
+    Input:
+        width: the number of vertices along each side.
+        max_weight: the largest weight of a road.
+        seed: the seed of the random weights.
+
+    Output:
+        The CSRGraph of the grid.
+    """
+    rng = random.Random(seed)
+    graph = routing.Graph(width * width, compact = True)
+    for row in range(width):
+        for column in range(width):
+            v = row * width + column
+            if column + 1 < width:
+                graph.add_edge(v, v + 1, rng.randint(1, max_weight), directed = False)
+            if row + 1 < width:
+                graph.add_edge(v, v + width, rng.randint(1, max_weight), directed = False)
+    return graph.freeze()
+
+def timed(function, repeat):
+    """
+    Function description:
+        Runs a function a number of times.
+
+    Input:
+        function: the function to run, without arguments.
+        repeat: the number of runs.
+
+    Output:
+        The average time of a run, in seconds.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+def benchmark_query_overhead(num_vertices = 1_000_000, queries = 1000):
+    """
+    Function description:
+        Measures the fixed cost of a short query on a large graph, each query goes from a random vertex to its
+        neighbour so almost all of its time is setup. The epoch stamped search spaces are compared against
+        allocating fresh labels for every query, which is what each query used to cost.
+
+    Input:
+        num_vertices: the number of vertices of the grid.
+        queries: the number of queries timed.
+    """
+    width = int(num_vertices ** 0.5)
+    build_start = time.perf_counter()
+    graph = grid_graph(width)
+    print(f"grid of {graph.num_vertices} vertices and {graph.offsets[graph.num_vertices]} arcs built in {time.perf_counter() - build_start:.1f}s")
+
+    rng = random.Random(1)
+    pairs = []
+    for _ in range(queries):
+        source = rng.randrange(graph.num_vertices - 1)
+        pairs.append((source, source + 1))
+
+    def run_queries():
+        for source, destination in pairs:
+            graph.dijkstra(source, destination)
+
+    def run_queries_fresh():
+        for source, destination in pairs:
+            graph.spaces = []
+            graph.dijkstra(source, destination)
+
+    stamped = timed(run_queries, 1) / queries
+    fresh = timed(run_queries_fresh, 1) / queries
+    print(f"epoch stamped search space: {stamped * 1e6:10.1f} us per query")
+    print(f"fresh labels per query:     {fresh * 1e6:10.1f} us per query")
+
+def random_graph(num_vertices, degree, max_weight, seed = 0):
+    """
+    Function description:
+        Builds a frozen random graph, every vertex gets degree arcs to random vertices with weights from 1 to max_weight.
+
+    Input:
+        num_vertices: the number of vertices.
+        degree: the number of arcs leaving each vertex.
+        max_weight: the largest weight of an arc.
+        seed: the seed of the random arcs.
+
+    Output:
+        The CSRGraph.
+    """
+    rng = random.Random(seed)
+    graph = routing.Graph(num_vertices, compact = True)
+    for u in range(num_vertices):
+        for _ in range(degree):
+            graph.add_edge(u, rng.randrange(num_vertices), rng.randint(1, max_weight))
+    return graph.freeze()
+
+def benchmark_priority_queues(num_vertices = 20_000, queries = 5):
+    """
+    Function description:
+        Times a one to all search with each priority queue backend, sweeping the edge density with the weight range
+        fixed to road-like times, then the weight range with the density fixed, every backend searches from the
+        same sources and the distances are checked against the lazy heap.
+
+    Input:
+        num_vertices: the number of vertices of each random graph.
+        queries: the number of sources timed per graph.
+    """
+    queues = [routing.LazyHeapQueue, routing.IndexedHeapQueue, routing.BucketQueue, routing.PairingHeapQueue]
+    sweeps = [("degree", degree, 100) for degree in (2, 4, 8, 16)]
+    sweeps += [("max weight", 4, max_weight) for max_weight in (10, 1_000, 100_000)]
+
+    print(f"{'sweep':>16}" + "".join(f"{queue.__name__:>18}" for queue in queues))
+    for label, degree, max_weight in sweeps:
+        graph = random_graph(num_vertices, degree, max_weight)
+        sources = random.Random(1).sample(range(num_vertices), queries)
+        expected = [graph.dijkstra_many(source, []).all_distances() for source in sources]
+
+        row = f"{label:>10} {degree if label == 'degree' else max_weight:>5}"
+        for queue in queues:
+            for source, distances in zip(sources, expected):
+                assert graph.dijkstra_many(source, [], queue).all_distances() == distances
+
+            def run_queries():
+                for source in sources:
+                    graph.dijkstra_many(source, [], queue)
+
+            row += f"{timed(run_queries, 1) / queries * 1e3:>15.1f} ms"
+        print(row)
+
+def benchmark_dynamic_updates(num_vertices = 250_000, updates = 200):
+    """
+    Function description:
+        Compares repairing a shortest path tree after a road weight change with recomputing it, on a road-like grid.
+        Each update moves a random road to a random new travel time, like a traffic update, and the repaired tree is
+        checked against a full recomputation at the end.
+
+    Input:
+        num_vertices: the number of vertices of the grid.
+        updates: the number of weight changes timed.
+    """
+    width = int(num_vertices ** 0.5)
+    graph = grid_graph(width)
+    tree = graph.shortest_path_tree(graph.num_vertices // 2)
+
+    rng = random.Random(2)
+    changes = []
+    for _ in range(updates):
+        u = rng.randrange(graph.num_vertices)
+        arc = rng.randrange(graph.offsets[u], graph.offsets[u + 1])
+        changes.append((u, graph.targets[arc], rng.randint(1, 20)))
+
+    changed = 0
+    start = time.perf_counter()
+    for u, v, weight in changes:
+        changed += graph.set_weight(u, v, weight)
+    repair = (time.perf_counter() - start) / updates
+
+    assert tree.all_distances() == graph.dijkstra_many(tree.source, []).all_distances()
+    recompute = timed(tree.recompute, 3)
+
+    print(f"grid of {graph.num_vertices} vertices, {changed / updates:.1f} distances changed per update on average")
+    print(f"repair after one update: {repair * 1e3:10.3f} ms")
+    print(f"full recomputation:      {recompute * 1e3:10.3f} ms")
+
+def random_flow_network(num_vertices, degree, seed = 0):
+    """
+    Function description:
+        Builds a random maxThroughput instance, every data centre gets degree links to random other data centres, the
+        origin is data centre 0 with links to a tenth of the rest so that it is not the bottleneck, and another tenth are
+        targets.
+
+    Input:
+        num_vertices: the number of data centres.
+        degree: the number of links leaving each data centre.
+        seed: the seed of the random links and capacities.
+
+    Output:
+        The connections, maxIn, maxOut, origin and targets arguments of maxThroughput.
+    """
+    rng = random.Random(seed)
+    connections = []
+    for u in range(num_vertices):
+        links = max(degree, num_vertices // 10) if u == 0 else degree
+        for v in rng.sample(range(1, num_vertices), links):
+            if v != u:
+                connections.append((u, v, rng.randint(1, 100)))
+    maxIn = [rng.randint(100, 1000) for _ in range(num_vertices)]
+    maxOut = [rng.randint(100, 1000) for _ in range(num_vertices)]
+    maxOut[0] = 100 * num_vertices
+    targets = rng.sample(range(1, num_vertices), max(1, num_vertices // 10))
+    return connections, maxIn, maxOut, 0, targets
+
+def benchmark_max_flow(num_vertices = 2000, degree = 8):
+    """
+    Function description:
+        Times maxThroughput with each max flow algorithm on random networks of growing size up to num_vertices data
+        centres, every algorithm solves the same network and its throughput is checked against the reference solution on
+        NetworkEdge objects.
+
+    Input:
+        num_vertices: the number of data centres of the largest network.
+        degree: the number of links leaving each data centre.
+    """
+    algorithms = ["reference", "ford_fulkerson", "dinic", "push_relabel", "push_relabel_fifo"]
+
+    print(f"{'data centres':>12}{'throughput':>12}" + "".join(f"{algorithm:>20}" for algorithm in algorithms))
+    for size in (num_vertices // 8, num_vertices // 4, num_vertices // 2, num_vertices):
+        network = random_flow_network(max(size, degree + 2), degree, seed = size)
+        expected = flow.maxThroughput(*network, algorithm = "reference")
+
+        row = f"{len(network[1]):>12}{expected:>12}"
+        for algorithm in algorithms:
+            assert flow.maxThroughput(*network, algorithm = algorithm) == expected
+            row += f"{timed(lambda: flow.maxThroughput(*network, algorithm = algorithm), 1) * 1e3:>17.1f} ms"
+        print(row)
+
+def object_size(instance):
+    """
+    Function description:
+        Measures the memory of an object along with its attribute dictionary, the attribute values are not counted.
+
+    Input:
+        instance: the object.
+
+    Output:
+        The number of bytes.
+    """
+    return sys.getsizeof(instance) + sys.getsizeof(instance.__dict__)
+
+def benchmark_flow_memory(num_vertices = 1000, degree = 8):
+    """
+    Function description:
+        Compares the size, the memory per arc and the Ford-Fulkerson time of the NetworkEdge based ResidualNetwork with
+        the flat, two way split FlowNetwork of the same random maxThroughput instance, every backward edge counts as an arc
+        in both.
+
+    Input:
+        num_vertices: the number of data centres.
+        degree: the number of links leaving each data centre.
+    """
+    connections, maxIn, maxOut, origin, targets = random_flow_network(num_vertices, degree)
+
+    network = flow.ResidualNetwork(len(maxIn))
+    network.split_vertex(maxIn, maxOut)
+    network.create_network(connections, is_residual = True)
+    network.create_super_sink(targets)
+    network.create_super_source(origin, maxOut)
+
+    arcs = sum(len(vertex.edges) for vertex in network.vertices)
+    objects = sys.getsizeof(network.vertices)
+    for vertex in network.vertices:
+        objects += object_size(vertex) + sys.getsizeof(vertex.edges)
+        for edge in vertex.edges:
+            objects += object_size(edge)
+
+    flat = flow.build_flow_network(connections, maxIn, maxOut, origin, targets)
+    total, per_arc = flat.memory()
+
+    start = time.perf_counter()
+    expected = network.ford_fulkerson(network.super_source, network.super_sink)
+    objects_time = time.perf_counter() - start
+    start = time.perf_counter()
+    assert flat.ford_fulkerson(flat.super_source, flat.super_sink) == expected
+    flat_time = time.perf_counter() - start
+
+    print(f"NetworkEdge objects: {len(network.vertices):>8} vertices {arcs:>8} arcs {objects / arcs:8.1f} bytes per arc, "
+          f"ford_fulkerson {objects_time * 1e3:8.1f} ms")
+    print(f"FlowNetwork arrays:  {flat.num_vertices:>8} vertices {len(flat.heads):>8} arcs {per_arc:8.1f} bytes per arc, "
+          f"ford_fulkerson {flat_time * 1e3:8.1f} ms")
+
+def benchmark_warm_start(num_vertices = 2000, updates = 200):
+    """
+    Function description:
+        Compares updating the throughput of a ThroughputNetwork after a capacity change with solving maxThroughput again
+        with Dinic's algorithm. Each update moves a random connection, maxIn or maxOut to a random new capacity, half of
+        them up and half down, and the throughput is checked against a cold solve every tenth update.
+
+    Input:
+        num_vertices: the number of data centres.
+        updates: the number of capacity changes timed.
+    """
+    connections, maxIn, maxOut, origin, targets = random_flow_network(num_vertices, 8)
+    network = flow.ThroughputNetwork(connections, maxIn, maxOut, origin, targets)
+
+    rng = random.Random(3)
+    warm = 0
+    cold = 0
+    for update in range(updates):
+        kind = rng.randrange(3)
+        if kind == 0:
+            index = rng.randrange(len(connections))
+            u, v, capacity = connections[index]
+            connections[index] = (u, v, max(0, capacity + rng.choice((-1, 1)) * rng.randint(1, 50)))
+            start = time.perf_counter()
+            throughput = network.set_connection(index, connections[index][2])
+        else:
+            limits = maxIn if kind == 1 else maxOut
+            vertex = rng.randrange(num_vertices)
+            limits[vertex] = max(0, limits[vertex] + rng.choice((-1, 1)) * rng.randint(1, 500))
+            start = time.perf_counter()
+            if kind == 1:
+                throughput = network.set_max_in(vertex, limits[vertex])
+            else:
+                throughput = network.set_max_out(vertex, limits[vertex])
+        warm += time.perf_counter() - start
+
+        if update % 10 == 0:
+            start = time.perf_counter()
+            assert throughput == flow.maxThroughput(connections, maxIn, maxOut, origin, targets, algorithm = "dinic")
+            cold += time.perf_counter() - start
+
+    print(f"{num_vertices} data centres, throughput {network.throughput} after {updates} updates")
+    print(f"warm update: {warm / updates * 1e3:10.3f} ms")
+    print(f"cold solve:  {cold / len(range(0, updates, 10)) * 1e3:10.3f} ms")
+
+benchmarks = {
+    "query_overhead": benchmark_query_overhead,
+    "priority_queues": benchmark_priority_queues,
+    "dynamic_updates": benchmark_dynamic_updates,
+    "max_flow": benchmark_max_flow,
+    "flow_memory": benchmark_flow_memory,
+    "warm_start": benchmark_warm_start,
+}
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in benchmarks:
+        print(__doc__)
+        sys.exit(1)
+
+    benchmarks[sys.argv[1]](*[int(argument) for argument in sys.argv[2:]])
@@ -1,4 +1,20 @@
 import heapq
+import mmap
+import os
+import struct
+import time
+import weakref
+from abc import ABC, abstractmethod
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+# numpy is only needed for the travel time matrices of RoutePlanner.travel_times and for select_sections_numpy,
+# select_sections_stacked and select_sections_batch
+try:
+    import numpy as np
+except ImportError:
+    np = None
 """
 Last modified: 28/04/2023
 Version: Final
@@ -57,7 +73,6 @@ class Vertex():
         :Attributes:
             id (int): unique id for a vertex.
             edges (List[Edge]): A list of edges connected to the vertex.
-            previous (Vertex): The previous vertex in the path, used in graph traversal algorithms.
             discovered (bool): A boolean flag indicating if the vertex has been discovered.
             visited (bool): A boolean flag indicating if the vertex has been visited.
             distance (int): The distance from the starting vertex in a graph traversal algorithm.
@@ -70,7 +85,6 @@ class Vertex():
         """
         self.id = id
         self.edges = []
-        self.previous = None
         self.discovered = False
         self.visited = False
         self.distance = 0
@@ -126,7 +140,7 @@ class Vertex():
     def reset_vertex(self) -> None:
         """
         Function description:
-            Resets the vertex's discovered, visited, and previous properties.
+            Resets the vertex's discovered and visited properties.
 
         :Output:
             None
@@ -139,7 +153,6 @@ class Vertex():
         """
         self.discovered = False
         self.visited = False
-        self.previous = None
     
     def __str__(self) -> str:
         """
@@ -158,19 +171,26 @@ class Vertex():
         edges_str = "\n with edges: ".join(str(edge) for edge in self.edges)
         return f'{self.id}\n with edges: {edges_str}' if edges_str else f'{self.id}'
 
-class Graph():
+class SearchSpace():
     def __init__(self, num_vertices) -> None:
         """
         Function description:
-            Constructor for Graph.
-            
-            This uses an adjacency list representation.
+            Constructor for SearchSpace, the per vertex labels of a search, reused from one search to the next.
+
+            Instead of clearing every label before a search, each search gets a new epoch number and a label
+            only counts if its stamp equals the current epoch, so starting a search costs O(1) and a search
+            only ever writes to the vertices it touches.
 
         :Input:
             num_vertices (int): The number of vertices in the graph.
 
         :Attributes:
-            vertices: A list of vertices in the graph.
+            epoch: The number of the current search.
+            labelled: The epoch in which each vertex last got a distance.
+            settled: The epoch in which each vertex was last settled.
+            distances: The distance of each vertex, only valid if it is labelled in the current epoch.
+            previous: The predecessor of each vertex, only valid if it is labelled in the current epoch.
+            owner: Weak reference to the ShortestPaths still reading the labels, None if there is none.
 
         :Time complexity:
             O(n) where n is the number of vertices
@@ -178,323 +198,5067 @@ class Graph():
         :Aux space complexity:
             O(n) where n is the number of vertices
         """
-        self.vertices = [None] * num_vertices
-
-        for i in range(num_vertices):
-            self.vertices[i] = Vertex(i)
+        self.epoch = 0
+        self.labelled = array('I', [0]) * num_vertices
+        self.settled = array('I', [0]) * num_vertices
+        self.distances = [0] * num_vertices
+        self.previous = array('i', [-1]) * num_vertices
+        self.owner = None
 
-    def reset(self) -> None:
+    def is_free(self) -> bool:
         """
         Function description:
-            Resets the vertices to its original state.
+            Checks no ShortestPaths is still reading the labels, so the space can be used by a new search.
+
+        :Output:
+            True if the space is free, False otherwise.
 
         :Time complexity:
-            O(n) where n is the number of vertices in self.vertices.
+            O(1)
 
         :Aux space complexity:
             O(1)
         """
-        for vertex in self.vertices:
-            vertex.reset_vertex()
+        return self.owner is None or self.owner() is None
 
-    def add_edge(self, u, v, w, directed = True) -> None:
+    def begin(self) -> int:
         """
         Function description:
-            Adds an edge.
+            Starts a new search, which invalidates every label of the previous one.
+
+        :Output:
+            The epoch of the new search.
 
-        :Input:
-            u (Vertex): source vertex of the edge.
-            v (Vertex): destination vertex of the edge.
-            w (int): weight of the edge, which in this case is the time.
-            directed (bool): indicates if the edge is directed or undirected,
-                             if undirected, adds edges to and from vertexes.
-        
         :Time complexity:
-            O(1)
+            O(1), O(n) once every 2^32 searches when the stamps wrap around and are cleared
 
         :Aux space complexity:
             O(1)
         """
-        current_edge = Edge(u, v, w)
-        current_vertex = self.vertices[u]
-        current_vertex.append_edge(current_edge)
+        if self.epoch == 0xFFFFFFFF:
+            for i in range(len(self.labelled)):
+                self.labelled[i] = 0
+                self.settled[i] = 0
+            self.epoch = 0
 
-        if directed == False:
-            current_edge = Edge(v, u, w)
-            current_vertex = self.vertices[v]
-            current_vertex.append_edge(current_edge)
+        self.epoch += 1
+        return self.epoch
 
-    def build_path(self, vertex) -> list:
+    def distance(self, vertex):
         """
         Function description:
-            Builds the path from the starting vertex to the given vertex.
+            Returns the distance of a vertex in the current search.
 
         :Input:
-            vertex (Vertex): The destination vertex.
+            vertex (int): The vertex.
 
         :Output:
-            A list containing the path from the starting vertex to the given vertex.
+            The distance of the vertex, inf if the current search has not reached it.
 
         :Time complexity:
-            O(n) where n is the number of vertices in the path.
+            O(1)
 
         :Aux space complexity:
-            O(n) where n is the number of vertices in the path.
+            O(1)
         """
-        path = []
-        while vertex is not None:
-            path.append(vertex)
-            vertex = self.vertices[vertex].previous
+        if self.labelled[vertex] != self.epoch:
+            return float('inf')
+        return self.distances[vertex]
 
-        reversed_path = []
-        for i in range(len(path) - 1, -1, -1):
-            reversed_path.append(path[i])
+class ShortestPaths():
+    def __init__(self, graph, source, space, epoch, distances) -> None:
+        """
+        Function description:
+            Constructor for ShortestPaths, the result of a search from one source to many destinations.
 
-        return reversed_path
+            The paths are built from the predecessors in the search space when asked for, the space is not
+            reused by another search for as long as this object is alive.
 
-    def dijkstra(self, source, destination):
+        :Input:
+            graph (CSRGraph): The graph that was searched.
+            source (int): The starting vertex of the search.
+            space (SearchSpace): The search space holding the labels of the search.
+            epoch (int): The epoch of the search.
+            distances (dict): The distance of each destination.
+
+        :Attributes:
+            graph: The graph that was searched.
+            source: The starting vertex of the search.
+            space: The search space holding the labels of the search.
+            epoch: The epoch of the search.
+            distances: The distance of each destination.
+            paths: The paths built so far, keyed by their destination.
+
+        :Time complexity:
+            O(1)
+
+        :Aux space complexity:
+            O(1)
+        """
+        self.graph = graph
+        self.source = source
+        self.space = space
+        self.epoch = epoch
+        self.distances = distances
+        self.paths = {}
+
+    def distance(self, vertex):
         """
         Function description:
-            Dijkstra's algorithm to find the shortest path between the source and destination vertices.
+            Returns the shortest path distance from the source to the given vertex, after a search with no
+            destinations any vertex can be asked for.
 
         :Input:
-            source (int): The starting vertex.
-            destination (int): The ending vertex.
+            vertex (int): A destination of the search.
 
         :Output:
-            A tuple containing the shortest path distance and the path as a list of vertex indices.
+            The shortest path distance, inf if the vertex cannot be reached.
 
         :Time complexity:
-            O((|V| + |E|) * log|V|) where |V| is the number of vertices and |E| is the number of edges in the graph.
+            O(1)
 
         :Aux space complexity:
-            O(|V|) where |V| is the number of vertices in the graph.
+            O(1)
         """
-        # reset the vertices to their initial state
-        self.reset()
-
-        # initialize the distance list and set the distance of the source vertex to 0
-        vertex_distances = [float('inf')] * len(self.vertices)
-        vertex_distances[source] = 0
+        if vertex in self.distances:
+            return self.distances[vertex]
+        return self.space.distance(vertex)
 
-        # create a priority queue and add the source vertex with distance 0
-        priority_queue = [(0, source)]
-        self.vertices[source].discover_vertex()
+    def all_distances(self) -> list:
+        """
+        Function description:
+            Returns the distance of every vertex.
 
-        # process vertices in the priority queue until it's empty
-        while priority_queue:
-            # get the vertex with the smallest distance from the priority queue
-            current_distance, current_vertex_id = heapq.heappop(priority_queue)
+        :Output:
+            A list with the distance of each vertex, inf for the vertices the search did not reach.
 
-            # skip the vertex if it has been visited already
-            if self.vertices[current_vertex_id].visited:
-                continue
+        :Time complexity:
+            O(|V|) where |V| is the number of vertices in the graph.
 
-            # mark the current vertex as visited and update its distance
-            self.vertices[current_vertex_id].visit_vertex()
-            vertex_distances[current_vertex_id] = current_distance
+        :Aux space complexity:
+            O(|V|) where |V| is the number of vertices in the graph.
+        """
+        return [self.space.distance(vertex) for vertex in range(self.graph.num_vertices)]
 
-            # iterate over the edges of the current vertex
-            for edge in self.vertices[current_vertex_id].edges:
-                # get the neighbor vertex id
-                neighbor_vertex_id = edge.v
-                if neighbor_vertex_id == current_vertex_id:
-                    neighbor_vertex_id = edge.u 
+    def path(self, vertex) -> list:
+        """
+        Function description:
+            Returns the shortest path from the source to the given vertex, it is built the first time it is
+            asked for and then cached.
 
-                # calculate the distance to the neighbor vertex
-                new_neighbor_distance = current_distance + edge.w
-                neighbor_vertex = self.vertices[neighbor_vertex_id]
+        :Input:
+            vertex (int): A destination of the search.
 
-                # skip the neighbor vertex if it has been visited already
-                if neighbor_vertex.visited:
-                    continue
+        :Output:
+            A list containing the path from the source to the given vertex.
 
-                # update the neighbor vertex's distance and previous vertex if the new distance is smaller
-                if new_neighbor_distance < vertex_distances[neighbor_vertex_id]:
-                    vertex_distances[neighbor_vertex_id] = new_neighbor_distance
-                    neighbor_vertex.previous = current_vertex_id
+        :Time complexity:
+            O(n) where n is the number of vertices in the path, O(1) once cached.
 
-                    # add the neighbor vertex with the updated distance to the priority queue
-                    heapq.heappush(priority_queue, (new_neighbor_distance, neighbor_vertex_id))
+        :Aux space complexity:
+            O(n) where n is the number of vertices in the path.
+        """
+        if vertex not in self.paths:
+            if self.space.labelled[vertex] != self.epoch:
+                self.paths[vertex] = [vertex]
+            else:
+                self.paths[vertex] = self.graph.build_path(self.space.previous, vertex)
+        return self.paths[vertex]
 
-        # return the shortest distance and the path to the destination vertex
-        return vertex_distances[destination], self.build_path(destination)
-    
-    def __str__(self) -> str:
+    def route(self, vertex, num_locations) -> list:
         """
         Function description:
-            Returns a string representation of the graph.
-        
+            Returns the route to the given vertex of a layered graph as locations, with the moves between layers
+            removed, built in a single walk of the predecessors, see CSRGraph.build_route.
+
+        :Input:
+            vertex (int): A destination of the search.
+            num_locations (int): The number of locations in each layer.
+
         :Output:
-            A string representing the graph in the format "vertex1, vertex2, ...".
+            A list of the locations on the route, just the location of the vertex if it cannot be reached.
 
         :Time complexity:
-            O(n) where n is the number of vertices in the graph.
+            O(n) where n is the number of vertices in the path.
 
         :Aux space complexity:
-            O(n) where n is the number of vertices in the graph.
+            O(n) where n is the number of vertices in the path.
         """
-        return "\n".join(str(vertex) for vertex in self.vertices)
-    
-def optimalRoute(start, end, passengers, roads):
+        if self.space.labelled[vertex] != self.epoch:
+            return [vertex % num_locations]
+        return self.graph.build_route(self.space.previous, vertex, num_locations)
+
+class PriorityQueue(ABC):
     """
-    Written by: faw
+    Function description:
+        Interface of the priority queues dijkstra can be run with.
 
-    Precondition:
-        start and end are integers representing the start and end vertices, passengers is a list of integers representing the passenger vertices, roads is a list of tuples (a, b, c, d) where a and b are integer vertices, c is the weight of the solo lane, and d is the weight of the carpool lane.
+        A queue is created for each search from the graph being searched, push inserts a vertex or lowers its
+        priority if it is already queued, and pop removes a vertex of smallest priority. A queue may hand back
+        stale entries for vertices that were pushed again with a lower priority, the search skips those as the
+        vertex has already been settled.
+    """
+    @abstractmethod
+    def __init__(self, graph) -> None:
+        """
+        Function description:
+            Constructor for a priority queue.
 
-    Postcondition: 
-        returns a list of vertices representing the shortest path between the start and end points.
+        :Input:
+            graph (CSRGraph): The graph being searched.
+        """
 
-    Function description: 
-        Returns the optimal route to go from the start to end with the least total travel time
+    @abstractmethod
+    def push(self, vertex, priority) -> None:
+        """
+        Function description:
+            Inserts the vertex with the given priority, or lowers its priority if it is already queued.
 
-    Approach description: 
-        By constructing a layered graph, and offseting the vertices, Dijsktra's algorithm can be run on a large graph to determine which is the most optimal route to take. Edges are added to the graph for both solo and carpool lanes, and zero-weight edges are added between non-carpool and carpool vertices for each passenger. 
+        :Input:
+            vertex (int): The vertex.
+            priority: Its priority.
+        """
 
-    Input:
-        start: integer representing the start vertex.
-        end: integer representing the end vertex.
-        passengers: list of integers representing the passenger vertices.
-        roads: list of tuples (a, b, c, d) where a and b are integer vertices, c is the weight of the solo lane, and d is the weight of the carpool lane.
+    @abstractmethod
+    def pop(self) -> tuple:
+        """
+        Function description:
+            Removes a vertex of smallest priority.
 
-    Output:
-        A list of vertices representing the shortest path between the start and end points.
+        :Output:
+            A tuple (priority, vertex).
+        """
 
-    Time complexity:
-        where r is the number of roads in the graph and l is the number of locations
+    @abstractmethod
+    def __len__(self) -> int:
+        """
+        Function description:
+            Returns the number of entries in the queue, stale ones included.
 
-        Best Case: O((r log l)) * could be cases that start == end so it would be O(1)
-        Worst Case: O((r log l)) 
+        :Output:
+            The number of entries.
+        """
 
-    Space complexity:
-        Auxiliary: O(l + r) 
-    """
-    # finds the maximum vertex among the roads to be used as the number of vertices in the graph, it does so just by iteration, then the maximum location number is incremented by 1 to account for the total number of locations, since location ids are zero based
-    max_location = 0
-    for a, b, _, _ in roads:
-        max_location = max(max_location, a, b)
-    num_locations = max_location + 1
+class LazyHeapQueue(PriorityQueue):
+    def __init__(self, graph) -> None:
+        """
+        Function description:
+            Constructor for LazyHeapQueue, a binary heap from heapq without decrease-key, a vertex whose priority
+            is lowered is pushed again and the old entry is left behind as a stale entry.
 
-    # since we are connected two graphs to produce two layers, we multiply it by 2 so the graph is intialised double the number of locations, representing both solo and carpool
-    layer = num_locations * 2
-    graph = Graph(layer)
-
-    # adds the edges for both non-carpool and carpool lanes to the graph by iterating through the roads list, creating an edge for each road, there is also an offset of the carpool layers that occurs so the vertices in solo can be linked to the vertices in carpool, finally if there are passengers, it also adds edges with zero weight to connect the non-carpool and carpool vertices for each passenger.
-    for a, b, c, d in roads:
-        graph.add_edge(a, b, c)
-        graph.add_edge(a + num_locations, b + num_locations, d)
-        if passengers:
-            for passenger in passengers:
-                graph.add_edge(passenger, passenger + num_locations, 0)
-
-    # computes the shortest path between the start and end vertices for both non-carpool and carpool layers, using dijkstra's algorithm
-    solo_path_weight, solo_path = graph.dijkstra(start, end)
-    carpool_path_weight, carpool_path = graph.dijkstra(start, end + num_locations)
-
-    # compares the weights of the solo and carpool paths and selects the one with the smaller weight, for example, if the solo path is shorter, the unique_path is set to solo_path or if the carpool path is shorter, the carpool path's vertices are converted back to their original location indices (by taking the modulo with num_locations), and the duplicates are removed
-    if solo_path_weight < carpool_path_weight:
-        unique_path = solo_path
-    else:
-        for i in range(len(carpool_path)):
-            carpool_path[i] %= num_locations
+        :Input:
+            graph (CSRGraph): The graph being searched.
 
-        unique_path = []
-        for i in range(len(carpool_path)):
-            if i == 0 or carpool_path[i] != carpool_path[i - 1]:
-                unique_path.append(carpool_path[i])
+        :Attributes:
+            heap: The heap of (priority, vertex) tuples.
 
-    return unique_path
+        :Time complexity:
+            O(1)
 
-def select_sections(occupancy_probability):
-    """
-    Written by: faw
+        :Aux space complexity:
+            O(1)
+        """
+        self.heap = []
 
-    Precondition: 
-        occupancy_probability is a non-empty matrix of positive integers, dimensions are n * m and n > m
-        remove only one section from each of the n rows
-        minimise the amount of shuffling work required, hence, 
+    def push(self, vertex, priority) -> None:
+        """
+        Function description:
+            Pushes a new (priority, vertex) entry.
 
-    Postcondition:
-        list of indices of n sections that has the total minimum occupancy rate for the entire matrix
+        :Input:
+            vertex (int): The vertex.
+            priority: Its priority.
 
-    Function description:  
-        Calculates the minimum total occupancy probability and the section locations for each row with the minimum occupancy probability by using dynamic programming.
+        :Time complexity:
+            O(log n) where n is the number of entries.
 
-    Approach description: 
-        Using dynamic programming, a memo can be used to store the minimum total occupancy probabilities for each cell in the occupancy_probability matrix. Then, the memo is constructed in a row-by-row manner, and for each cell, the function checks the adjacent cells in the previous row to find the minimum total occupancy probability. After memo is finished processing, the function backtracks from the last row, finding the optimal section locations for each row that lead to the minimum total occupancy probability, generating a path to it.
+        :Aux space complexity:
+            O(1)
+        """
+        heapq.heappush(self.heap, (priority, vertex))
 
-    Input:
-        occupancy_probability: matrix representing the occupancy probability
+    def pop(self) -> tuple:
+        """
+        Function description:
+            Removes the smallest entry, ties are broken on the smaller vertex.
 
-    Output: 
-        Returns a list containing the minimum total occupancy probability and the list of section locations for each row.
+        :Output:
+            A tuple (priority, vertex).
 
-        minimum_total_occupancy - total occupancy for selected sections
+        :Time complexity:
+            O(log n) where n is the number of entries.
 
-        sections_location - list of tuples representing the selected sections in row, column format
+        :Aux space complexity:
+            O(1)
+        """
+        return heapq.heappop(self.heap)
 
-    Time complexity: 
-        where n is the number of rows and m is the number of columns
+    def __len__(self) -> int:
+        return len(self.heap)
 
-        Best Case: O(n * m)
-        Worst Case: O(n * m)
+class IndexedHeapQueue(PriorityQueue):
+    def __init__(self, graph) -> None:
+        """
+        Function description:
+            Constructor for IndexedHeapQueue, a binary heap of vertices that tracks the position of each vertex
+            so its priority can be lowered in place, so the heap never holds more than one entry per vertex.
 
-    Space complexity:
-        Auxilary: O(n * m)
-    """
-    # n is the number of rows whilst m is the number of columns or aisles
-    n = len(occupancy_probability)
-    m = len(occupancy_probability[0])
+        :Input:
+            graph (CSRGraph): The graph being searched.
 
-    # initialization of the memo, creates a nested list with the same dimensions as occupancy_probability and fills it with inf values
-    memo = [[float('inf') for i in range(m)] for j in range(n)] 
+        :Attributes:
+            heap: The queued vertices in heap order.
+            priorities: The priority of each queued vertex.
+            positions: The index in heap of each queued vertex.
 
-    # fill the first row of the memo with the initial row of the occupancy_probability
-    for i in range(m):
-        memo[0][i] = occupancy_probability[0][i]
+        :Time complexity:
+            O(1)
 
-    # iterate through the rows of occupancy_probability, starting from the second row as the first row is already processsed, then iterate through the columns of the occupancy_probability, and lastly iterate through the adjacent columns in the previous row e.g. k = j-1, j, j+1, from here check if k is within the valid column range, and if it is calculate the current total occupancy probability by adding the value of the current cell and the adjacent cell in the previous row whilst checking if the current total occupancy probability is less than the stored value in the memo list and if it is, updating the memo list with the new minimum total occupancy probability
-    for i in range(1, n): 
-        for j in range(m): 
-            for k in range(j - 1, j + 2): 
-                if k >= 0 and k < m: 
-                    current_occupancy = occupancy_probability[i][j] + memo[i - 1][k]    
-                    if memo[i][j] > current_occupancy:
-                        memo[i][j] = current_occupancy 
+        :Aux space complexity:
+            O(1)
+        """
+        self.heap = []
+        self.priorities = {}
+        self.positions = {}
 
-    # gets the minimum total occupancy in the last row of memo by iterating over it and updating
-    minimum_total_occupancy = memo[-1][0]  
-    for value in memo[-1]:  
-        if value < minimum_total_occupancy:
-            minimum_total_occupancy = value  
+    def sift_up(self, index) -> None:
+        """
+        Function description:
+            Moves the vertex at the given index up until its parent has a priority no larger than its own.
 
-    sections_location = []
-    
-    # iterates through the last row of the memo table and finds the index of minimum_total_occupancy
-    minimum_total_occupancy_index = 0
-    for i in range(1, m):
-        if memo[-1][i] < memo[-1][minimum_total_occupancy_index]:
-            minimum_total_occupancy_index = i
+        :Input:
+            index (int): The index in heap.
 
-    # backtracking begins here by iterating through the rows in reverse order, starting from the second last row as the last row has been processed already, moving up to the first row, for each row, it checks the adjacent cells (j) in the previous row that led to the minimum total occupancy probability, where j is in {minimum_total_occupancy_index-1, minimum_total_occupancy_index, minimum_total_occupancy_index+1} and lastly it appends the current cell (i, minimum_total_occupancy_index) to the sections_location list and updates the minimum_total_occupancy_index to the column of the previous row's cell that led to the minimum total occupancy probability.
-    for i in range(n - 1, 0, -1):
-        for j in range(minimum_total_occupancy_index - 1, minimum_total_occupancy_index + 2):
-            if j >= 0 and j < m:
-                if memo[i][minimum_total_occupancy_index] == occupancy_probability[i][minimum_total_occupancy_index] + memo[i - 1][j]:
-                    sections_location.append((i, minimum_total_occupancy_index))
-                    minimum_total_occupancy_index = j
+        :Time complexity:
+            O(log n) where n is the number of queued vertices.
+
+        :Aux space complexity:
+            O(1)
+        """
+        heap = self.heap
+        priorities = self.priorities
+        positions = self.positions
+        vertex = heap[index]
+        priority = priorities[vertex]
+        while index > 0:
+            parent = (index - 1) >> 1
+            if priorities[heap[parent]] <= priority:
+                break
+            heap[index] = heap[parent]
+            positions[heap[index]] = index
+            index = parent
+        heap[index] = vertex
+        positions[vertex] = index
+
+    def sift_down(self, index) -> None:
+        """
+        Function description:
+            Moves the vertex at the given index down until both its children have priorities no smaller than its own.
+
+        :Input:
+            index (int): The index in heap.
+
+        :Time complexity:
+            O(log n) where n is the number of queued vertices.
+
+        :Aux space complexity:
+            O(1)
+        """
+        heap = self.heap
+        priorities = self.priorities
+        positions = self.positions
+        size = len(heap)
+        vertex = heap[index]
+        priority = priorities[vertex]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and priorities[heap[child + 1]] < priorities[heap[child]]:
+                child += 1
+            if priorities[heap[child]] >= priority:
+                break
+            heap[index] = heap[child]
+            positions[heap[index]] = index
+            index = child
+        heap[index] = vertex
+        positions[vertex] = index
+
+    def push(self, vertex, priority) -> None:
+        """
+        Function description:
+            Inserts the vertex, or decreases its key if it is already queued with a larger priority.
+
+        :Input:
+            vertex (int): The vertex.
+            priority: Its priority.
+
+        :Time complexity:
+            O(log n) where n is the number of queued vertices.
+
+        :Aux space complexity:
+            O(1)
+        """
+        if vertex in self.positions:
+            if priority < self.priorities[vertex]:
+                self.priorities[vertex] = priority
+                self.sift_up(self.positions[vertex])
+            return
+
+        self.priorities[vertex] = priority
+        self.heap.append(vertex)
+        self.sift_up(len(self.heap) - 1)
+
+    def pop(self) -> tuple:
+        """
+        Function description:
+            Removes the vertex with the smallest priority.
+
+        :Output:
+            A tuple (priority, vertex).
+
+        :Time complexity:
+            O(log n) where n is the number of queued vertices.
+
+        :Aux space complexity:
+            O(1)
+        """
+        heap = self.heap
+        vertex = heap[0]
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            self.sift_down(0)
+        del self.positions[vertex]
+        return self.priorities.pop(vertex), vertex
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+class BucketQueue(PriorityQueue):
+    def __init__(self, graph) -> None:
+        """
+        Function description:
+            Constructor for BucketQueue, Dial's bucket queue for small non-negative integer weights.
+
+            Every queued priority lies between the last popped priority and that plus the largest weight C,
+            so C + 1 buckets used as a circular array are enough, bucket p % (C + 1) holds the vertices of
+            priority p. Pop scans forward from the last popped bucket, so the scans of a whole search add up to
+            O(D) where D is the largest distance. A lowered priority is pushed again and leaves a stale entry.
+
+        :Input:
+            graph (CSRGraph): The graph being searched, with non-negative integer weights.
+
+        :Attributes:
+            buckets: The circular array of buckets, each a list of (priority, vertex) tuples.
+            current: The priority of the bucket pop scans from.
+            size: The number of entries.
+
+        :Time complexity:
+            O(C) where C is the largest weight.
+
+        :Aux space complexity:
+            O(C) where C is the largest weight.
+        """
+        if graph.weights.typecode != 'q':
+            raise ValueError("a bucket queue needs integer weights")
+        self.buckets = [[] for _ in range(graph.max_weight() + 1)]
+        self.current = 0
+        self.size = 0
+
+    def push(self, vertex, priority) -> None:
+        """
+        Function description:
+            Appends a (priority, vertex) entry to the bucket of its priority.
+
+        :Input:
+            vertex (int): The vertex.
+            priority (int): Its priority.
+
+        :Time complexity:
+            O(1)
+
+        :Aux space complexity:
+            O(1)
+        """
+        self.buckets[priority % len(self.buckets)].append((priority, vertex))
+        self.size += 1
+
+    def pop(self) -> tuple:
+        """
+        Function description:
+            Removes an entry from the first non-empty bucket at or after the current priority.
+
+        :Output:
+            A tuple (priority, vertex).
+
+        :Time complexity:
+            O(C) where C is the largest weight, amortised O(1) over a search with distances up to O(|E|).
+
+        :Aux space complexity:
+            O(1)
+        """
+        buckets = self.buckets
+        while not buckets[self.current % len(buckets)]:
+            self.current += 1
+        self.size -= 1
+        return buckets[self.current % len(buckets)].pop()
+
+    def __len__(self) -> int:
+        return self.size
+
+class PairingNode():
+    __slots__ = ("vertex", "priority", "child", "sibling", "parent")
+
+    def __init__(self, vertex, priority) -> None:
+        """
+        Function description:
+            Constructor for PairingNode, a node of a pairing heap.
+
+        :Input:
+            vertex (int): The vertex of the node.
+            priority: Its priority.
+
+        :Attributes:
+            vertex, priority: The inputs.
+            child: The first child of the node.
+            sibling: The next sibling of the node.
+            parent: The parent if the node is a first child, otherwise its previous sibling.
+
+        :Time complexity:
+            O(1)
+
+        :Aux space complexity:
+            O(1)
+        """
+        self.vertex = vertex
+        self.priority = priority
+        self.child = None
+        self.sibling = None
+        self.parent = None
+
+class PairingHeapQueue(PriorityQueue):
+    def __init__(self, graph) -> None:
+        """
+        Function description:
+            Constructor for PairingHeapQueue, a pairing heap with decrease-key.
+
+            Decrease-key cuts the node out of its parent's child list and melds it back at the root in O(1),
+            pop removes the root and pairs up its children left to right, then melds the pairs right to left.
+
+        :Input:
+            graph (CSRGraph): The graph being searched.
+
+        :Attributes:
+            root: The root node, None if the heap is empty.
+            nodes: The node of each queued vertex.
+
+        :Time complexity:
+            O(1)
+
+        :Aux space complexity:
+            O(1)
+        """
+        self.root = None
+        self.nodes = {}
+
+    def meld(self, first, second):
+        """
+        Function description:
+            Melds two heaps, the root with the larger priority becomes the first child of the other.
+
+        :Input:
+            first (PairingNode): The root of the first heap, or None.
+            second (PairingNode): The root of the second heap, or None.
+
+        :Output:
+            The root of the melded heap.
+
+        :Time complexity:
+            O(1)
+
+        :Aux space complexity:
+            O(1)
+        """
+        if first is None:
+            return second
+        if second is None:
+            return first
+        if second.priority < first.priority:
+            first, second = second, first
+
+        second.parent = first
+        second.sibling = first.child
+        if first.child is not None:
+            first.child.parent = second
+        first.child = second
+        first.sibling = None
+        first.parent = None
+        return first
+
+    def push(self, vertex, priority) -> None:
+        """
+        Function description:
+            Inserts the vertex, or decreases its key if it is already queued with a larger priority.
+
+        :Input:
+            vertex (int): The vertex.
+            priority: Its priority.
+
+        :Time complexity:
+            O(1)
+
+        :Aux space complexity:
+            O(1)
+        """
+        node = self.nodes.get(vertex)
+        if node is None:
+            node = PairingNode(vertex, priority)
+            self.nodes[vertex] = node
+            self.root = self.meld(self.root, node)
+            return
+
+        if priority >= node.priority:
+            return
+        node.priority = priority
+        if node is self.root:
+            return
+
+        # cut the node and its subtree out of the child list it is in, then meld it with the root
+        if node.parent.child is node:
+            node.parent.child = node.sibling
+        else:
+            node.parent.sibling = node.sibling
+        if node.sibling is not None:
+            node.sibling.parent = node.parent
+        node.sibling = None
+        node.parent = None
+        self.root = self.meld(self.root, node)
+
+    def pop(self) -> tuple:
+        """
+        Function description:
+            Removes the root, the vertex with the smallest priority.
+
+        :Output:
+            A tuple (priority, vertex).
+
+        :Time complexity:
+            O(log n) amortised where n is the number of queued vertices.
+
+        :Aux space complexity:
+            O(n) where n is the number of children of the root.
+        """
+        root = self.root
+        del self.nodes[root.vertex]
+
+        # first pass, meld the children in pairs from left to right
+        pairs = []
+        child = root.child
+        while child is not None:
+            first = child
+            second = child.sibling
+            child = second.sibling if second is not None else None
+            first.sibling = first.parent = None
+            if second is not None:
+                second.sibling = second.parent = None
+            pairs.append(self.meld(first, second))
+
+        # second pass, meld the pairs from right to left
+        new_root = None
+        for i in range(len(pairs) - 1, -1, -1):
+            new_root = self.meld(pairs[i], new_root)
+        self.root = new_root
+
+        return root.priority, root.vertex
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+class CSRGraph():
+    def __init__(self, num_vertices, offsets, targets, weights) -> None:
+        """
+        Function description:
+            Constructor for CSRGraph.
+
+            This uses a compressed sparse row representation, the outgoing arcs of vertex u are stored
+            at positions offsets[u] up to offsets[u + 1] of the targets and weights buffers, so no
+            Vertex or Edge objects are needed.
+
+        :Input:
+            num_vertices (int): The number of vertices in the graph.
+            offsets (array): Buffer of length num_vertices + 1 with the first arc position of each vertex.
+            targets (array): Buffer with the destination vertex of each arc.
+            weights (array): Buffer with the weight of each arc.
+
+        :Attributes:
+            num_vertices: The number of vertices in the graph.
+            offsets: The first arc position of each vertex, offsets[num_vertices] is the number of arcs.
+            targets: The destination vertex of each arc.
+            weights: The weight of each arc.
+            reverse_offsets, reverse_sources, reverse_arcs: The incoming arcs of each vertex in the same
+                                                             layout, filled in by build_reverse.
+            spaces: The search spaces reused by the searches of the graph, created when needed.
+            largest_weight: The largest arc weight, None until max_weight is called.
+            trees: The DynamicShortestPaths repaired by set_weight, held weakly.
+            version: The number of changes made to the arcs by set_weight, deduplicate and retire, Landmarks,
+                     ContractionHierarchy and DynamicShortestPaths record it to tell when they no longer match the graph.
+
+        :Time complexity:
+            O(1)
+
+        :Aux space complexity:
+            O(1)
+        """
+        self.num_vertices = num_vertices
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.reverse_offsets = None
+        self.reverse_sources = None
+        self.reverse_arcs = None
+        self.spaces = []
+        self.largest_weight = None
+        self.trees = weakref.WeakSet()
+        self.version = 0
+
+    @classmethod
+    def from_edges(cls, num_vertices, sources, targets, weights):
+        """
+        Function description:
+            Builds a CSRGraph from flat edge buffers by counting sort on the source vertex.
+
+            The sort is stable, so the arcs of each vertex keep the order they were added in, which
+            keeps the tie breaking of dijkstra identical to the adjacency list representation.
+
+        :Input:
+            num_vertices (int): The number of vertices in the graph.
+            sources (array): Buffer with the source vertex of each edge.
+            targets (array): Buffer with the destination vertex of each edge.
+            weights (array): Buffer with the weight of each edge.
+
+        :Output:
+            A CSRGraph containing every edge.
+
+        :Time complexity:
+            O(|V| + |E|) where |V| is the number of vertices and |E| is the number of edges.
+
+        :Aux space complexity:
+            O(|V| + |E|) where |V| is the number of vertices and |E| is the number of edges.
+        """
+        num_edges = len(sources)
+
+        # count the arcs of each vertex, then turn the counts into starting positions with a prefix sum
+        offsets = array('q', [0]) * (num_vertices + 1)
+        for u in sources:
+            offsets[u + 1] += 1
+        for u in range(num_vertices):
+            offsets[u + 1] += offsets[u]
+
+        # place every edge at the next free slot of its source vertex
+        next_slot = array('q', offsets)
+        sorted_targets = array('i', [0]) * num_edges
+        sorted_weights = array(weights.typecode, [0]) * num_edges
+        for i in range(num_edges):
+            u = sources[i]
+            slot = next_slot[u]
+            next_slot[u] = slot + 1
+            sorted_targets[slot] = targets[i]
+            sorted_weights[slot] = weights[i]
+
+        return cls(num_vertices, offsets, sorted_targets, sorted_weights)
+
+    def build_reverse(self) -> None:
+        """
+        Function description:
+            Builds the reverse adjacency, the incoming arcs of vertex v are stored at positions
+            reverse_offsets[v] up to reverse_offsets[v + 1], each with its source vertex and the position
+            of the forward arc so the weight is shared with the forward buffers.
+
+        :Time complexity:
+            O(|V| + |E|) where |V| is the number of vertices and |E| is the number of edges.
+
+        :Aux space complexity:
+            O(|V| + |E|) where |V| is the number of vertices and |E| is the number of edges.
+        """
+        num_edges = self.offsets[self.num_vertices]
+
+        # counting sort of the arcs on their destination vertex
+        reverse_offsets = array('q', [0]) * (self.num_vertices + 1)
+        for v in self.targets:
+            reverse_offsets[v + 1] += 1
+        for v in range(self.num_vertices):
+            reverse_offsets[v + 1] += reverse_offsets[v]
+
+        next_slot = array('q', reverse_offsets)
+        reverse_sources = array('i', [0]) * num_edges
+        reverse_arcs = array('q', [0]) * num_edges
+        for u in range(self.num_vertices):
+            for arc in range(self.offsets[u], self.offsets[u + 1]):
+                v = self.targets[arc]
+                slot = next_slot[v]
+                next_slot[v] = slot + 1
+                reverse_sources[slot] = u
+                reverse_arcs[slot] = arc
+
+        self.reverse_offsets = reverse_offsets
+        self.reverse_sources = reverse_sources
+        self.reverse_arcs = reverse_arcs
+
+    def deduplicate(self) -> int:
+        """
+        Function description:
+            Collapses parallel arcs, only the lightest arc from u to v is kept, in the position of the first
+            one so the order of the remaining arcs does not change. The buffers are compacted in place and
+            the reverse adjacency, which no longer matches, is dropped.
+
+        :Output:
+            The number of arcs removed.
+
+        :Time complexity:
+            O(|V| + |E|) where |V| is the number of vertices and |E| is the number of edges.
+
+        :Aux space complexity:
+            O(|V|) where |V| is the number of vertices.
+        """
+        offsets = self.offsets
+        targets = self.targets
+        weights = self.weights
+        num_edges = offsets[self.num_vertices]
+
+        # owner[v] is the last vertex that had an arc to v, and kept_slot[v] the position that arc was kept in
+        owner = array('i', [-1]) * self.num_vertices
+        kept_slot = array('q', [0]) * self.num_vertices
+        new_offsets = array('q', [0]) * (self.num_vertices + 1)
+
+        # the write position never passes the read position, so the arcs can be moved down in place
+        write = 0
+        for u in range(self.num_vertices):
+            new_offsets[u] = write
+            for arc in range(offsets[u], offsets[u + 1]):
+                v = targets[arc]
+                w = weights[arc]
+                if owner[v] == u:
+                    if w < weights[kept_slot[v]]:
+                        weights[kept_slot[v]] = w
+                else:
+                    owner[v] = u
+                    kept_slot[v] = write
+                    targets[write] = v
+                    weights[write] = w
+                    write += 1
+        new_offsets[self.num_vertices] = write
+
+        del targets[write:]
+        del weights[write:]
+        self.offsets = new_offsets
+        self.largest_weight = None
+        self.version += 1
+        self.reverse_offsets = None
+        self.reverse_sources = None
+        self.reverse_arcs = None
+
+        return num_edges - write
+
+    def reversed(self):
+        """
+        Function description:
+            Returns a new CSRGraph with every arc turned around, built from the reverse adjacency.
+
+        :Output:
+            The reversed CSRGraph.
+
+        :Time complexity:
+            O(|V| + |E|) where |V| is the number of vertices and |E| is the number of edges.
+
+        :Aux space complexity:
+            O(|V| + |E|) where |V| is the number of vertices and |E| is the number of edges.
+        """
+        if self.reverse_offsets is None:
+            self.build_reverse()
+
+        weights = array(self.weights.typecode, [0]) * len(self.reverse_arcs)
+        for reverse_arc in range(len(self.reverse_arcs)):
+            weights[reverse_arc] = self.weights[self.reverse_arcs[reverse_arc]]
+
+        return CSRGraph(self.num_vertices, array('q', self.reverse_offsets), array('i', self.reverse_sources), weights)
+
+    def edge_arrays(self) -> tuple:
+        """
+        Function description:
+            Expands the graph back into flat edge buffers, the inverse of from_edges.
+
+        :Output:
+            A tuple (sources, targets, weights) of arrays, one entry per arc.
+
+        :Time complexity:
+            O(|V| + |E|) where |V| is the number of vertices and |E| is the number of edges.
+
+        :Aux space complexity:
+            O(|E|) where |E| is the number of edges.
+        """
+        sources = array('i')
+        for u in range(self.num_vertices):
+            sources.extend(array('i', [u]) * (self.offsets[u + 1] - self.offsets[u]))
+        return sources, array('i', self.targets), array(self.weights.typecode, self.weights)
+
+    def max_weight(self):
+        """
+        Function description:
+            Returns the largest arc weight, 0 if the graph has no arcs, computed once and then cached.
+
+        :Output:
+            The largest weight.
+
+        :Time complexity:
+            O(|E|) the first time where |E| is the number of edges, O(1) afterwards.
+
+        :Aux space complexity:
+            O(1)
+        """
+        if self.largest_weight is None:
+            self.largest_weight = max(self.weights, default = 0)
+        return self.largest_weight
+
+    def find_arc(self, u, v) -> int:
+        """
+        Function description:
+            Finds the first arc from u to v.
+
+        :Input:
+            u (int): The source vertex.
+            v (int): The destination vertex.
+
+        :Output:
+            The position of the arc, -1 if there is none.
+
+        :Time complexity:
+            O(d) where d is the number of arcs leaving u.
+
+        :Aux space complexity:
+            O(1)
+        """
+        for arc in range(self.offsets[u], self.offsets[u + 1]):
+            if self.targets[arc] == v:
+                return arc
+        return -1
+
+    def set_weight(self, u, v, weight) -> int:
+        """
+        Function description:
+            Changes the weight of the first arc from u to v, and repairs every DynamicShortestPaths built on the graph,
+            which is much cheaper than searching again when the change only affects a small part of each tree.
+
+            Landmarks and a ContractionHierarchy of the graph cannot be repaired this way, the version of the graph
+            is raised so astar and the hierarchy queries refuse them until they are built again.
+
+        :Input:
+            u (int): The source vertex.
+            v (int): The destination vertex.
+            weight: The new weight, non-negative.
+
+        :Output:
+            The total number of vertices whose distance changed in the trees of the graph.
+
+        :Time complexity:
+            O(d) where d is the number of arcs leaving u, plus the repair of each tree, see DynamicShortestPaths.update_arc.
+
+        :Aux space complexity:
+            O(1), plus the repair of each tree.
+        """
+        arc = self.find_arc(u, v)
+        if arc == -1:
+            raise ValueError(f"there is no arc from {u} to {v}")
+
+        # the weight buffer holds integers until the first non integer weight is set
+        if self.weights.typecode == 'q' and not isinstance(weight, int):
+            self.weights = array('d', self.weights)
+
+        old_weight = self.weights[arc]
+        self.weights[arc] = weight
+        self.largest_weight = None
+        self.version += 1
+
+        # a tree that was already stale, after a deduplicate, cannot be repaired and stays refused
+        changed = 0
+        for tree in list(self.trees):
+            if tree.version == self.version - 1:
+                changed += tree.update_arc(u, arc, old_weight)
+                tree.version = self.version
+        return changed
+
+    def retire(self) -> None:
+        """
+        Function description:
+            Raises the version of a graph that Graph.add_edge has replaced, so the Landmarks, ContractionHierarchy
+            and DynamicShortestPaths built on it are refused rather than used in place of the new frozen graph.
+
+        :Time complexity:
+            O(1)
+
+        :Aux space complexity:
+            O(1)
+        """
+        self.version += 1
+
+    def shortest_path_tree(self, source):
+        """
+        Function description:
+            Builds a shortest path tree from the source that set_weight keeps up to date.
+
+        :Input:
+            source (int): The source vertex.
+
+        :Output:
+            A DynamicShortestPaths, it stops being repaired once nothing refers to it.
+
+        :Time complexity:
+            O((|V| + |E|) * log|V|) where |V| is the number of vertices and |E| is the number of edges.
+
+        :Aux space complexity:
+            O(|V|) where |V| is the number of vertices.
+        """
+        return DynamicShortestPaths(self, source)
+
+    def search_space(self, exclude = None) -> SearchSpace:
+        """
+        Function description:
+            Returns a free search space of the graph, one whose labels no ShortestPaths is still reading,
+            searches that need two, like bidirectional_dijkstra, pass the first as exclude.
+
+        :Input:
+            exclude (SearchSpace): A space that must not be returned.
+
+        :Output:
+            A free SearchSpace, a new one is only created if every existing one is in use.
+
+        :Time complexity:
+            O(k) where k is the number of spaces, O(|V|) when a new one is created where |V| is the number of vertices
+
+        :Aux space complexity:
+            O(|V|) when a new one is created where |V| is the number of vertices
+        """
+        for space in self.spaces:
+            if space is not exclude and space.is_free():
+                return space
+
+        space = SearchSpace(self.num_vertices)
+        self.spaces.append(space)
+        return space
+
+    def build_path(self, previous, vertex) -> list:
+        """
+        Function description:
+            Builds the path from the starting vertex to the given vertex using a predecessor buffer.
+
+        :Input:
+            previous (array): The predecessor of each vertex, -1 if it has none.
+            vertex (int): The destination vertex.
+
+        :Output:
+            A list containing the path from the starting vertex to the given vertex.
+
+        :Time complexity:
+            O(n) where n is the number of vertices in the path.
+
+        :Aux space complexity:
+            O(n) where n is the number of vertices in the path.
+        """
+        path = []
+        while vertex != -1:
+            path.append(vertex)
+            vertex = previous[vertex]
+        path.reverse()
+        return path
+
+    def build_route(self, previous, vertex, num_locations) -> list:
+        """
+        Function description:
+            Builds the route of a layered graph from the starting vertex to the given vertex in a single walk of the
+            predecessor buffer, each vertex is decoded to its location with a modulo and a location equal to the one
+            after it, which is a move between layers, is skipped as it is written.
+
+        :Input:
+            previous (array): The predecessor of each vertex, -1 if it has none.
+            vertex (int): The destination vertex.
+            num_locations (int): The number of locations in each layer.
+
+        :Output:
+            A list of the locations on the route.
+
+        :Time complexity:
+            O(n) where n is the number of vertices in the path.
+
+        :Aux space complexity:
+            O(n) where n is the number of vertices in the path.
+        """
+        route = []
+        last = -1
+        while vertex != -1:
+            location = vertex % num_locations
+            if location != last:
+                route.append(location)
+                last = location
+            vertex = previous[vertex]
+        route.reverse()
+        return route
+
+    def dijkstra(self, source, destination, queue = LazyHeapQueue):
+        """
+        Function description:
+            Dijkstra's algorithm over the flat arc buffers, see Graph.dijkstra.
+
+        :Input:
+            source (int): The starting vertex.
+            destination (int): The ending vertex.
+            queue (type): The PriorityQueue class the search uses, see dijkstra_many.
+
+        :Output:
+            A tuple containing the shortest path distance and the path as a list of vertex indices.
+
+        :Time complexity:
+            O((|V| + |E|) * log|V|) where |V| is the number of vertices and |E| is the number of edges in the graph.
+
+        :Aux space complexity:
+            O(|V|) where |V| is the number of vertices in the graph.
+        """
+        shortest_paths = self.dijkstra_many(source, [destination], queue)
+        return shortest_paths.distance(destination), shortest_paths.path(destination)
+
+    def dijkstra_distance(self, source, destination, queue = LazyHeapQueue):
+        """
+        Function description:
+            Dijkstra's algorithm over the flat arc buffers for the distance alone, the path is never built.
+
+        :Input:
+            source (int): The starting vertex.
+            destination (int): The ending vertex.
+            queue (type): The PriorityQueue class the search uses, see dijkstra_many.
+
+        :Output:
+            The shortest path distance, inf if the destination cannot be reached.
+
+        :Time complexity:
+            O((|V| + |E|) * log|V|) where |V| is the number of vertices and |E| is the number of edges in the graph.
+
+        :Aux space complexity:
+            O(|V|) where |V| is the number of vertices in the graph.
+        """
+        return self.dijkstra_many(source, [destination], queue).distance(destination)
+
+    def dijkstra_many(self, source, destinations, queue = LazyHeapQueue):
+        """
+        Function description:
+            Dijkstra's algorithm from one source to many destinations in a single search, which stops once
+            every destination is settled. With no destinations the search covers every vertex reachable from the source.
+
+            The labels are kept in a reusable SearchSpace of the graph, so starting the search costs O(1)
+            rather than O(|V|), and each relaxation only indexes flat buffers instead of reading attributes of
+            Vertex and Edge objects.
+
+            The priority queue is pluggable, LazyHeapQueue is the fastest in practice, IndexedHeapQueue and
+            PairingHeapQueue keep one entry per vertex with decrease-key, and BucketQueue suits the small integer
+            weights of road travel times. The distances do not depend on the queue, but a queue that breaks ties
+            differently may settle equally short paths in a different order.
+
+        :Input:
+            source (int): The starting vertex.
+            destinations (list): The ending vertices.
+            queue (type): The PriorityQueue class the search uses, LazyHeapQueue by default.
+
+        :Output:
+            A ShortestPaths with the distance of every destination, the paths are only built when asked for.
+
+        :Time complexity:
+            O((|V| + |E|) * log|V|) where |V| is the number of vertices and |E| is the number of edges in the graph,
+            only counting the vertices and edges the search reaches, O(|E| + D) with a BucketQueue where D is
+            the largest distance found.
+
+        :Aux space complexity:
+            O(|V|) where |V| is the number of vertices in the graph, allocated once per graph.
+        """
+        offsets = self.offsets
+        targets = self.targets
+        weights = self.weights
+
+        space = self.search_space()
+        epoch = space.begin()
+        labelled = space.labelled
+        settled = space.settled
+        vertex_distances = space.distances
+        previous = space.previous
+
+        labelled[source] = epoch
+        vertex_distances[source] = 0
+        previous[source] = -1
+
+        # the search knows it is done when the last of the destinations is settled
+        pending = set(destinations)
+        remaining = len(pending)
+
+        priority_queue = queue(self)
+        push = priority_queue.push
+        pop = priority_queue.pop
+        push(source, 0)
+
+        while priority_queue:
+            current_distance, current_vertex_id = pop()
+
+            if settled[current_vertex_id] == epoch:
+                continue
+            settled[current_vertex_id] = epoch
+
+            # the distance and path of a destination are final once it is settled
+            if current_vertex_id in pending:
+                remaining -= 1
+                if remaining == 0:
+                    break
+
+            # the arcs of the current vertex are the slice offsets[u] to offsets[u + 1] of the buffers
+            for arc in range(offsets[current_vertex_id], offsets[current_vertex_id + 1]):
+                neighbor_vertex_id = targets[arc]
+                if settled[neighbor_vertex_id] == epoch:
+                    continue
+
+                # a vertex not labelled in this epoch has an infinite distance, whatever its stale label says
+                new_neighbor_distance = current_distance + weights[arc]
+                if labelled[neighbor_vertex_id] != epoch or new_neighbor_distance < vertex_distances[neighbor_vertex_id]:
+                    labelled[neighbor_vertex_id] = epoch
+                    vertex_distances[neighbor_vertex_id] = new_neighbor_distance
+                    previous[neighbor_vertex_id] = current_vertex_id
+                    push(neighbor_vertex_id, new_neighbor_distance)
+
+        shortest_paths = ShortestPaths(self, source, space, epoch, {destination: space.distance(destination) for destination in pending})
+        space.owner = weakref.ref(shortest_paths)
+        return shortest_paths
+
+    def bidirectional_dijkstra(self, source, destination):
+        """
+        Function description:
+            Bidirectional Dijkstra's algorithm, a forward search from the source over the arcs and a backward
+            search from the destination over the reverse adjacency, each step expanding the side with the
+            smaller queue minimum.
+
+            Every arc scanned that reaches a vertex labelled by both searches gives a candidate path, and the
+            search stops once the two queue minimums add up to at least the best candidate, as no shorter
+            path can be found after that point. When several shortest paths exist the returned one may differ
+            from dijkstra, the distance is always the same. Each side keeps its labels in its own SearchSpace.
+
+        :Input:
+            source (int): The starting vertex.
+            destination (int): The ending vertex.
+
+        :Output:
+            A tuple containing the shortest path distance and the path as a list of vertex indices.
+
+        :Time complexity:
+            O((|V| + |E|) * log|V|) where |V| is the number of vertices and |E| is the number of edges in the graph,
+            in practice each side only explores a ball of about half the radius of dijkstra.
+
+        :Aux space complexity:
+            O(|V|) where |V| is the number of vertices in the graph, allocated once per graph.
+        """
+        if source == destination:
+            return 0, [source]
+
+        if self.reverse_offsets is None:
+            self.build_reverse()
+
+        offsets = self.offsets
+        targets = self.targets
+        weights = self.weights
+        reverse_offsets = self.reverse_offsets
+        reverse_sources = self.reverse_sources
+        reverse_arcs = self.reverse_arcs
+
+        forward_space = self.search_space()
+        backward_space = self.search_space(exclude = forward_space)
+        forward_epoch = forward_space.begin()
+        backward_epoch = backward_space.begin()
+        forward_labelled = forward_space.labelled
+        backward_labelled = backward_space.labelled
+        forward_settled = forward_space.settled
+        backward_settled = backward_space.settled
+        forward_distances = forward_space.distances
+        backward_distances = backward_space.distances
+
+        # the backward search stores the next vertex towards the destination in its predecessor buffer
+        forward_previous = forward_space.previous
+        backward_next = backward_space.previous
+
+        forward_labelled[source] = forward_epoch
+        forward_distances[source] = 0
+        forward_previous[source] = -1
+        backward_labelled[destination] = backward_epoch
+        backward_distances[destination] = 0
+        backward_next[destination] = -1
+
+        forward_queue = [(0, source)]
+        backward_queue = [(0, destination)]
+
+        # best is the length of the shortest path found so far, which passes through the meeting vertex
+        best = float('inf')
+        meeting_vertex = -1
+
+        while forward_queue and backward_queue:
+            if forward_queue[0][0] + backward_queue[0][0] >= best:
+                break
+
+            if forward_queue[0][0] <= backward_queue[0][0]:
+                current_distance, u = heapq.heappop(forward_queue)
+                if forward_settled[u] == forward_epoch:
+                    continue
+                forward_settled[u] = forward_epoch
+
+                for arc in range(offsets[u], offsets[u + 1]):
+                    v = targets[arc]
+                    new_distance = current_distance + weights[arc]
+                    if forward_labelled[v] != forward_epoch or (new_distance < forward_distances[v] and forward_settled[v] != forward_epoch):
+                        forward_labelled[v] = forward_epoch
+                        forward_distances[v] = new_distance
+                        forward_previous[v] = u
+                        heapq.heappush(forward_queue, (new_distance, v))
+
+                    # the arc joins the two searches if the backward search has labelled v
+                    if backward_labelled[v] == backward_epoch and forward_distances[v] + backward_distances[v] < best:
+                        best = forward_distances[v] + backward_distances[v]
+                        meeting_vertex = v
+            else:
+                current_distance, v = heapq.heappop(backward_queue)
+                if backward_settled[v] == backward_epoch:
+                    continue
+                backward_settled[v] = backward_epoch
+
+                for reverse_arc in range(reverse_offsets[v], reverse_offsets[v + 1]):
+                    u = reverse_sources[reverse_arc]
+                    new_distance = current_distance + weights[reverse_arcs[reverse_arc]]
+                    if backward_labelled[u] != backward_epoch or (new_distance < backward_distances[u] and backward_settled[u] != backward_epoch):
+                        backward_labelled[u] = backward_epoch
+                        backward_distances[u] = new_distance
+                        backward_next[u] = v
+                        heapq.heappush(backward_queue, (new_distance, u))
+
+                    if forward_labelled[u] == forward_epoch and forward_distances[u] + backward_distances[u] < best:
+                        best = forward_distances[u] + backward_distances[u]
+                        meeting_vertex = u
+
+        if meeting_vertex == -1:
+            return best, [destination]
+
+        # the forward half is built back from the meeting vertex, then the backward half is followed to the destination
+        path = self.build_path(forward_previous, meeting_vertex)
+        vertex = backward_next[meeting_vertex]
+        while vertex != -1:
+            path.append(vertex)
+            vertex = backward_next[vertex]
+
+        return best, path
+
+    def astar(self, source, destination, landmarks):
+        """
+        Function description:
+            A* search between the source and destination vertices, guided by the lower bounds of a set of landmarks.
+
+            Vertices are taken from the queue in order of their distance plus the lower bound on their remaining
+            distance, so the search is drawn towards the destination. The landmark bounds are consistent, so every
+            vertex is still settled at most once and the distance is the same as dijkstra. When several shortest
+            paths exist the returned one may differ from dijkstra. Landmarks built for another graph, or before the
+            last change to this one, could overestimate and give a wrong distance, so they raise a ValueError instead.
+
+        :Input:
+            source (int): The starting vertex.
+            destination (int): The ending vertex.
+            landmarks (Landmarks): The landmark distance tables of this graph.
+
+        :Output:
+            A tuple containing the shortest path distance and the path as a list of vertex indices.
+
+        :Time complexity:
+            O((|V| + |E|) * (k + log|V|)) where |V| is the number of vertices, |E| is the number of edges and k the number of landmarks,
+            in practice only the vertices near the shortest path are settled.
+
+        :Aux space complexity:
+            O(|V|) where |V| is the number of vertices in the graph.
+        """
+        landmarks.check(self)
+
+        offsets = self.offsets
+        targets = self.targets
+        weights = self.weights
+        inf = float('inf')
+
+        space = self.search_space()
+        epoch = space.begin()
+        labelled = space.labelled
+        settled = space.settled
+        vertex_distances = space.distances
+        previous = space.previous
+
+        labelled[source] = epoch
+        vertex_distances[source] = 0
+        previous[source] = -1
+
+        # the bounds towards the destination only depend on the vertex, so each is computed once per query
+        lower_bound = landmarks.lower_bounds_to(destination)
+        bounds = {}
+
+        priority_queue = [(lower_bound(source), 0, source)]
+
+        while priority_queue:
+            _, current_distance, current_vertex_id = heapq.heappop(priority_queue)
+
+            if settled[current_vertex_id] == epoch:
+                continue
+            settled[current_vertex_id] = epoch
+
+            if current_vertex_id == destination:
+                break
+
+            for arc in range(offsets[current_vertex_id], offsets[current_vertex_id + 1]):
+                neighbor_vertex_id = targets[arc]
+                if settled[neighbor_vertex_id] == epoch:
+                    continue
+
+                new_neighbor_distance = current_distance + weights[arc]
+                if labelled[neighbor_vertex_id] != epoch or new_neighbor_distance < vertex_distances[neighbor_vertex_id]:
+                    if neighbor_vertex_id not in bounds:
+                        bounds[neighbor_vertex_id] = lower_bound(neighbor_vertex_id)
+
+                    # a vertex that cannot reach the destination is never worth expanding
+                    if bounds[neighbor_vertex_id] == inf:
+                        continue
+
+                    labelled[neighbor_vertex_id] = epoch
+                    vertex_distances[neighbor_vertex_id] = new_neighbor_distance
+                    previous[neighbor_vertex_id] = current_vertex_id
+                    heapq.heappush(priority_queue, (new_neighbor_distance + bounds[neighbor_vertex_id], new_neighbor_distance, neighbor_vertex_id))
+
+        if labelled[destination] != epoch:
+            return inf, [destination]
+        return vertex_distances[destination], self.build_path(previous, destination)
+
+    def __str__(self) -> str:
+        """
+        Function description:
+            Returns a string representation of the graph, in the same format as Graph.
+
+        :Output:
+            A string with one line per vertex followed by one line per arc.
+
+        :Time complexity:
+            O(|V| + |E|) where |V| is the number of vertices and |E| is the number of edges.
+
+        :Aux space complexity:
+            O(|V| + |E|) where |V| is the number of vertices and |E| is the number of edges.
+        """
+        lines = []
+        for u in range(self.num_vertices):
+            edges_str = "\n with edges: ".join(f"{u} --({self.weights[arc]})--> {self.targets[arc]}" for arc in range(self.offsets[u], self.offsets[u + 1]))
+            lines.append(f'{u}\n with edges: {edges_str}' if edges_str else f'{u}')
+        return "\n".join(lines)
+
+class Landmarks():
+    def __init__(self, landmarks, num_vertices, from_landmark, to_landmark, graph = None) -> None:
+        """
+        Function description:
+            Constructor for Landmarks, the distance tables used by the ALT lower bounds of CSRGraph.astar.
+
+            By the triangle inequality, for a landmark L the distance from v to t is at least
+            d(L, t) - d(L, v) and at least d(v, L) - d(t, L), the lower bound is the largest of these over
+            all landmarks.
+
+        :Input:
+            landmarks (list): The landmark vertices.
+            num_vertices (int): The number of vertices in the graph.
+            from_landmark (array): Flat 'd' table, from_landmark[i * num_vertices + v] is the distance from landmark i to v.
+            to_landmark (array): Flat 'd' table, to_landmark[i * num_vertices + v] is the distance from v to landmark i.
+            graph (CSRGraph): The graph the tables were computed on, None when it is not known.
+
+        :Attributes:
+            landmarks, num_vertices, from_landmark, to_landmark: The inputs.
+            graph: A weak reference to the graph, None when it is not known.
+            version: The version of that graph the tables were computed on, see CSRGraph.
+
+        :Time complexity:
+            O(1)
+
+        :Aux space complexity:
+            O(1)
+        """
+        self.landmarks = landmarks
+        self.num_vertices = num_vertices
+        self.from_landmark = from_landmark
+        self.to_landmark = to_landmark
+        self.graph = None if graph is None else weakref.ref(graph)
+        self.version = 0 if graph is None else graph.version
+
+    def check(self, graph) -> None:
+        """
+        Function description:
+            Raises a ValueError unless the tables were computed on the given graph in its current version.
+
+        :Input:
+            graph (CSRGraph): The graph about to be searched.
+
+        :Time complexity:
+            O(1)
+
+        :Aux space complexity:
+            O(1)
+        """
+        if self.graph is not None and (self.graph() is not graph or graph.version != self.version):
+            raise ValueError("the landmarks were built for another graph or before its last change, build them again")
+
+    @classmethod
+    def build(cls, graph, count = 8):
+        """
+        Function description:
+            Chooses landmarks by farthest selection and precomputes their distance tables.
+
+            The first landmark is the vertex farthest from vertex 0, each next landmark is the vertex whose
+            distance from the closest landmark chosen so far is the largest, with unreachable vertices counting
+            as infinitely far so every part of the graph gets covered. Each landmark takes one full dijkstra over
+            the graph and one over the reversed graph.
+
+        :Input:
+            graph (CSRGraph): The graph, with non-negative weights.
+            count (int): The number of landmarks.
+
+        :Output:
+            The Landmarks of the graph.
+
+        :Time complexity:
+            O(k * (|V| + |E|) * log|V|) where k is the number of landmarks, |V| is the number of vertices and |E| is the number of edges.
+
+        :Aux space complexity:
+            O(k * |V| + |E|) where k is the number of landmarks, |V| is the number of vertices and |E| is the number of edges.
+        """
+        num_vertices = graph.num_vertices
+        count = min(count, num_vertices)
+        reversed_graph = graph.reversed()
+
+        landmarks = []
+        from_landmark = array('d')
+        to_landmark = array('d')
+
+        # closest[v] is the distance to v from the closest landmark so far, starting with vertex 0 as a stand-in
+        closest = graph.dijkstra_many(0, []).all_distances() if num_vertices else []
+        for _ in range(count):
+            landmark = 0
+            for v in range(num_vertices):
+                if closest[v] > closest[landmark]:
+                    landmark = v
+            if closest[landmark] == 0:
+                break
+
+            landmarks.append(landmark)
+            distances_from = graph.dijkstra_many(landmark, []).all_distances()
+            from_landmark.extend(array('d', distances_from))
+            to_landmark.extend(array('d', reversed_graph.dijkstra_many(landmark, []).all_distances()))
+
+            if len(landmarks) == 1:
+                closest = list(distances_from)
+            else:
+                for v in range(num_vertices):
+                    if distances_from[v] < closest[v]:
+                        closest[v] = distances_from[v]
+
+        return cls(landmarks, num_vertices, from_landmark, to_landmark, graph)
+
+    def lower_bounds_to(self, destination):
+        """
+        Function description:
+            Returns a function giving the lower bound on the distance from any vertex to the destination.
+
+        :Input:
+            destination (int): The ending vertex.
+
+        :Output:
+            A function of a vertex, returning its lower bound, inf if it cannot reach the destination.
+
+        :Time complexity:
+            O(k) where k is the number of landmarks, and O(k) for each call of the function.
+
+        :Aux space complexity:
+            O(k) where k is the number of landmarks.
+        """
+        inf = float('inf')
+        num_vertices = self.num_vertices
+        from_landmark = self.from_landmark
+        to_landmark = self.to_landmark
+        bases = [i * num_vertices for i in range(len(self.landmarks))]
+        from_destination = [from_landmark[base + destination] for base in bases]
+        to_destination = [to_landmark[base + destination] for base in bases]
+
+        def lower_bound(v):
+            bound = 0
+            for i in range(len(bases)):
+                # a term with both distances infinite says nothing and is skipped
+                from_v = from_landmark[bases[i] + v]
+                if from_v != inf and from_destination[i] - from_v > bound:
+                    bound = from_destination[i] - from_v
+
+                to_v = to_landmark[bases[i] + v]
+                if to_destination[i] != inf and to_v - to_destination[i] > bound:
+                    bound = to_v - to_destination[i]
+            return bound
+
+        return lower_bound
+
+class DynamicShortestPaths():
+    def __init__(self, graph, source) -> None:
+        """
+        Function description:
+            Constructor for DynamicShortestPaths, a shortest path tree from one source that is kept up to date as
+            arc weights change, see CSRGraph.set_weight.
+
+            A change only repairs the part of the tree it affects, in the style of Ramalingam and Reps. A lighter
+            arc u -> v can only shorten v and the vertices reached through it, so a dijkstra is started from v and
+            stops spreading where distances do not improve. A heavier arc only matters if it is the tree arc of v,
+            then the affected vertices are the subtree of v, each gets the best distance through an unaffected
+            in-neighbour and a dijkstra restricted to the subtree settles the rest.
+
+        :Input:
+            graph (CSRGraph): The graph, with non-negative weights.
+            source (int): The source vertex of the tree.
+
+        :Attributes:
+            graph, source: The inputs.
+            version: The version of the graph the tree is up to date with, see CSRGraph.
+            distances: The distance of every vertex from the source, inf if it cannot be reached.
+            previous: The parent of every vertex in the tree, -1 if it has none.
+            previous_arc: The arc from the parent of every vertex, -1 if it has none.
+
+        :Time complexity:
+            O((|V| + |E|) * log|V|) where |V| is the number of vertices and |E| is the number of edges.
+
+        :Aux space complexity:
+            O(|V|) where |V| is the number of vertices, and O(|E|) for the reverse adjacency if it is not built yet.
+        """
+        self.graph = graph
+        self.source = source
+        self.version = graph.version
+        if graph.reverse_offsets is None:
+            graph.build_reverse()
+
+        self.recompute()
+        graph.trees.add(self)
+
+    def recompute(self) -> None:
+        """
+        Function description:
+            Rebuilds the whole tree with a full run of dijkstra's algorithm.
+
+        :Time complexity:
+            O((|V| + |E|) * log|V|) where |V| is the number of vertices and |E| is the number of edges.
+
+        :Aux space complexity:
+            O(|V|) where |V| is the number of vertices.
+        """
+        offsets = self.graph.offsets
+        targets = self.graph.targets
+        weights = self.graph.weights
+
+        distances = [float('inf')] * self.graph.num_vertices
+        previous = array('i', [-1]) * self.graph.num_vertices
+        previous_arc = array('q', [-1]) * self.graph.num_vertices
+        distances[self.source] = 0
+
+        priority_queue = [(0, self.source)]
+        while priority_queue:
+            current_distance, u = heapq.heappop(priority_queue)
+            if current_distance > distances[u]:
+                continue
+
+            for arc in range(offsets[u], offsets[u + 1]):
+                v = targets[arc]
+                new_distance = current_distance + weights[arc]
+                if new_distance < distances[v]:
+                    distances[v] = new_distance
+                    previous[v] = u
+                    previous_arc[v] = arc
+                    heapq.heappush(priority_queue, (new_distance, v))
+
+        self.distances = distances
+        self.previous = previous
+        self.previous_arc = previous_arc
+        self.version = self.graph.version
+
+    def check(self) -> None:
+        """
+        Function description:
+            Raises a ValueError if the graph changed in a way set_weight could not repair. After a deduplicate
+            recompute brings the tree up to date again, after an add_edge on the Graph it was frozen from the tree
+            belongs to the replaced graph and a new one has to be built.
+
+        :Time complexity:
+            O(1)
+
+        :Aux space complexity:
+            O(1)
+        """
+        if self.graph.version != self.version:
+            raise ValueError("the shortest path tree no longer matches its graph, recompute it or build a new one")
+
+    def distance(self, vertex):
+        """
+        Function description:
+            Returns the current distance of a vertex from the source.
+
+        :Input:
+            vertex (int): The vertex.
+
+        :Output:
+            The distance, inf if the vertex cannot be reached.
+
+        :Time complexity:
+            O(1)
+
+        :Aux space complexity:
+            O(1)
+        """
+        self.check()
+        return self.distances[vertex]
+
+    def all_distances(self) -> list:
+        """
+        Function description:
+            Returns the current distance of every vertex from the source.
+
+        :Output:
+            A list of distances indexed by vertex, inf where a vertex cannot be reached.
+
+        :Time complexity:
+            O(|V|) where |V| is the number of vertices.
+
+        :Aux space complexity:
+            O(|V|) where |V| is the number of vertices.
+        """
+        self.check()
+        return list(self.distances)
+
+    def path(self, vertex) -> list:
+        """
+        Function description:
+            Returns the current shortest path from the source to a vertex, just the vertex if it cannot be reached.
+
+        :Input:
+            vertex (int): The destination vertex.
+
+        :Output:
+            A list of vertices from the source to the destination.
+
+        :Time complexity:
+            O(n) where n is the number of vertices in the path.
+
+        :Aux space complexity:
+            O(n) where n is the number of vertices in the path.
+        """
+        self.check()
+        return self.graph.build_path(self.previous, vertex)
+
+    def update_arc(self, u, arc, old_weight) -> int:
+        """
+        Function description:
+            Repairs the tree after the weight of an arc has been changed, called by CSRGraph.set_weight.
+
+        :Input:
+            u (int): The source vertex of the arc.
+            arc (int): The position of the arc, its new weight is already in the weight buffer.
+            old_weight: The weight the arc had before.
+
+        :Output:
+            The number of vertices whose distance changed.
+
+        :Time complexity:
+            O((a + e) * log a) where a is the number of vertices whose distance or parent changed and e the number of arcs leaving
+            or, for a heavier tree arc, entering them.
+
+        :Aux space complexity:
+            O(a) where a is the number of affected vertices.
+        """
+        offsets = self.graph.offsets
+        targets = self.graph.targets
+        weights = self.graph.weights
+        distances = self.distances
+        previous = self.previous
+        previous_arc = self.previous_arc
+        v = targets[arc]
+        new_weight = weights[arc]
+
+        if new_weight < old_weight:
+            # a lighter arc only helps if it shortens v, the improvement then spreads from v like a dijkstra
+            if distances[u] + new_weight >= distances[v]:
+                return 0
+
+            distances[v] = distances[u] + new_weight
+            previous[v] = u
+            previous_arc[v] = arc
+            changed = {v}
+            priority_queue = [(distances[v], v)]
+            while priority_queue:
+                current_distance, x = heapq.heappop(priority_queue)
+                if current_distance > distances[x]:
+                    continue
+
+                for next_arc in range(offsets[x], offsets[x + 1]):
+                    y = targets[next_arc]
+                    new_distance = current_distance + weights[next_arc]
+                    if new_distance < distances[y]:
+                        distances[y] = new_distance
+                        previous[y] = x
+                        previous_arc[y] = next_arc
+                        changed.add(y)
+                        heapq.heappush(priority_queue, (new_distance, y))
+            return len(changed)
+
+        # a heavier arc that is not in the tree changes no distance
+        if new_weight == old_weight or previous_arc[v] != arc:
+            return 0
+
+        # the affected vertices are the subtree of v, the children of x are the targets of its arcs that are their tree arc
+        affected = {v: distances[v]}
+        stack = [v]
+        while stack:
+            x = stack.pop()
+            for next_arc in range(offsets[x], offsets[x + 1]):
+                y = targets[next_arc]
+                if previous_arc[y] == next_arc and y not in affected:
+                    affected[y] = distances[y]
+                    stack.append(y)
+
+        # every affected vertex first takes its best distance through an unaffected in-neighbour, whose distance is final
+        reverse_offsets = self.graph.reverse_offsets
+        reverse_sources = self.graph.reverse_sources
+        reverse_arcs = self.graph.reverse_arcs
+        priority_queue = []
+        for x in affected:
+            distances[x] = float('inf')
+            previous[x] = -1
+            previous_arc[x] = -1
+            for reverse_arc in range(reverse_offsets[x], reverse_offsets[x + 1]):
+                p = reverse_sources[reverse_arc]
+                if p in affected:
+                    continue
+                new_distance = distances[p] + weights[reverse_arcs[reverse_arc]]
+                if new_distance < distances[x]:
+                    distances[x] = new_distance
+                    previous[x] = p
+                    previous_arc[x] = reverse_arcs[reverse_arc]
+            if distances[x] < float('inf'):
+                priority_queue.append((distances[x], x))
+        heapq.heapify(priority_queue)
+
+        # then a dijkstra restricted to the affected vertices settles the paths that run through the subtree
+        while priority_queue:
+            current_distance, x = heapq.heappop(priority_queue)
+            if current_distance > distances[x]:
+                continue
+
+            for next_arc in range(offsets[x], offsets[x + 1]):
+                y = targets[next_arc]
+                if y not in affected:
+                    continue
+                new_distance = current_distance + weights[next_arc]
+                if new_distance < distances[y]:
+                    distances[y] = new_distance
+                    previous[y] = x
+                    previous_arc[y] = next_arc
+                    heapq.heappush(priority_queue, (new_distance, y))
+
+        changed = 0
+        for x, old_distance in affected.items():
+            if distances[x] != old_distance:
+                changed += 1
+        return changed
+
+class Graph():
+    def __init__(self, num_vertices, compact = False) -> None:
+        """
+        Function description:
+            Constructor for Graph.
+            
+            This uses an adjacency list representation, or when compact is set, flat edge buffers
+            that are bulk frozen into a CSRGraph before searching.
+
+        :Input:
+            num_vertices (int): The number of vertices in the graph.
+            compact (bool): indicates if the graph stores its edges in flat buffers instead of Vertex and Edge objects.
+
+        :Attributes:
+            num_vertices: The number of vertices in the graph.
+            compact: indicates if the graph stores its edges in flat buffers.
+            vertices: A list of vertices in the graph, None if compact.
+            edge_sources, edge_targets, edge_weights: Buffers of the edges added since the last freeze, only used if compact.
+            csr: The CSRGraph built by freeze, None if the graph has changed since.
+            space: The SearchSpace reused by dijkstra, created on the first search.
+
+        :Time complexity:
+            O(n) where n is the number of vertices
+
+        :Aux space complexity:
+            O(n) where n is the number of vertices
+        """
+        self.num_vertices = num_vertices
+        self.compact = compact
+        self.csr = None
+        self.space = None
+
+        if compact:
+            self.vertices = None
+            self.edge_sources = array('i')
+            self.edge_targets = array('i')
+            self.edge_weights = array('q')
+        else:
+            self.vertices = [None] * num_vertices
+
+            for i in range(num_vertices):
+                self.vertices[i] = Vertex(i)
+
+    def reset(self) -> None:
+        """
+        Function description:
+            Resets the vertices to its original state.
+
+        :Time complexity:
+            O(n) where n is the number of vertices in self.vertices.
+
+        :Aux space complexity:
+            O(1)
+        """
+        if self.vertices is None:
+            return
+
+        for vertex in self.vertices:
+            vertex.reset_vertex()
+
+    def add_edge(self, u, v, w, directed = True) -> None:
+        """
+        Function description:
+            Adds an edge.
+
+        :Input:
+            u (Vertex): source vertex of the edge.
+            v (Vertex): destination vertex of the edge.
+            w (int): weight of the edge, which in this case is the time.
+            directed (bool): indicates if the edge is directed or undirected,
+                             if undirected, adds edges to and from vertexes.
+        
+        :Time complexity:
+            O(1), amortised O(|E|) the first time after a freeze of a compact graph
+
+        :Aux space complexity:
+            O(1)
+        """
+        if self.compact:
+            # expand the frozen arcs back into the buffers so the next freeze includes them
+            if self.csr is not None:
+                self.edge_sources, self.edge_targets, self.edge_weights = self.csr.edge_arrays()
+                self.csr.retire()
+                self.csr = None
+
+            # the weight buffer holds integers until the first non integer weight is added
+            if self.edge_weights.typecode == 'q' and not isinstance(w, int):
+                self.edge_weights = array('d', self.edge_weights)
+
+            self.edge_sources.append(u)
+            self.edge_targets.append(v)
+            self.edge_weights.append(w)
+
+            if directed == False:
+                self.edge_sources.append(v)
+                self.edge_targets.append(u)
+                self.edge_weights.append(w)
+            return
+
+        if self.csr is not None:
+            self.csr.retire()
+            self.csr = None
+
+        current_edge = Edge(u, v, w)
+        current_vertex = self.vertices[u]
+        current_vertex.append_edge(current_edge)
+
+        if directed == False:
+            current_edge = Edge(v, u, w)
+            current_vertex = self.vertices[v]
+            current_vertex.append_edge(current_edge)
+
+    def freeze(self, deduplicate = False) -> CSRGraph:
+        """
+        Function description:
+            Bulk converts the edges of the graph into a CSRGraph, which is cached until the next add_edge. The
+            reverse adjacency is left for the searches that need it to build, see CSRGraph.build_reverse.
+
+            A compact graph hands its edge buffers over to the CSRGraph, so the edges are only stored once.
+
+        :Input:
+            deduplicate (bool): indicates if parallel edges are collapsed into the lightest one, see CSRGraph.deduplicate,
+                                only used when the graph is not frozen yet.
+
+        :Output:
+            The CSRGraph of the graph.
+
+        :Time complexity:
+            O(|V| + |E|) where |V| is the number of vertices and |E| is the number of edges, O(1) if already frozen.
+
+        :Aux space complexity:
+            O(|V| + |E|) where |V| is the number of vertices and |E| is the number of edges.
+        """
+        if self.csr is not None:
+            return self.csr
+
+        if self.compact:
+            self.csr = CSRGraph.from_edges(self.num_vertices, self.edge_sources, self.edge_targets, self.edge_weights)
+            self.edge_sources = array('i')
+            self.edge_targets = array('i')
+            self.edge_weights = array('q')
+        else:
+            # gather the edges of every vertex, in order, into flat buffers
+            sources = array('i')
+            targets = array('i')
+            weights = array('q')
+            for vertex in self.vertices:
+                for edge in vertex.edges:
+                    if weights.typecode == 'q' and not isinstance(edge.w, int):
+                        weights = array('d', weights)
+                    sources.append(edge.u)
+                    targets.append(edge.v)
+                    weights.append(edge.w)
+            self.csr = CSRGraph.from_edges(self.num_vertices, sources, targets, weights)
+
+        if deduplicate:
+            self.csr.deduplicate()
+
+        return self.csr
+
+    def set_weight(self, u, v, w, directed = True) -> int:
+        """
+        Function description:
+            Changes the weight of the edge from u to v, the graph is frozen first and the shortest path trees of
+            the frozen graph are repaired, see CSRGraph.set_weight.
+
+        :Input:
+            u (int): source vertex of the edge.
+            v (int): destination vertex of the edge.
+            w (int): the new weight of the edge.
+            directed (bool): indicates if the edge from v to u changes as well.
+
+        :Output:
+            The total number of vertices whose distance changed in the trees of the graph.
+
+        :Time complexity:
+            O(d) where d is the number of edges leaving u and v, plus the repair of each tree, O(|V| + |E|) if the graph has to be frozen first.
+
+        :Aux space complexity:
+            O(1), plus the repair of each tree.
+        """
+        changed = self.freeze().set_weight(u, v, w)
+        if directed == False:
+            changed += self.csr.set_weight(v, u, w)
+
+        # the edge objects are the source of the next freeze, so they have to change too
+        if not self.compact:
+            for a, b in ((u, v), (v, u)) if directed == False else ((u, v),):
+                for edge in self.vertices[a].edges:
+                    if edge.v == b:
+                        edge.w = w
+                        break
+
+        return changed
+
+    def shortest_path_tree(self, source):
+        """
+        Function description:
+            Builds a shortest path tree from the source that set_weight keeps up to date, see DynamicShortestPaths.
+
+        :Input:
+            source (int): The source vertex.
+
+        :Output:
+            A DynamicShortestPaths over the frozen graph.
+
+        :Time complexity:
+            O((|V| + |E|) * log|V|) where |V| is the number of vertices and |E| is the number of edges.
+
+        :Aux space complexity:
+            O(|V| + |E|) where |V| is the number of vertices and |E| is the number of edges.
+        """
+        return self.freeze().shortest_path_tree(source)
+
+    def build_path(self, vertex) -> list:
+        """
+        Function description:
+            Builds the path from the starting vertex to the given vertex, from the flat predecessor array of the
+            search space of the last search. Before any search the path is just the vertex.
+
+        :Input:
+            vertex (int): The destination vertex.
+
+        :Output:
+            A list containing the path from the starting vertex to the given vertex.
+
+        :Time complexity:
+            O(n) where n is the number of vertices in the path.
+
+        :Aux space complexity:
+            O(n) where n is the number of vertices in the path.
+        """
+        if self.space is None:
+            return [vertex]
+
+        previous = self.space.previous
+        path = []
+        while vertex != -1:
+            path.append(vertex)
+            vertex = previous[vertex]
+        path.reverse()
+        return path
+
+    def dijkstra(self, source, destination, queue = None):
+        """
+        Function description:
+            Dijkstra's algorithm to find the shortest path between the source and destination vertices.
+            The search stops as soon as the destination is settled rather than exploring the whole graph, and the
+            visited flags and distances are kept in an epoch stamped SearchSpace so no O(|V|) reset is needed first.
+
+        :Input:
+            source (int): The starting vertex.
+            destination (int): The ending vertex.
+            queue (type): The PriorityQueue class to search with, the graph is frozen if one is given, see CSRGraph.dijkstra_many.
+
+        :Output:
+            A tuple containing the shortest path distance and the path as a list of vertex indices.
+
+        :Time complexity:
+            O((|V| + |E|) * log|V|) where |V| is the number of vertices and |E| is the number of edges in the graph.
+
+        :Aux space complexity:
+            O(|V|) where |V| is the number of vertices in the graph.
+        """
+        # compact or frozen graphs are searched over the flat arc buffers of the CSRGraph
+        if self.compact or self.csr is not None or queue is not None:
+            return self.freeze().dijkstra(source, destination, queue or LazyHeapQueue)
+
+        distance = self.search(source, destination)
+
+        # an unreached destination keeps the previous vertex of an older search, so its path is just itself
+        if distance == float('inf'):
+            return distance, [destination]
+
+        # return the shortest distance and the path to the destination vertex
+        return distance, self.build_path(destination)
+
+    def dijkstra_distance(self, source, destination, queue = None):
+        """
+        Function description:
+            Dijkstra's algorithm for the distance between the source and destination vertices alone, the path is
+            never built, see dijkstra.
+
+        :Input:
+            source (int): The starting vertex.
+            destination (int): The ending vertex.
+            queue (type): The PriorityQueue class to search with, the graph is frozen if one is given, see CSRGraph.dijkstra_many.
+
+        :Output:
+            The shortest path distance, inf if the destination cannot be reached.
+
+        :Time complexity:
+            O((|V| + |E|) * log|V|) where |V| is the number of vertices and |E| is the number of edges in the graph.
+
+        :Aux space complexity:
+            O(|V|) where |V| is the number of vertices in the graph.
+        """
+        if self.compact or self.csr is not None or queue is not None:
+            return self.freeze().dijkstra_distance(source, destination, queue or LazyHeapQueue)
+        return self.search(source, destination)
+
+    def search(self, source, destination):
+        """
+        Function description:
+            The search of dijkstra over the Vertex and Edge objects, which leaves the predecessors in the search space
+            for build_path.
+
+        :Input:
+            source (int): The starting vertex.
+            destination (int): The ending vertex.
+
+        :Output:
+            The shortest path distance, inf if the destination cannot be reached.
+
+        :Time complexity:
+            O((|V| + |E|) * log|V|) where |V| is the number of vertices and |E| is the number of edges in the graph.
+
+        :Aux space complexity:
+            O(|V|) where |V| is the number of vertices in the graph.
+        """
+        # start a new epoch of the search space instead of resetting every vertex, labels from earlier searches no longer count
+        if self.space is None:
+            self.space = SearchSpace(self.num_vertices)
+        epoch = self.space.begin()
+        labelled = self.space.labelled
+        settled = self.space.settled
+        vertex_distances = self.space.distances
+
+        previous = self.space.previous
+
+        # set the distance of the source vertex to 0, it is the only vertex whose previous vertex has to be cleared as every other vertex on a path gets its previous vertex in this search
+        labelled[source] = epoch
+        vertex_distances[source] = 0
+        previous[source] = -1
+
+        # create a priority queue and add the source vertex with distance 0
+        priority_queue = [(0, source)]
+
+        # process vertices in the priority queue until it's empty
+        while priority_queue:
+            # get the vertex with the smallest distance from the priority queue
+            current_distance, current_vertex_id = heapq.heappop(priority_queue)
+
+            # skip the vertex if it has been visited already
+            if settled[current_vertex_id] == epoch:
+                continue
+
+            # mark the current vertex as visited
+            settled[current_vertex_id] = epoch
+
+            # stop once the destination is settled, its distance and path can no longer change
+            if current_vertex_id == destination:
+                break
+
+            # iterate over the edges of the current vertex
+            for edge in self.vertices[current_vertex_id].edges:
+                # get the neighbor vertex id
+                neighbor_vertex_id = edge.v
+                if neighbor_vertex_id == current_vertex_id:
+                    neighbor_vertex_id = edge.u 
+
+                # skip the neighbor vertex if it has been visited already
+                if settled[neighbor_vertex_id] == epoch:
+                    continue
+
+                # update the neighbor vertex's distance and previous vertex if the new distance is smaller, a vertex not labelled in this epoch counts as infinitely far
+                new_neighbor_distance = current_distance + edge.w
+                if labelled[neighbor_vertex_id] != epoch or new_neighbor_distance < vertex_distances[neighbor_vertex_id]:
+                    labelled[neighbor_vertex_id] = epoch
+                    vertex_distances[neighbor_vertex_id] = new_neighbor_distance
+                    previous[neighbor_vertex_id] = current_vertex_id
+
+                    # add the neighbor vertex with the updated distance to the priority queue
+                    heapq.heappush(priority_queue, (new_neighbor_distance, neighbor_vertex_id))
+
+        if labelled[destination] != epoch:
+            return float('inf')
+        return vertex_distances[destination]
+
+    def dijkstra_many(self, source, destinations, queue = LazyHeapQueue):
+        """
+        Function description:
+            Dijkstra's algorithm from the source to many destinations in one search, the graph is frozen first,
+            see CSRGraph.dijkstra_many.
+
+        :Input:
+            source (int): The starting vertex.
+            destinations (list): The ending vertices.
+            queue (type): The PriorityQueue class the search uses.
+
+        :Output:
+            A ShortestPaths with the distance of every destination, the paths are only built when asked for.
+
+        :Time complexity:
+            O((|V| + |E|) * log|V|) where |V| is the number of vertices and |E| is the number of edges in the graph.
+
+        :Aux space complexity:
+            O(|V|) where |V| is the number of vertices in the graph.
+        """
+        return self.freeze().dijkstra_many(source, destinations, queue)
+
+    def bidirectional_dijkstra(self, source, destination):
+        """
+        Function description:
+            Bidirectional Dijkstra's algorithm to find the shortest path between the source and destination vertices,
+            the graph is frozen first so the backward search can use the reverse adjacency, see CSRGraph.bidirectional_dijkstra.
+
+        :Input:
+            source (int): The starting vertex.
+            destination (int): The ending vertex.
+
+        :Output:
+            A tuple containing the shortest path distance and the path as a list of vertex indices.
+
+        :Time complexity:
+            O((|V| + |E|) * log|V|) where |V| is the number of vertices and |E| is the number of edges in the graph.
+
+        :Aux space complexity:
+            O(|V|) where |V| is the number of vertices in the graph.
+        """
+        return self.freeze().bidirectional_dijkstra(source, destination)
+
+    def build_landmarks(self, count = 8) -> Landmarks:
+        """
+        Function description:
+            Chooses landmarks and precomputes their distance tables for astar, the graph is frozen first,
+            see Landmarks.build. The tables stay valid until the graph changes, astar raises a ValueError once
+            set_weight or add_edge has been called since.
+
+        :Input:
+            count (int): The number of landmarks.
+
+        :Output:
+            The Landmarks of the graph.
+
+        :Time complexity:
+            O(k * (|V| + |E|) * log|V|) where k is the number of landmarks, |V| is the number of vertices and |E| is the number of edges.
+
+        :Aux space complexity:
+            O(k * |V| + |E|) where k is the number of landmarks, |V| is the number of vertices and |E| is the number of edges.
+        """
+        return Landmarks.build(self.freeze(), count)
+
+    def astar(self, source, destination, landmarks):
+        """
+        Function description:
+            A* search with ALT landmark lower bounds between the source and destination vertices, the graph is
+            frozen first, see CSRGraph.astar.
+
+        :Input:
+            source (int): The starting vertex.
+            destination (int): The ending vertex.
+            landmarks (Landmarks): The landmarks returned by build_landmarks.
+
+        :Output:
+            A tuple containing the shortest path distance and the path as a list of vertex indices.
+
+        :Time complexity:
+            O((|V| + |E|) * (k + log|V|)) where |V| is the number of vertices, |E| is the number of edges and k the number of landmarks.
+
+        :Aux space complexity:
+            O(|V|) where |V| is the number of vertices in the graph.
+        """
+        return self.freeze().astar(source, destination, landmarks)
+    
+    def __str__(self) -> str:
+        """
+        Function description:
+            Returns a string representation of the graph.
+        
+        :Output:
+            A string representing the graph in the format "vertex1, vertex2, ...".
+
+        :Time complexity:
+            O(n) where n is the number of vertices in the graph.
+
+        :Aux space complexity:
+            O(n) where n is the number of vertices in the graph.
+        """
+        if self.compact:
+            return str(self.freeze())
+
+        return "\n".join(str(vertex) for vertex in self.vertices)
+    
+class HierarchyPaths():
+    def __init__(self, hierarchy, source, forward_distances, forward_previous) -> None:
+        """
+        Function description:
+            Constructor for HierarchyPaths, the result of ContractionHierarchy.dijkstra_many, with the same
+            distance and path methods as ShortestPaths.
+
+        :Input:
+            hierarchy (ContractionHierarchy): The hierarchy that was searched.
+            source (int): The starting vertex of the search.
+            forward_distances (dict): The upward distance of each vertex reached from the source.
+            forward_previous (dict): The (vertex, middle) arc each forward vertex was reached by.
+
+        :Attributes:
+            The inputs, under the same names.
+            distances: The distance of each destination.
+            meetings: The vertex where the forward and backward search met, for each destination.
+            backward_next: The (vertex, middle) arc leading towards the destination, for each destination.
+            paths: The paths unpacked so far, keyed by their destination.
+
+        :Time complexity:
+            O(1)
+
+        :Aux space complexity:
+            O(1)
+        """
+        self.hierarchy = hierarchy
+        self.source = source
+        self.forward_distances = forward_distances
+        self.forward_previous = forward_previous
+        self.distances = {}
+        self.meetings = {}
+        self.backward_next = {}
+        self.paths = {}
+
+    def distance(self, vertex):
+        """
+        Function description:
+            Returns the shortest path distance from the source to the given vertex.
+
+        :Input:
+            vertex (int): A destination of the search.
+
+        :Output:
+            The shortest path distance, inf if the vertex cannot be reached.
+
+        :Time complexity:
+            O(1)
+
+        :Aux space complexity:
+            O(1)
+        """
+        return self.distances[vertex]
+
+    def path(self, vertex) -> list:
+        """
+        Function description:
+            Returns the shortest path from the source to the given vertex, the shortcuts on it are unpacked
+            the first time it is asked for and the path is then cached.
+
+        :Input:
+            vertex (int): A destination of the search.
+
+        :Output:
+            A list containing the path from the source to the given vertex.
+
+        :Time complexity:
+            O(n * d) where n is the number of vertices in the path and d the largest number of arcs of a vertex in the hierarchy.
+
+        :Aux space complexity:
+            O(n) where n is the number of vertices in the path.
+        """
+        if vertex in self.paths:
+            return self.paths[vertex]
+
+        meeting_vertex = self.meetings[vertex]
+        if meeting_vertex == -1:
+            self.paths[vertex] = [vertex]
+            return self.paths[vertex]
+
+        # the upward arcs from the source to the meeting vertex, followed back from the meeting vertex
+        arcs = []
+        current = meeting_vertex
+        while current in self.forward_previous:
+            previous, middle = self.forward_previous[current]
+            arcs.append((previous, current, middle))
+            current = previous
+        arcs.reverse()
+
+        # then the downward arcs from the meeting vertex to the destination
+        backward_next = self.backward_next[vertex]
+        current = meeting_vertex
+        while current in backward_next:
+            following, middle = backward_next[current]
+            arcs.append((current, following, middle))
+            current = following
+
+        path = [self.source]
+        for u, v, middle in arcs:
+            self.hierarchy.unpack(u, v, middle, path)
+
+        self.paths[vertex] = path
+        return path
+
+    def route(self, vertex, num_locations) -> list:
+        """
+        Function description:
+            Returns the route to the given vertex of a layered graph as locations, with the moves between layers
+            removed, in one pass over the unpacked path, see ShortestPaths.route.
+
+        :Input:
+            vertex (int): A destination of the search.
+            num_locations (int): The number of locations in each layer.
+
+        :Output:
+            A list of the locations on the route.
+
+        :Time complexity:
+            O(n * d) where n is the number of vertices in the path and d the largest number of arcs of a vertex in the hierarchy.
+
+        :Aux space complexity:
+            O(n) where n is the number of vertices in the path.
+        """
+        route = []
+        for current in self.path(vertex):
+            location = current % num_locations
+            if not route or route[-1] != location:
+                route.append(location)
+        return route
+
+class ContractionHierarchy():
+    def __init__(self, num_vertices, rank, up_offsets, up_targets, up_weights, up_middles, down_offsets, down_sources, down_weights, down_middles) -> None:
+        """
+        Function description:
+            Constructor for ContractionHierarchy, a preprocessed graph for fast point-to-point queries.
+
+            Vertices are contracted one at a time in order of rank, each contraction adds shortcut arcs
+            between its remaining neighbours where no other path is as short. Every arc, original or shortcut,
+            then leads from a lower to a higher ranked vertex or the other way round. The upward arcs are
+            stored by their source like CSRGraph, the downward arcs by their target so a backward search from
+            the destination can also move upwards. A shortcut records the middle vertex it skips, -1 for an
+            original arc.
+
+        :Input:
+            num_vertices (int): The number of vertices in the graph.
+            rank (array): The contraction order of each vertex.
+            up_offsets, up_targets, up_weights, up_middles (array): The upward arcs, by source vertex.
+            down_offsets, down_sources, down_weights, down_middles (array): The downward arcs, by target vertex.
+
+        :Attributes:
+            The inputs, under the same names.
+            graph: A weak reference to the CSRGraph the hierarchy belongs to, None when it is not known.
+            version: The version of that graph the hierarchy was built for, see CSRGraph.
+
+        :Time complexity:
+            O(1)
+
+        :Aux space complexity:
+            O(1)
+        """
+        self.num_vertices = num_vertices
+        self.rank = rank
+        self.up_offsets = up_offsets
+        self.up_targets = up_targets
+        self.up_weights = up_weights
+        self.up_middles = up_middles
+        self.down_offsets = down_offsets
+        self.down_sources = down_sources
+        self.down_weights = down_weights
+        self.down_middles = down_middles
+        self.graph = None
+        self.version = 0
+
+    @classmethod
+    def build(cls, graph, settle_limit = 64):
+        """
+        Function description:
+            Preprocesses a CSRGraph into a ContractionHierarchy.
+
+            The next vertex to contract is the one with the smallest edge difference, the number of shortcuts
+            its contraction adds minus the arcs it removes, plus the number of its neighbours already
+            contracted so the contractions spread evenly over the graph. Priorities are updated lazily, a
+            vertex popped from the queue is only contracted if its recomputed priority is still the smallest.
+
+            A shortcut u -> w through v is skipped when a witness search, a Dijkstra from u that avoids v,
+            finds a path to w that is no longer. The witness search gives up after settle_limit vertices, which
+            may add a shortcut that is not needed but never leaves one out.
+
+        :Input:
+            graph (CSRGraph): The graph to preprocess, with non-negative weights.
+            settle_limit (int): The number of vertices each witness search may settle.
+
+        :Output:
+            A ContractionHierarchy of the graph.
+
+        :Time complexity:
+            O(|V| * d^2 * s log s) where |V| is the number of vertices, d the largest degree during contraction
+            and s the settle limit.
+
+        :Aux space complexity:
+            O(|V| + |E| + S) where |E| is the number of edges and S the number of shortcuts.
+        """
+        num_vertices = graph.num_vertices
+        inf = float('inf')
+
+        # the remaining graph as a dictionary per vertex, mapping each neighbour to (weight, middle) so parallel arcs collapse into the lightest
+        out_arcs = [{} for _ in range(num_vertices)]
+        in_arcs = [{} for _ in range(num_vertices)]
+        for u in range(num_vertices):
+            for arc in range(graph.offsets[u], graph.offsets[u + 1]):
+                v = graph.targets[arc]
+                w = graph.weights[arc]
+                if v != u and (v not in out_arcs[u] or w < out_arcs[u][v][0]):
+                    out_arcs[u][v] = (w, -1)
+                    in_arcs[v][u] = (w, -1)
+
+        def witness_distances(u, skipped, limit):
+            # a dijkstra from u over the remaining graph without the skipped vertex, bounded by distance and settled vertices
+            distances = {u: 0}
+            settled = 0
+            queue = [(0, u)]
+            while queue and settled < settle_limit:
+                current_distance, x = heapq.heappop(queue)
+                if current_distance > distances[x]:
+                    continue
+                if current_distance > limit:
+                    break
+                settled += 1
+                for y, (w, _) in out_arcs[x].items():
+                    if y != skipped and current_distance + w < distances.get(y, inf):
+                        distances[y] = current_distance + w
+                        heapq.heappush(queue, (current_distance + w, y))
+            return distances
+
+        def find_shortcuts(v):
+            shortcuts = []
+            if not out_arcs[v]:
+                return shortcuts
+            longest_out = max(w for w, _ in out_arcs[v].values())
+            for u, (w_uv, _) in in_arcs[v].items():
+                witness = witness_distances(u, v, w_uv + longest_out)
+                for x, (w_vx, _) in out_arcs[v].items():
+                    if x != u and witness.get(x, inf) > w_uv + w_vx:
+                        shortcuts.append((u, x, w_uv + w_vx))
+            return shortcuts
+
+        contracted_neighbours = array('i', [0]) * num_vertices
+        contracted = bytearray(num_vertices)
+
+        def priority(v, shortcuts):
+            return len(shortcuts) - len(in_arcs[v]) - len(out_arcs[v]) + contracted_neighbours[v]
+
+        queue = [(priority(v, find_shortcuts(v)), v) for v in range(num_vertices)]
+        heapq.heapify(queue)
+
+        rank = array('i', [0]) * num_vertices
+        up_arcs = [None] * num_vertices
+        down_arcs = [None] * num_vertices
+        next_rank = 0
+
+        while queue:
+            _, v = heapq.heappop(queue)
+            if contracted[v]:
+                continue
+
+            # lazy update, put the vertex back if it is no longer the cheapest to contract
+            shortcuts = find_shortcuts(v)
+            current_priority = priority(v, shortcuts)
+            if queue and current_priority > queue[0][0]:
+                heapq.heappush(queue, (current_priority, v))
+                continue
+
+            contracted[v] = 1
+            rank[v] = next_rank
+            next_rank += 1
+
+            # the arcs still attached to v all lead to vertices contracted later, so they become its upward and downward arcs
+            up_arcs[v] = [(x, w, middle) for x, (w, middle) in out_arcs[v].items()]
+            down_arcs[v] = [(u, w, middle) for u, (w, middle) in in_arcs[v].items()]
+            for x in out_arcs[v]:
+                del in_arcs[x][v]
+                contracted_neighbours[x] += 1
+            for u in in_arcs[v]:
+                del out_arcs[u][v]
+                contracted_neighbours[u] += 1
+            out_arcs[v] = {}
+            in_arcs[v] = {}
+
+            for u, x, w in shortcuts:
+                if x not in out_arcs[u] or w < out_arcs[u][x][0]:
+                    out_arcs[u][x] = (w, v)
+                    in_arcs[x][u] = (w, v)
+
+        # flatten the arc lists into CSR buffers
+        weight_typecode = graph.weights.typecode
+        up_offsets = array('q', [0]) * (num_vertices + 1)
+        up_targets = array('i')
+        up_weights = array(weight_typecode)
+        up_middles = array('i')
+        down_offsets = array('q', [0]) * (num_vertices + 1)
+        down_sources = array('i')
+        down_weights = array(weight_typecode)
+        down_middles = array('i')
+        for v in range(num_vertices):
+            for x, w, middle in up_arcs[v]:
+                up_targets.append(x)
+                up_weights.append(w)
+                up_middles.append(middle)
+            up_offsets[v + 1] = len(up_targets)
+            for u, w, middle in down_arcs[v]:
+                down_sources.append(u)
+                down_weights.append(w)
+                down_middles.append(middle)
+            down_offsets[v + 1] = len(down_sources)
+
+        hierarchy = cls(num_vertices, rank, up_offsets, up_targets, up_weights, up_middles, down_offsets, down_sources, down_weights, down_middles)
+        hierarchy.attach(graph)
+        return hierarchy
+
+    def attach(self, graph) -> None:
+        """
+        Function description:
+            Records the graph the hierarchy belongs to in its current version, queries raise a ValueError once the
+            graph has changed since or is gone, as when Graph.add_edge replaced it.
+
+        :Input:
+            graph (CSRGraph): The graph the hierarchy was built from.
+
+        :Time complexity:
+            O(1)
+
+        :Aux space complexity:
+            O(1)
+        """
+        self.graph = weakref.ref(graph)
+        self.version = graph.version
+
+    def buffers(self) -> list:
+        """
+        Function description:
+            Returns the buffers of the hierarchy, in the order taken by the constructor after num_vertices.
+
+        :Output:
+            A list of the nine buffers.
+
+        :Time complexity:
+            O(1)
+
+        :Aux space complexity:
+            O(1)
+        """
+        return [self.rank, self.up_offsets, self.up_targets, self.up_weights, self.up_middles,
+                self.down_offsets, self.down_sources, self.down_weights, self.down_middles]
+
+    def save(self, path) -> None:
+        """
+        Function description:
+            Writes the hierarchy to a binary file, a header with the number of vertices followed by each
+            buffer as its typecode, its length and its raw contents in native byte order.
+
+        :Input:
+            path (str): The file to write.
+
+        :Time complexity:
+            O(|V| + |E| + S) where |E| is the number of edges and S the number of shortcuts.
+
+        :Aux space complexity:
+            O(1)
+        """
+        with open(path, 'wb') as file:
+            file.write(b'CH01')
+            file.write(struct.pack('<q', self.num_vertices))
+            for buffer in self.buffers():
+                file.write(struct.pack('<cq', buffer.typecode.encode(), len(buffer)))
+                file.write(memoryview(buffer).cast('B'))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Function description:
+            Reads a hierarchy written by save.
+
+        :Input:
+            path (str): The file to read.
+
+        :Output:
+            The ContractionHierarchy stored in the file.
+
+        :Time complexity:
+            O(|V| + |E| + S) where |E| is the number of edges and S the number of shortcuts.
+
+        :Aux space complexity:
+            O(|V| + |E| + S) where |E| is the number of edges and S the number of shortcuts.
+        """
+        with open(path, 'rb') as file:
+            if file.read(4) != b'CH01':
+                raise ValueError(f"{path} is not a saved ContractionHierarchy")
+            num_vertices, = struct.unpack('<q', file.read(8))
+            buffers = []
+            for _ in range(9):
+                typecode, length = struct.unpack('<cq', file.read(9))
+                buffer = array(typecode.decode())
+                buffer.fromfile(file, length)
+                buffers.append(buffer)
+
+        return cls(num_vertices, *buffers)
+
+    def unpack(self, u, v, middle, path) -> None:
+        """
+        Function description:
+            Appends the vertices after u on the arc from u to v to the path, replacing every shortcut by the
+            two arcs it was made from, which are a downward arc into the middle vertex and an upward arc out of it.
+
+        :Input:
+            u (int): The source of the arc.
+            v (int): The target of the arc.
+            middle (int): The middle vertex of the arc, -1 for an original arc.
+            path (list): The path to extend.
+
+        :Time complexity:
+            O(n * d) where n is the number of vertices on the unpacked arc and d the largest number of arcs of a vertex in the hierarchy.
+
+        :Aux space complexity:
+            O(n) where n is the number of vertices on the unpacked arc.
+        """
+        stack = [(u, v, middle)]
+        while stack:
+            u, v, middle = stack.pop()
+            if middle == -1:
+                path.append(v)
+                continue
+
+            # the second half is pushed first so the first half is unpacked first
+            for arc in range(self.up_offsets[middle], self.up_offsets[middle + 1]):
+                if self.up_targets[arc] == v:
+                    stack.append((middle, v, self.up_middles[arc]))
+                    break
+            for arc in range(self.down_offsets[middle], self.down_offsets[middle + 1]):
+                if self.down_sources[arc] == u:
+                    stack.append((u, middle, self.down_middles[arc]))
+                    break
+
+    def dijkstra(self, source, destination):
+        """
+        Function description:
+            Finds the shortest path between the source and destination vertices, see dijkstra_many.
+
+        :Input:
+            source (int): The starting vertex.
+            destination (int): The ending vertex.
+
+        :Output:
+            A tuple containing the shortest path distance and the path as a list of vertex indices.
+
+        :Time complexity:
+            O(U log U) where U is the number of vertices reachable upwards from the source and destination.
+
+        :Aux space complexity:
+            O(U) where U is the number of vertices reachable upwards from the source and destination.
+        """
+        shortest_paths = self.dijkstra_many(source, [destination])
+        return shortest_paths.distance(destination), shortest_paths.path(destination)
+
+    def dijkstra_many(self, source, destinations):
+        """
+        Function description:
+            Finds the shortest paths from the source to each destination, with the same interface as
+            CSRGraph.dijkstra_many.
+
+            A forward search from the source only follows upward arcs and is run once for all destinations,
+            then for each destination a backward search only follows downward arcs against their direction.
+            Every shortest path in the graph has a highest ranked vertex where the two searches meet, so the
+            distance is the smallest sum of forward and backward distances over the vertices both reach. The
+            backward search stops once its queue minimum reaches the best sum. Both searches keep their labels
+            in dictionaries, so a query only touches the vertices it reaches. When several shortest paths exist
+            the returned one may differ from CSRGraph.dijkstra, the distance is always the same. Dijkstra keeps the
+            first path to settle each vertex, which depends on the order every closer vertex was settled in, while
+            this query only sees the vertices above the meeting vertex, so that order cannot be reproduced. A hierarchy whose
+            graph changed since it was attached raises a ValueError, see attach.
+
+        :Input:
+            source (int): The starting vertex.
+            destinations (list): The ending vertices.
+
+        :Output:
+            A HierarchyPaths with the distance of every destination, the paths are only unpacked when asked for.
+
+        :Time complexity:
+            O(k * U log U) where k is the number of destinations and U the number of vertices reachable upwards.
+
+        :Aux space complexity:
+            O(k * U) where k is the number of destinations and U the number of vertices reachable upwards.
+        """
+        # the shortcuts of a changed graph may no longer be shortest paths, and a graph that is gone was replaced
+        if self.graph is not None:
+            graph = self.graph()
+            if graph is None or graph.version != self.version:
+                raise ValueError("the hierarchy was built before the last change to the graph, build it again")
+
+        inf = float('inf')
+
+        forward_distances = {source: 0}
+        forward_previous = {}
+        queue = [(0, source)]
+        while queue:
+            current_distance, u = heapq.heappop(queue)
+            if current_distance > forward_distances[u]:
+                continue
+            for arc in range(self.up_offsets[u], self.up_offsets[u + 1]):
+                v = self.up_targets[arc]
+                new_distance = current_distance + self.up_weights[arc]
+                if new_distance < forward_distances.get(v, inf):
+                    forward_distances[v] = new_distance
+                    forward_previous[v] = (u, self.up_middles[arc])
+                    heapq.heappush(queue, (new_distance, v))
+
+        shortest_paths = HierarchyPaths(self, source, forward_distances, forward_previous)
+
+        for destination in destinations:
+            backward_distances = {destination: 0}
+            backward_next = {}
+            best = inf
+            meeting_vertex = -1
+            queue = [(0, destination)]
+            while queue:
+                current_distance, v = heapq.heappop(queue)
+                if current_distance >= best:
+                    break
+                if current_distance > backward_distances[v]:
+                    continue
+
+                # a vertex settled by both searches is a candidate meeting vertex
+                if v in forward_distances and forward_distances[v] + current_distance < best:
+                    best = forward_distances[v] + current_distance
+                    meeting_vertex = v
+
+                for arc in range(self.down_offsets[v], self.down_offsets[v + 1]):
+                    u = self.down_sources[arc]
+                    new_distance = current_distance + self.down_weights[arc]
+                    if new_distance < backward_distances.get(u, inf):
+                        backward_distances[u] = new_distance
+                        backward_next[u] = (v, self.down_middles[arc])
+                        heapq.heappush(queue, (new_distance, u))
+
+            shortest_paths.distances[destination] = best
+            shortest_paths.meetings[destination] = meeting_vertex
+            shortest_paths.backward_next[destination] = backward_next
+
+        return shortest_paths
+
+class BuildReport():
+    def __init__(self, num_locations, roads, transfer_edges, edges_added, edges_kept, build_time) -> None:
+        """
+        Function description:
+            Constructor for BuildReport, the statistics of building a layered graph.
+
+        :Input:
+            num_locations (int): The number of locations in each layer.
+            roads (int): The number of roads read.
+            transfer_edges (int): The number of zero-weight passenger edges added between the layers.
+            edges_added (int): The number of edges added before parallel edges were collapsed.
+            edges_kept (int): The number of edges in the finished graph.
+            build_time (float): The time taken to build the graph, in seconds.
+
+        :Attributes:
+            The inputs, under the same names.
+
+        :Time complexity:
+            O(1)
+
+        :Aux space complexity:
+            O(1)
+        """
+        self.num_locations = num_locations
+        self.roads = roads
+        self.transfer_edges = transfer_edges
+        self.edges_added = edges_added
+        self.edges_kept = edges_kept
+        self.build_time = build_time
+
+    def __str__(self) -> str:
+        """
+        Function description:
+            Returns a one line summary of the report.
+
+        :Output:
+            str: String representation of the report.
+
+        :Time complexity:
+            O(1)
+
+        :Aux space complexity:
+            O(1)
+        """
+        return (f"{self.num_locations * 2} vertices, {self.roads} roads, {self.transfer_edges} transfer edges, "
+                f"{self.edges_added} edges added, {self.edges_kept} kept, built in {self.build_time:.3f}s")
+
+def road_chunks(rows, chunk_size = 65536):
+    """
+    Function description:
+        Groups an iterable of (a, b, c, d) roads into column chunks, the form build_layered_graph_from_chunks reads.
+
+    Input:
+        rows: iterable of tuples (a, b, c, d) where a and b are integer vertices, c is the weight of the solo lane, and d is the weight of the carpool lane.
+        chunk_size: the number of roads in each chunk.
+
+    Output:
+        Generates tuples (a, b, c, d) of arrays, the vertex columns as 'i' arrays and the weight columns as 'q' arrays, or 'd' arrays once a chunk holds a non integer weight.
+
+    Time complexity:
+        O(r) where r is the number of roads.
+
+    Space complexity:
+        Auxiliary: O(chunk_size)
+    """
+    a, b, c, d = array('i'), array('i'), array('q'), array('q')
+    for row in rows:
+        if c.typecode == 'q' and not (isinstance(row[2], int) and isinstance(row[3], int)):
+            c = array('d', c)
+            d = array('d', d)
+        a.append(row[0])
+        b.append(row[1])
+        c.append(row[2])
+        d.append(row[3])
+
+        if len(a) == chunk_size:
+            yield a, b, c, d
+            a, b, c, d = array('i'), array('i'), array('q'), array('q')
+
+    if len(a):
+        yield a, b, c, d
+
+def stream_roads_csv(path, chunk_size = 65536):
+    """
+    Function description:
+        Streams the roads of a CSV file with one road a,b,c,d per line, a header line or blank lines are skipped.
+
+    Input:
+        path: the CSV file.
+        chunk_size: the number of roads in each chunk.
+
+    Output:
+        Generates column chunks of roads, see road_chunks.
+
+    Time complexity:
+        O(r) where r is the number of roads.
+
+    Space complexity:
+        Auxiliary: O(chunk_size), the file is read line by line.
+    """
+    def parse(text):
+        try:
+            return int(text)
+        except ValueError:
+            return float(text)
+
+    def rows(file):
+        for line in file:
+            fields = line.split(',')
+            if len(fields) < 4 or not fields[0].strip().lstrip('-').isdigit():
+                continue
+            yield int(fields[0]), int(fields[1]), parse(fields[2]), parse(fields[3])
+
+    with open(path) as file:
+        yield from road_chunks(rows(file), chunk_size)
+
+def write_roads_binary(path, roads, typecode = 'q'):
+    """
+    Function description:
+        Writes roads as fixed width binary records that stream_roads_binary can map, each road is the four fields a, b, c, d in the given array typecode and native byte order.
+
+    Input:
+        path: the file to write.
+        roads: iterable of tuples (a, b, c, d) with integer weights.
+        typecode: the array typecode of every field, 'q' or 'i'.
+
+    Output:
+        None
+
+    Time complexity:
+        O(r) where r is the number of roads.
+
+    Space complexity:
+        Auxiliary: O(1), the records are written one chunk at a time.
+    """
+    with open(path, 'wb') as file:
+        records = array(typecode)
+        for road in roads:
+            records.extend(road)
+            if len(records) >= 4 * 65536:
+                records.tofile(file)
+                records = array(typecode)
+        records.tofile(file)
+
+def stream_roads_binary(path, chunk_size = 65536, typecode = 'q'):
+    """
+    Function description:
+        Streams the roads of a file of fixed width binary records, see write_roads_binary, the file is memory mapped and each chunk is copied out of the mapping by strided slices of the records, so no tuple is made per road.
+
+    Input:
+        path: the binary file.
+        chunk_size: the number of roads in each chunk.
+        typecode: the array typecode of every field.
+
+    Output:
+        Generates column chunks of roads, see road_chunks.
+
+    Time complexity:
+        O(r) where r is the number of roads.
+
+    Space complexity:
+        Auxiliary: O(chunk_size), the pages of the mapping are loaded by the operating system as they are read.
+    """
+    size = os.path.getsize(path)
+    record_size = 4 * array(typecode).itemsize
+    if size % record_size != 0:
+        raise ValueError(f"{path} is not a whole number of {record_size} byte road records")
+    if size == 0:
+        return
+
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ) as mapping:
+        fields = memoryview(mapping).cast(typecode)
+        try:
+            for start in range(0, len(fields), 4 * chunk_size):
+                records = fields[start:start + 4 * chunk_size]
+                # released even when the generator is closed early, an exported view would stop the mapping from closing
+                try:
+                    yield array('i', records[0::4]), array('i', records[1::4]), array('q', records[2::4]), array('q', records[3::4])
+                finally:
+                    records.release()
+        finally:
+            fields.release()
+
+def load_roads(path, chunk_size = 65536, typecode = 'q'):
+    """
+    Function description:
+        Streams the roads of an edge file, a .csv file is read as text and any other file as binary records.
+
+    Input:
+        path: the edge file.
+        chunk_size: the number of roads in each chunk.
+        typecode: the array typecode the binary records were written with, see write_roads_binary.
+
+    Output:
+        Generates column chunks of roads, see road_chunks.
+
+    Time complexity:
+        O(r) where r is the number of roads.
+
+    Space complexity:
+        Auxiliary: O(chunk_size)
+    """
+    if path.lower().endswith('.csv'):
+        return stream_roads_csv(path, chunk_size)
+    return stream_roads_binary(path, chunk_size, typecode)
+
+def build_layered_graph_from_chunks(chunks, passengers):
+    """
+    Precondition:
+        chunks is an iterable of column chunks of roads, see road_chunks, passengers is a list of integers representing the passenger vertices.
+
+    Postcondition:
+        returns the same layered graph as build_layered_graph for the roads of the chunks, along with the number of locations per layer and a BuildReport.
+
+    Function description:
+        Builds the layered graph of optimalRoute in a single pass over the roads, learning the number of locations as it goes.
+
+    Approach description:
+        The carpool layer is offset by the number of locations, which is only known once every road has been read, so the solo edges and the not yet offset carpool edges are appended to separate flat buffers a chunk at a time, and the carpool buffer is shifted and joined to the solo one at the end. The solo arcs of a vertex all come before its carpool arcs either way, so the frozen graph is the same as when the edges are added road by road.
+
+    Input:
+        chunks: iterable of column chunks of roads.
+        passengers: list of integers representing the passenger vertices.
+
+    Output:
+        A tuple (graph, num_locations, report).
+
+    Time complexity:
+        where r is the number of roads in the graph, p the number of passengers and l is the number of locations
+
+        Best Case: O(r + p + l)
+        Worst Case: O(r + p + l)
+
+    Space complexity:
+        Auxiliary: O(r + p + l), the edge buffers become the buffers of the graph and at most one chunk is held besides them.
+    """
+    build_start = time.perf_counter()
+
+    sources, targets, weights = array('i'), array('i'), array('q')
+    carpool_sources, carpool_targets, carpool_weights = array('i'), array('i'), array('q')
+    max_location = 0
+    num_roads = 0
+    for a, b, c, d in chunks:
+        if len(a) == 0:
+            continue
+        max_location = max(max_location, max(a), max(b))
+        num_roads += len(a)
+
+        # the weight buffers hold integers until the first chunk with a non integer weight
+        if weights.typecode == 'q' and (c.typecode != 'q' or d.typecode != 'q'):
+            weights = array('d', weights)
+            carpool_weights = array('d', carpool_weights)
+        sources.extend(a)
+        targets.extend(b)
+        weights.extend(c if c.typecode == weights.typecode else array(weights.typecode, c))
+        carpool_sources.extend(a)
+        carpool_targets.extend(b)
+        carpool_weights.extend(d if d.typecode == weights.typecode else array(weights.typecode, d))
+    num_locations = max_location + 1
+
+    # shifts the carpool edges into their layer and appends them to the solo edges, the buffers are released as they are joined
+    for i in range(len(carpool_sources)):
+        carpool_sources[i] += num_locations
+        carpool_targets[i] += num_locations
+    sources.extend(carpool_sources)
+    del carpool_sources
+    targets.extend(carpool_targets)
+    del carpool_targets
+    weights.extend(carpool_weights)
+    del carpool_weights
+
+    graph = Graph(num_locations * 2, compact = True)
+    graph.edge_sources = sources
+    graph.edge_targets = targets
+    graph.edge_weights = weights
+
+    # adds the zero-weight edge between the layers once per passenger, a passenger that is not on any road can never be reached so it is skipped
+    transfer_edges = 0
+    for passenger in passengers:
+        if passenger < num_locations:
+            graph.add_edge(passenger, passenger + num_locations, 0)
+            transfer_edges += 1
+
+    edges_added = len(graph.edge_sources)
+    csr = graph.freeze(deduplicate = True)
+
+    report = BuildReport(num_locations, num_roads, transfer_edges, edges_added, csr.offsets[csr.num_vertices], time.perf_counter() - build_start)
+    return graph, num_locations, report
+
+def build_layered_graph(roads, passengers):
+    """
+    Precondition:
+        roads is a list of tuples (a, b, c, d) where a and b are integer vertices, c is the weight of the solo lane, and d is the weight of the carpool lane, passengers is a list of integers representing the passenger vertices.
+
+    Postcondition:
+        returns the two layer graph searched by optimalRoute, frozen, along with the number of locations per layer and a BuildReport.
+
+    Function description:
+        Builds the layered graph of optimalRoute, the solo layer holds vertices 0 to l - 1 and the carpool layer holds vertices l to 2l - 1.
+
+    Approach description:
+        Every road adds one edge to each layer, then each passenger adds a single zero-weight edge from its solo vertex to its carpool vertex. The graph is compact and frozen with deduplicate set, so a road given more than once, or a passenger listed twice, only leaves its lightest edge behind. The roads are read once, in chunks, see build_layered_graph_from_chunks.
+
+    Input:
+        roads: list of tuples (a, b, c, d) where a and b are integer vertices, c is the weight of the solo lane, and d is the weight of the carpool lane.
+        passengers: list of integers representing the passenger vertices.
+
+    Output:
+        A tuple (graph, num_locations, report).
+
+    Time complexity:
+        where r is the number of roads in the graph, p the number of passengers and l is the number of locations
+
+        Best Case: O(r + p + l)
+        Worst Case: O(r + p + l)
+
+    Space complexity:
+        Auxiliary: O(r + p + l)
+    """
+    return build_layered_graph_from_chunks(road_chunks(roads), passengers)
+
+def share_buffers(buffers):
+    """
+    Function description:
+        Copies a list of array buffers, such as the arc buffers of a CSRGraph, into shared memory blocks, so worker processes can read them without each receiving a copy.
+
+    Input:
+        buffers: list of arrays to share.
+
+    Output:
+        A tuple (blocks, specs), blocks are the SharedMemory objects which the caller must close and unlink once the workers are done, specs is the picklable description passed to attach_buffers.
+
+    Time complexity:
+        O(n) where n is the total length of the buffers.
+
+    Space complexity:
+        Auxiliary: O(n) where n is the total length of the buffers, held in shared memory.
+    """
+    blocks = []
+    specs = []
+    for buffer in buffers:
+        # a shared memory block cannot be empty, so an empty buffer still gets a one byte block
+        size = len(buffer) * buffer.itemsize
+        block = shared_memory.SharedMemory(create = True, size = max(1, size))
+        block.buf[:size] = memoryview(buffer).cast('B')
+        blocks.append(block)
+        specs.append((block.name, buffer.typecode, len(buffer)))
+
+    return blocks, specs
+
+def attach_buffers(specs):
+    """
+    Function description:
+        Attaches a worker process to the shared memory blocks created by share_buffers, the buffers are returned as memoryviews so nothing is copied.
+
+    Input:
+        specs: the description returned by share_buffers.
+
+    Output:
+        A tuple (blocks, views), the blocks must stay open for as long as the views are used.
+
+    Time complexity:
+        O(k) where k is the number of buffers.
+
+    Space complexity:
+        Auxiliary: O(k) where k is the number of buffers.
+    """
+    blocks = []
+    views = []
+    for name, typecode, length in specs:
+        block = shared_memory.SharedMemory(name = name)
+        blocks.append(block)
+        views.append(block.buf[:length * array(typecode).itemsize].cast(typecode))
+
+    return blocks, views
+
+# the planner of a worker process, set up once per process by init_route_worker
+worker_planner = None
+worker_blocks = None
+
+def init_route_worker(num_vertices, graph_specs, hierarchy_specs, num_locations):
+    """
+    Function description:
+        Initialiser of the RoutePlanner.route_batch worker processes, attaches to the shared graph, and the shared contraction hierarchy if there is one, once so every query sent to the process reuses them.
+
+    Input:
+        num_vertices: the number of vertices of the layered graph.
+        graph_specs: the shared offsets, targets and weights buffers, see share_buffers.
+        hierarchy_specs: the shared ContractionHierarchy buffers, None if the planner has no hierarchy.
+        num_locations: the number of locations in each layer.
+
+    Output:
+        None
+
+    Time complexity:
+        O(1)
+
+    Space complexity:
+        Auxiliary: O(1)
+    """
+    global worker_planner, worker_blocks
+    worker_blocks, views = attach_buffers(graph_specs)
+    worker_planner = RoutePlanner.from_graph(CSRGraph(num_vertices, *views), num_locations)
+
+    if hierarchy_specs is not None:
+        hierarchy_blocks, views = attach_buffers(hierarchy_specs)
+        worker_blocks += hierarchy_blocks
+        worker_planner.hierarchy = ContractionHierarchy(num_vertices, *views)
+
+def route_worker(query):
+    """
+    Function description:
+        Answers a single (start, end) query in a worker process, see RoutePlanner.route.
+
+    Input:
+        query: tuple (start, end) of integer locations.
+
+    Output:
+        A list of vertices representing the shortest path between the start and end points.
+
+    Time complexity:
+        O(r log l) where r is the number of roads and l is the number of locations.
+
+    Space complexity:
+        Auxiliary: O(l)
+    """
+    start, end = query
+    return worker_planner.route(start, end)
+
+def fill_travel_times(graph, num_locations, origins, destinations, mode, rows):
+    """
+    Function description:
+        Fills rows of a travel time matrix, one multi-target search of the layered graph per origin, which stops once every destination is settled.
+
+    Input:
+        graph: the frozen CSRGraph of both layers.
+        num_locations: the number of locations in each layer.
+        origins: the origin location of each row.
+        destinations: the destination location of each column.
+        mode: "solo" for travel times in the solo layer only, "carpool" for the travel times of optimalRoute, which may switch to the carpool lane.
+        rows: the 2-D NumPy array, or memory mapped matrix, the times are written to, inf where a destination cannot be reached.
+
+    Output:
+        None
+
+    Time complexity:
+        O(o * r log l) where o is the number of origins, r the number of roads and l the number of locations.
+
+    Space complexity:
+        Auxiliary: O(d) where d is the number of destinations, the search labels are reused.
+    """
+    # the carpool times need the end of each destination in both layers
+    targets = list(destinations)
+    if mode == "carpool":
+        targets += [destination + num_locations for destination in destinations]
+
+    for i in range(len(origins)):
+        routes = graph.dijkstra_many(origins[i], targets)
+        row = rows[i]
+        for j in range(len(destinations)):
+            row[j] = routes.distance(destinations[j])
+            if mode == "carpool":
+                carpool_time = routes.distance(destinations[j] + num_locations)
+                if carpool_time < row[j]:
+                    row[j] = carpool_time
+
+def floyd_warshall(graph):
+    """
+    Function description:
+        Vectorised Floyd-Warshall, the shortest distance between every pair of vertices of a small dense graph.
+
+    Approach description:
+        The graph is expanded into a dense matrix, then for each intermediate vertex k the whole matrix is relaxed at once with the outer sum of column k and row k, so each of the |V| rounds is a single NumPy operation over |V|^2 entries instead of |V|^2 interpreted steps.
+
+    Input:
+        graph: a CSRGraph with non-negative weights.
+
+    Output:
+        A |V| x |V| float64 NumPy array, entry [u, v] is the shortest distance from u to v, inf if v cannot be reached.
+
+    Time complexity:
+        O(|V|^3) where |V| is the number of vertices, done in |V| vectorised steps.
+
+    Space complexity:
+        Auxiliary: O(|V|^2) where |V| is the number of vertices.
+    """
+    num_vertices = graph.num_vertices
+    distances = np.full((num_vertices, num_vertices), np.inf)
+
+    # parallel arcs are resolved by keeping the lightest with a minimum at each (u, v) entry
+    sources, targets, weights = graph.edge_arrays()
+    np.minimum.at(distances, (np.frombuffer(sources, dtype = np.int32), np.frombuffer(targets, dtype = np.int32)), np.asarray(weights, dtype = np.float64))
+    np.fill_diagonal(distances, 0)
+
+    for k in range(num_vertices):
+        np.minimum(distances, distances[:, k, None] + distances[None, k, :], out = distances)
+
+    return distances
+
+def travel_time_worker(task):
+    """
+    Function description:
+        Fills a block of rows of a travel time matrix in a worker process, the matrix is a memory mapped file or a shared memory block opened by every worker, so the rows are written in place rather than sent back.
+
+    Input:
+        task: tuple (row_start, origins, destinations, mode, target), target is ("file", path, shape) or ("shared", name, shape).
+
+    Output:
+        None
+
+    Time complexity:
+        O(o * r log l) where o is the number of origins in the block, r the number of roads and l the number of locations.
+
+    Space complexity:
+        Auxiliary: O(d) where d is the number of destinations.
+    """
+    row_start, origins, destinations, mode, (kind, name, shape) = task
+    if kind == "file":
+        matrix = np.memmap(name, dtype = np.float64, mode = "r+", shape = shape)
+        fill_travel_times(worker_planner.graph, worker_planner.num_locations, origins, destinations, mode, matrix[row_start:row_start + len(origins)])
+        matrix.flush()
+        del matrix
+    else:
+        block = shared_memory.SharedMemory(name = name)
+        try:
+            matrix = np.ndarray(shape, dtype = np.float64, buffer = block.buf)
+            fill_travel_times(worker_planner.graph, worker_planner.num_locations, origins, destinations, mode, matrix[row_start:row_start + len(origins)])
+            del matrix
+        finally:
+            block.close()
+
+class LayeredGraph():
+    def __init__(self, roads, passengers, num_layers = None, max_states = 1 << 22) -> None:
+        """
+        Function description:
+            Constructor for LayeredGraph, an implicit view of optimalRoute's layered graph with any number of occupancy
+            levels, layer i holding the cars with i passengers picked up, the last layer also taking any more.
+
+            Only the roads are stored, once, in a CSR layout over the locations, and the state of the car is worked
+            out during the search, so no vertex or edge is copied per layer. The passengers waiting at a location are
+            picked up when leaving it, so a road from a leaving layer i can end in layer i, or in the layer raised by
+            the passengers there, each with the lane weight of the layer it ends in. With two layers this gives the same
+            travel times as the zero-weight transfer edges of build_layered_graph.
+
+            The passengers of a location can only be picked up once, so with more than two layers the state also
+            records which locations the passengers were picked up from, until the car reaches the last layer. The
+            states are then no longer O(l) per layer, a location can be reached with any set of fewer than k - 1
+            passenger locations, which grows as l * C(p, k - 2), so memory is not O(r + l) whatever k. The number of
+            possible states is worked out here and a ValueError is raised when it is above max_states, rather than
+            running out of memory during a search.
+
+        :Input:
+            roads (list): list of tuples (a, b, w_0, ..., w_k-1) where a and b are integer vertices and w_i is the weight of the lane used with i passengers.
+            passengers (list): list of integers representing the passenger vertices, a location listed twice has two passengers.
+            num_layers (int): The number of occupancy levels k, taken from the first road by default.
+            max_states (int): The largest number of states a search may have to label.
+
+        :Attributes:
+            num_locations: The number of locations.
+            num_layers: The number of occupancy levels.
+            offsets, targets: The roads leaving each location in CSR layout, see CSRGraph.
+            arc_roads: The road of each arc.
+            road_weights: Flat buffer of the lane weights, road_weights[r * num_layers + i] is the weight of road r in layer i.
+            pickups: The number of passengers waiting at each location.
+            pickup_bits: The bit of each location in the picked up mask of a state, -1 for a location without passengers.
+            num_states: The number of possible states, l * m where m is the number of sets of fewer than k - 1 passenger locations plus one.
+
+        :Time complexity:
+            O(r * k + p + l + k) where r is the number of roads, k the number of layers, p the number of passengers and l the number of locations.
+
+        :Aux space complexity:
+            O(r * k + l) where r is the number of roads, k the number of layers and l the number of locations, the k weights of each road are the input itself.
+        """
+        if num_layers is None:
+            num_layers = len(roads[0]) - 2 if roads else 1
+
+        max_location = 0
+        for road in roads:
+            max_location = max(max_location, road[0], road[1])
+        num_locations = max_location + 1
+
+        # the weight buffer holds integers until the first non integer weight is read
+        sources = array('i')
+        targets = array('i')
+        road_weights = array('q')
+        for road in roads:
+            if len(road) != num_layers + 2:
+                raise ValueError(f"road {road} does not have a weight for each of the {num_layers} layers")
+            if road_weights.typecode == 'q' and not all(isinstance(w, int) for w in road[2:]):
+                road_weights = array('d', road_weights)
+            sources.append(road[0])
+            targets.append(road[1])
+            road_weights.extend(road[2:])
+
+        # the arcs are sorted on their location with the road index as the weight, which then points at the lane weights
+        base = CSRGraph.from_edges(num_locations, sources, targets, array('q', range(len(roads))))
+
+        pickups = array('i', [0]) * num_locations
+        pickup_bits = array('i', [-1]) * num_locations
+        num_bits = 0
+        for passenger in passengers:
+            if passenger < num_locations:
+                pickups[passenger] += 1
+                if pickup_bits[passenger] == -1:
+                    pickup_bits[passenger] = num_bits
+                    num_bits += 1
+
+        # every set of fewer than k - 1 passenger locations can be picked up below the last layer, plus the last layer itself
+        sets = 1
+        combinations = 1
+        for size in range(1, min(num_layers - 2, num_bits) + 1):
+            combinations = combinations * (num_bits - size + 1) // size
+            sets += combinations
+        num_states = num_locations * (sets + 1 if num_layers > 1 else 1)
+        if num_states > max_states:
+            raise ValueError(f"{num_layers} layers with {num_bits} passenger locations give up to {num_states} states, more than max_states = {max_states}")
+
+        self.num_locations = num_locations
+        self.num_layers = num_layers
+        self.offsets = base.offsets
+        self.targets = base.targets
+        self.arc_roads = base.weights
+        self.road_weights = road_weights
+        self.pickups = pickups
+        self.pickup_bits = pickup_bits
+        self.num_states = num_states
+
+    def dijkstra(self, start, end):
+        """
+        Function description:
+            Dijkstra's algorithm over the states of the car, from the start with no passengers to the end in whichever
+            layer is reached first, which is the one with the least travel time.
+
+            A state is a tuple (vertex, picked), where picked is a bit mask of the locations whose passengers are in
+            the car, see pickup_bits, and the layer is the number of those passengers capped at the last layer. Once
+            the car is in the last layer more passengers change nothing, so picked becomes -1 and the states of that
+            layer are merged. With two layers this leaves the same 2 * l states as build_layered_graph. Only the states
+            the search reaches are labelled, in dictionaries, at most num_states of them.
+
+        :Input:
+            start (int): The start location.
+            end (int): The end location.
+
+        :Output:
+            A tuple containing the travel time and the path as a list of (vertex, layer) states, (inf, [(end, 0)]) if the end cannot be reached.
+
+        :Time complexity:
+            O((s + a) * log s) where s is the number of states and a the number of arcs between them the search reaches, s is at most l * m where m is the number of sets of fewer than k - 1 passenger locations.
+
+        :Aux space complexity:
+            O(s) where s is the number of states the search reaches.
+        """
+        num_layers = self.num_layers
+        offsets = self.offsets
+        targets = self.targets
+        arc_roads = self.arc_roads
+        road_weights = self.road_weights
+        pickups = self.pickups
+        pickup_bits = self.pickup_bits
+
+        # the layer of every picked mask seen so far, -1 is the last layer
+        layers = {0: 0, -1: num_layers - 1}
+
+        start_state = (start, 0 if num_layers > 1 else -1)
+        distances = {start_state: 0}
+        previous = {start_state: None}
+        settled = set()
+        priority_queue = [(0, start_state)]
+        reached = None
+
+        while priority_queue:
+            current_distance, state = heapq.heappop(priority_queue)
+            if state in settled:
+                continue
+            settled.add(state)
+
+            vertex, picked = state
+            if vertex == end:
+                reached = state
+                break
+
+            # each road leads to the same layer, and to the raised layer if the passengers here are picked up now
+            layer = layers[picked]
+            next_states = [(picked, layer)]
+            bit = pickup_bits[vertex]
+            if picked != -1 and bit != -1 and not picked >> bit & 1:
+                raised_layer = layer + pickups[vertex]
+                if raised_layer >= num_layers - 1:
+                    next_states.append((-1, num_layers - 1))
+                else:
+                    raised = picked | 1 << bit
+                    layers[raised] = raised_layer
+                    next_states.append((raised, raised_layer))
+
+            for arc in range(offsets[vertex], offsets[vertex + 1]):
+                weights_start = arc_roads[arc] * num_layers
+                for next_picked, next_layer in next_states:
+                    next_state = (targets[arc], next_picked)
+                    if next_state in settled:
+                        continue
+
+                    new_distance = current_distance + road_weights[weights_start + next_layer]
+                    if next_state not in distances or new_distance < distances[next_state]:
+                        distances[next_state] = new_distance
+                        previous[next_state] = state
+                        heapq.heappush(priority_queue, (new_distance, next_state))
+
+        if reached is None:
+            return float('inf'), [(end, 0)]
+
+        path = []
+        state = reached
+        while state is not None:
+            path.append((state[0], layers[state[1]]))
+            state = previous[state]
+        path.reverse()
+        return distances[reached], path
+
+    def route(self, start, end) -> list:
+        """
+        Function description:
+            Returns the route with the least total travel time from the start to the end, see optimalRouteLayers.
+
+        :Input:
+            start (int): The start location.
+            end (int): The end location.
+
+        :Output:
+            A list of locations from the start to the end.
+
+        :Time complexity:
+            O(m * r * log(m * l)) where r is the number of roads, l the number of locations and m the number of sets of fewer than k - 1 passenger locations plus one, 2 with two layers.
+
+        :Aux space complexity:
+            O(m * l) where l is the number of locations and m as above, for the states reached.
+        """
+        _, path = self.dijkstra(start, end)
+        return [vertex for vertex, _ in path]
+
+class RoutePlanner():
+    def __init__(self, roads, passengers) -> None:
+        """
+        Function description:
+            Constructor for RoutePlanner, builds the layered graph of optimalRoute once so any number of (start, end) queries can be answered against it.
+
+        :Input:
+            roads (list): list of tuples (a, b, c, d) where a and b are integer vertices, c is the weight of the solo lane, and d is the weight of the carpool lane.
+            passengers (list): list of integers representing the passenger vertices.
+
+        :Attributes:
+            graph: The frozen CSRGraph of both layers.
+            num_locations: The number of locations in each layer.
+            report: The BuildReport of the layered graph.
+            hierarchy: The ContractionHierarchy queries are answered with, None to search the graph directly.
+
+        :Time complexity:
+            O(r + p + l) where r is the number of roads, p the number of passengers and l the number of locations.
+
+        :Aux space complexity:
+            O(r + p + l) where r is the number of roads, p the number of passengers and l the number of locations.
+        """
+        layered_graph, self.num_locations, self.report = build_layered_graph(roads, passengers)
+        self.graph = layered_graph.freeze()
+        self.hierarchy = None
+
+    @classmethod
+    def from_graph(cls, graph, num_locations):
+        """
+        Function description:
+            Creates a RoutePlanner over a layered graph that has already been built, as done by the worker processes.
+
+        :Input:
+            graph (CSRGraph): The layered graph.
+            num_locations (int): The number of locations in each layer.
+
+        :Output:
+            A RoutePlanner searching the given graph.
+
+        :Time complexity:
+            O(1)
+
+        :Aux space complexity:
+            O(1)
+        """
+        planner = cls.__new__(cls)
+        planner.graph = graph
+        planner.num_locations = num_locations
+        planner.report = None
+        planner.hierarchy = None
+        return planner
+
+    @classmethod
+    def from_file(cls, path, passengers, chunk_size = 65536, typecode = 'q'):
+        """
+        Function description:
+            Creates a RoutePlanner from an edge file, streamed in chunks straight into the buffers of the layered graph, so the roads are never held as a list of tuples, see load_roads.
+
+        :Input:
+            path (str): A .csv file of a,b,c,d lines, or a file of binary road records, see write_roads_binary.
+            passengers (list): list of integers representing the passenger vertices.
+            chunk_size (int): The number of roads read at a time.
+            typecode (str): The array typecode of the binary road records, see write_roads_binary.
+
+        :Output:
+            A RoutePlanner over the roads of the file.
+
+        :Time complexity:
+            O(r + p + l) where r is the number of roads, p the number of passengers and l the number of locations.
+
+        :Aux space complexity:
+            O(r + p + l) where r is the number of roads, p the number of passengers and l the number of locations.
+        """
+        layered_graph, num_locations, report = build_layered_graph_from_chunks(load_roads(path, chunk_size, typecode), passengers)
+        planner = cls.from_graph(layered_graph.freeze(), num_locations)
+        planner.report = report
+        return planner
+
+    def build_hierarchy(self, settle_limit = 64):
+        """
+        Function description:
+            Preprocesses the layered graph into a ContractionHierarchy, which route then answers queries with.
+            The travel times stay the same, but where several routes tie route may return a different one of them
+            than optimalRoute, see ContractionHierarchy.dijkstra_many.
+
+        :Input:
+            settle_limit (int): The number of vertices each witness search may settle, see ContractionHierarchy.build.
+
+        :Output:
+            The ContractionHierarchy, which can be saved and later given to load_hierarchy.
+
+        :Time complexity:
+            See ContractionHierarchy.build.
+
+        :Aux space complexity:
+            See ContractionHierarchy.build.
+        """
+        self.hierarchy = ContractionHierarchy.build(self.graph, settle_limit)
+        return self.hierarchy
+
+    def load_hierarchy(self, path):
+        """
+        Function description:
+            Loads a ContractionHierarchy saved from a planner over the same roads and passengers, which route then answers queries with.
+
+        :Input:
+            path (str): The file written by ContractionHierarchy.save.
+
+        :Output:
+            The loaded ContractionHierarchy.
+
+        :Time complexity:
+            O(|V| + |E| + S) where |E| is the number of edges and S the number of shortcuts.
+
+        :Aux space complexity:
+            O(|V| + |E| + S) where |E| is the number of edges and S the number of shortcuts.
+        """
+        hierarchy = ContractionHierarchy.load(path)
+        if hierarchy.num_vertices != self.graph.num_vertices:
+            raise ValueError(f"{path} holds a hierarchy of {hierarchy.num_vertices} vertices, the planner has {self.graph.num_vertices}")
+
+        hierarchy.attach(self.graph)
+        self.hierarchy = hierarchy
+        return hierarchy
+
+    def route(self, start, end):
+        """
+        Function description:
+            Returns the optimal route to go from the start to end with the least total travel time, see optimalRoute.
+            Once a hierarchy is built, a route that ties with others may differ from optimalRoute, see build_hierarchy.
+
+        :Input:
+            start (int): The start location.
+            end (int): The end location.
+
+        :Output:
+            A list of vertices representing the shortest path between the start and end points.
+
+        :Time complexity:
+            O(r log l) where r is the number of roads and l is the number of locations.
+
+        :Aux space complexity:
+            O(l) where l is the number of locations.
+        """
+        num_locations = self.num_locations
+
+        # computes the shortest paths from the start to the end vertex in both the non-carpool and carpool layers with a single run of dijkstra's algorithm, which stops once both ends are settled, or with the contraction hierarchy if one has been built
+        search = self.graph if self.hierarchy is None else self.hierarchy
+        routes = search.dijkstra_many(start, [end, end + num_locations])
+        solo_path_weight = routes.distance(end)
+        carpool_path_weight = routes.distance(end + num_locations)
+
+        # compares the weights of the solo and carpool paths and selects the one with the smaller weight, only the selected path is built, in a single walk of the predecessors that converts the vertices back to their original location indices (by taking the modulo with num_locations) and skips the duplicates left by the move between layers
+        if solo_path_weight < carpool_path_weight:
+            return routes.route(end, num_locations)
+        return routes.route(end + num_locations, num_locations)
+
+    def travel_time(self, start, end):
+        """
+        Function description:
+            Returns the least total travel time from the start to the end, the route itself is never built, see route.
+
+        :Input:
+            start (int): The start location.
+            end (int): The end location.
+
+        :Output:
+            The travel time of the optimal route, inf if the end cannot be reached.
+
+        :Time complexity:
+            O(r log l) where r is the number of roads and l is the number of locations.
+
+        :Aux space complexity:
+            O(l) where l is the number of locations.
+        """
+        search = self.graph if self.hierarchy is None else self.hierarchy
+        routes = search.dijkstra_many(start, [end, end + self.num_locations])
+        return min(routes.distance(end), routes.distance(end + self.num_locations))
+
+    def route_batch(self, queries, workers = None, chunksize = 64) -> list:
+        """
+        Function description:
+            Answers a batch of (start, end) queries, fanned out over a ProcessPoolExecutor. The graph, and the contraction hierarchy if one has been built, is placed in shared memory once and every worker attaches to it, so only the queries and the routes are sent between processes.
+
+        :Input:
+            queries (list): list of tuples (start, end) of integer locations.
+            workers (int): The number of worker processes, defaults to the number of CPUs, with 1 the queries are answered in this process.
+            chunksize (int): The number of queries sent to a worker at a time.
+
+        :Output:
+            A list of routes, in the same order as the queries.
+
+        :Time complexity:
+            O(q * r log l / w) where q is the number of queries, r the number of roads, l the number of locations and w the number of workers.
+
+        :Aux space complexity:
+            O(r + l + q * l) for the shared graph and the routes.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        if workers == 1 or len(queries) <= 1:
+            return [self.route(start, end) for start, end in queries]
+
+        blocks, graph_specs = share_buffers([self.graph.offsets, self.graph.targets, self.graph.weights])
+        hierarchy_specs = None
+        if self.hierarchy is not None:
+            hierarchy_blocks, hierarchy_specs = share_buffers(self.hierarchy.buffers())
+            blocks += hierarchy_blocks
+
+        try:
+            initargs = (self.graph.num_vertices, graph_specs, hierarchy_specs, self.num_locations)
+            with ProcessPoolExecutor(max_workers = workers, initializer = init_route_worker, initargs = initargs) as executor:
+                # map returns the results in the order of the queries, whichever worker finishes first
+                return list(executor.map(route_worker, queries, chunksize = chunksize))
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    def travel_times(self, origins = None, destinations = None, mode = "carpool", workers = None, path = None, dense_limit = 1024, chunksize = 16):
+        """
+        Function description:
+            Computes the travel time matrix between many origins and destinations, entry [i, j] is the total travel time of the best route from origins[i] to destinations[j], inf if there is none.
+
+            The one to many searches are fanned out over a ProcessPoolExecutor in blocks of rows, every worker attaches to the graph in shared memory and writes its rows straight into the matrix, so only the row numbers are sent between processes. For a small graph with enough arcs that |V| vectorised relaxations of a dense matrix cost less than the searches, the matrix is taken from floyd_warshall instead.
+
+        :Input:
+            origins (list): The origin locations, every location by default.
+            destinations (list): The destination locations, every location by default.
+            mode (str): "carpool" for the travel times of optimalRoute, "solo" for travel times that never use the carpool lane.
+            workers (int): The number of worker processes, defaults to the number of CPUs, with 1 the searches run in this process.
+            path (str): A file to write the matrix to as a float64 NumPy memmap, the matrix is kept in memory if None.
+            dense_limit (int): The largest layered graph floyd_warshall is considered for.
+            chunksize (int): The number of rows sent to a worker at a time.
+
+        :Output:
+            A 2-D float64 NumPy array, or the np.memmap of path if one is given.
+
+        :Time complexity:
+            O(o * r log l / w) where o is the number of origins, r the number of roads, l the number of locations and w the number of workers, O(l^3) with floyd_warshall.
+
+        :Aux space complexity:
+            O(o * d + r + l) where o is the number of origins and d the number of destinations, O(l^2) with floyd_warshall.
+        """
+        if np is None:
+            raise ImportError("travel_times needs numpy")
+        if mode not in ("solo", "carpool"):
+            raise ValueError(f"unknown mode {mode!r}, expected 'solo' or 'carpool'")
+
+        num_locations = self.num_locations
+        origins = list(range(num_locations)) if origins is None else list(origins)
+        destinations = list(range(num_locations)) if destinations is None else list(destinations)
+        shape = (len(origins), len(destinations))
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        if path is not None:
+            matrix = np.memmap(path, dtype = np.float64, mode = "w+", shape = shape)
+        else:
+            matrix = np.empty(shape, dtype = np.float64)
+        if len(origins) == 0 or len(destinations) == 0:
+            return matrix
+
+        # floyd-warshall makes |V| vectorised passes over |V|^2 entries, while the searches make about (|V| + |E|) log|V| interpreted steps per origin, each roughly twenty times dearer than a vectorised one
+        num_vertices = self.graph.num_vertices
+        num_arcs = self.graph.offsets[num_vertices]
+        if num_vertices <= dense_limit and num_vertices ** 3 <= 20 * len(origins) * (num_vertices + num_arcs) * num_vertices.bit_length():
+            distances = floyd_warshall(self.graph)
+            matrix[:] = distances[np.ix_(origins, destinations)]
+            if mode == "carpool":
+                np.minimum(matrix, distances[np.ix_(origins, [destination + num_locations for destination in destinations])], out = matrix)
+        elif workers == 1 or len(origins) <= chunksize:
+            fill_travel_times(self.graph, num_locations, origins, destinations, mode, matrix)
+        else:
+            blocks, graph_specs = share_buffers([self.graph.offsets, self.graph.targets, self.graph.weights])
+
+            # without a file the workers write into a shared memory block, which is copied out once they are done
+            if path is not None:
+                target = ("file", path, shape)
+                matrix.flush()
+            else:
+                result_block = shared_memory.SharedMemory(create = True, size = matrix.nbytes)
+                blocks.append(result_block)
+                target = ("shared", result_block.name, shape)
+
+            try:
+                tasks = [(start, origins[start:start + chunksize], destinations, mode, target) for start in range(0, len(origins), chunksize)]
+                initargs = (num_vertices, graph_specs, None, num_locations)
+                with ProcessPoolExecutor(max_workers = workers, initializer = init_route_worker, initargs = initargs) as executor:
+                    for _ in executor.map(travel_time_worker, tasks):
+                        pass
+
+                if path is None:
+                    matrix[:] = np.ndarray(shape, dtype = np.float64, buffer = result_block.buf)
+            finally:
+                for block in blocks:
+                    block.close()
+                    block.unlink()
+
+        if path is not None:
+            matrix.flush()
+        return matrix
+
+def optimalRoute(start, end, passengers, roads):
+    """
+    Written by: faw
+
+    Precondition:
+        start and end are integers representing the start and end vertices, passengers is a list of integers representing the passenger vertices, roads is a list of tuples (a, b, c, d) where a and b are integer vertices, c is the weight of the solo lane, and d is the weight of the carpool lane.
+
+    Postcondition: 
+        returns a list of vertices representing the shortest path between the start and end points.
+
+    Function description: 
+        Returns the optimal route to go from the start to end with the least total travel time
+
+    Approach description: 
+        By constructing a layered graph, and offseting the vertices, Dijsktra's algorithm can be run once on a large graph to determine which is the most optimal route to take in either layer. Edges are added to the graph for both solo and carpool lanes, and zero-weight edges are added between non-carpool and carpool vertices for each passenger. 
+
+    Input:
+        start: integer representing the start vertex.
+        end: integer representing the end vertex.
+        passengers: list of integers representing the passenger vertices.
+        roads: list of tuples (a, b, c, d) where a and b are integer vertices, c is the weight of the solo lane, and d is the weight of the carpool lane.
+
+    Output:
+        A list of vertices representing the shortest path between the start and end points.
+
+    Time complexity:
+        where r is the number of roads in the graph and l is the number of locations
+
+        Best Case: O((r log l)) * could be cases that start == end so it would be O(1)
+        Worst Case: O((r log l)) 
+
+    Space complexity:
+        Auxiliary: O(l + r) 
+    """
+    # builds the layered graph, the solo layer holds the locations and the carpool layer holds the same locations offset by num_locations, each passenger adds a single zero-weight edge from the solo to the carpool layer and parallel edges are collapsed so Dijkstra only scans each edge once, then answers the query with a single run of dijkstra's algorithm over both layers
+    return RoutePlanner(roads, passengers).route(start, end)
+
+def optimalRouteLayers(start, end, passengers, roads, num_layers = None):
+    """
+    Precondition:
+        start and end are integers representing the start and end vertices, passengers is a list of integers representing the passenger vertices, roads is a list of tuples (a, b, w_0, ..., w_k-1) where a and b are integer vertices and w_i is the weight of the lane used with i passengers.
+
+    Postcondition:
+        returns a list of vertices representing the shortest path between the start and end points.
+
+    Function description:
+        optimalRoute generalised to k occupancy levels, each with its own lane weights.
+
+    Approach description:
+        Rather than copying every vertex and edge into each layer and decoding the path with a modulo, the search runs over an implicit LayeredGraph, which computes the state of each arc on the fly from a single copy of the roads, along with which passengers are already in the car so none is counted twice.
+
+    Input:
+        start: integer representing the start vertex.
+        end: integer representing the end vertex.
+        passengers: list of integers representing the passenger vertices.
+        roads: list of tuples (a, b, w_0, ..., w_k-1).
+        num_layers: the number of occupancy levels k, taken from the roads by default.
+
+    Output:
+        A list of vertices representing the shortest path between the start and end points.
+
+    Time complexity:
+        where r is the number of roads in the graph, l is the number of locations, k the number of layers and m the number of sets of fewer than k - 1 passenger locations plus one
+
+        Best Case: O(1) when start == end
+        Worst Case: O(m * r * log(m * l))
+
+    Space complexity:
+        Auxiliary: O(r * k + l) for the roads, and O(m * l) for the states reached, which grows as C(p, k - 2) for p passenger locations, a ValueError is raised past LayeredGraph's max_states.
+    """
+    return LayeredGraph(roads, passengers, num_layers).route(start, end)
+
+def select_sections(occupancy_probability):
+    """
+    Written by: faw
+
+    Precondition: 
+        occupancy_probability is a non-empty matrix of positive integers, dimensions are n * m and n > m
+        remove only one section from each of the n rows
+        minimise the amount of shuffling work required, hence, 
+
+    Postcondition:
+        list of indices of n sections that has the total minimum occupancy rate for the entire matrix
+
+    Function description:  
+        Calculates the minimum total occupancy probability and the section locations for each row with the minimum occupancy probability by using dynamic programming.
+
+    Approach description: 
+        Using dynamic programming, a memo can be used to store the minimum total occupancy probabilities for each cell in the occupancy_probability matrix. Then, the memo is constructed in a row-by-row manner, and for each cell, the function checks the adjacent cells in the previous row to find the minimum total occupancy probability. After memo is finished processing, the function backtracks from the last row, finding the optimal section locations for each row that lead to the minimum total occupancy probability, generating a path to it.
+
+    Input:
+        occupancy_probability: matrix representing the occupancy probability
+
+    Output: 
+        Returns a list containing the minimum total occupancy probability and the list of section locations for each row.
+
+        minimum_total_occupancy - total occupancy for selected sections
+
+        sections_location - list of tuples representing the selected sections in row, column format
+
+    Time complexity: 
+        where n is the number of rows and m is the number of columns
+
+        Best Case: O(n * m)
+        Worst Case: O(n * m)
+
+    Space complexity:
+        Auxilary: O(n * m)
+    """
+    # n is the number of rows whilst m is the number of columns or aisles
+    n = len(occupancy_probability)
+    m = len(occupancy_probability[0])
+
+    # initialization of the memo, creates a nested list with the same dimensions as occupancy_probability and fills it with inf values
+    memo = [[float('inf') for i in range(m)] for j in range(n)] 
+
+    # fill the first row of the memo with the initial row of the occupancy_probability
+    for i in range(m):
+        memo[0][i] = occupancy_probability[0][i]
+
+    # iterate through the rows of occupancy_probability, starting from the second row as the first row is already processsed, then iterate through the columns of the occupancy_probability, and lastly iterate through the adjacent columns in the previous row e.g. k = j-1, j, j+1, from here check if k is within the valid column range, and if it is calculate the current total occupancy probability by adding the value of the current cell and the adjacent cell in the previous row whilst checking if the current total occupancy probability is less than the stored value in the memo list and if it is, updating the memo list with the new minimum total occupancy probability
+    for i in range(1, n): 
+        for j in range(m): 
+            for k in range(j - 1, j + 2): 
+                if k >= 0 and k < m: 
+                    current_occupancy = occupancy_probability[i][j] + memo[i - 1][k]    
+                    if memo[i][j] > current_occupancy:
+                        memo[i][j] = current_occupancy 
+
+    # gets the minimum total occupancy in the last row of memo by iterating over it and updating
+    minimum_total_occupancy = memo[-1][0]  
+    for value in memo[-1]:  
+        if value < minimum_total_occupancy:
+            minimum_total_occupancy = value  
+
+    sections_location = []
+    
+    # iterates through the last row of the memo table and finds the index of minimum_total_occupancy
+    minimum_total_occupancy_index = 0
+    for i in range(1, m):
+        if memo[-1][i] < memo[-1][minimum_total_occupancy_index]:
+            minimum_total_occupancy_index = i
+
+    # backtracking begins here by iterating through the rows in reverse order, starting from the second last row as the last row has been processed already, moving up to the first row, for each row, it checks the adjacent cells (j) in the previous row that led to the minimum total occupancy probability, where j is in {minimum_total_occupancy_index-1, minimum_total_occupancy_index, minimum_total_occupancy_index+1} and lastly it appends the current cell (i, minimum_total_occupancy_index) to the sections_location list and updates the minimum_total_occupancy_index to the column of the previous row's cell that led to the minimum total occupancy probability.
+    for i in range(n - 1, 0, -1):
+        for j in range(minimum_total_occupancy_index - 1, minimum_total_occupancy_index + 2):
+            if j >= 0 and j < m:
+                if memo[i][minimum_total_occupancy_index] == occupancy_probability[i][minimum_total_occupancy_index] + memo[i - 1][j]:
+                    sections_location.append((i, minimum_total_occupancy_index))
+                    minimum_total_occupancy_index = j
                     break
 
-    # finally add back the first row    
-    sections_location.append((0, minimum_total_occupancy_index))
+    # finally add back the first row    
+    sections_location.append((0, minimum_total_occupancy_index))
+
+    # reverse the order by iterating through the first half of the list, swapping each element with its corresponding element at the opposite end of the list e.g. first goes to last, second goes to second last, etc
+    for i in range(len(sections_location) // 2):
+        sections_location[i], sections_location[len(sections_location) - i - 1] = sections_location[len(sections_location) - i - 1], sections_location[i]
+        
+    return [minimum_total_occupancy, sections_location]
+
+def select_sections_numpy(occupancy_probability):
+    """
+    Precondition:
+        occupancy_probability is a non-empty matrix of positive integers, dimensions are n * m and n > m, and numpy is installed.
+
+    Postcondition:
+        returns the same [minimum_total_occupancy, sections_location] as select_sections.
+
+    Function description:
+        select_sections with each row of the dynamic programme computed by NumPy from the previous one, see select_sections_stacked.
+
+    Input:
+        occupancy_probability: matrix representing the occupancy probability, a list of lists or a 2-D NumPy array.
+
+    Output:
+        Returns a list containing the minimum total occupancy probability and the list of section locations for each row.
+
+    Time complexity:
+        where n is the number of rows and m is the number of columns
+
+        Best Case: O(n * m), in n vectorised steps
+        Worst Case: O(n * m), in n vectorised steps
+
+    Space complexity:
+        Auxiliary: O(n * m) bytes for the int8 offsets and O(m) for the memo rows.
+    """
+    if np is None:
+        raise ImportError("select_sections_numpy needs numpy")
+
+    return select_sections_stacked(np.asarray(occupancy_probability)[None])[0]
+
+def select_sections_stacked(stack):
+    """
+    Precondition:
+        stack is a 3-D NumPy array of b matrices of positive numbers, each n * m, integer types narrower than 64 bits are widened.
+
+    Postcondition:
+        returns the [minimum_total_occupancy, sections_location] of select_sections for each matrix, in order.
+
+    Function description:
+        select_sections for many matrices of the same size at once, each row of the dynamic programme is computed by NumPy for every matrix in the stack together.
+
+    Approach description:
+        Only the previous row of the memo is kept. The next row is the current occupancy row plus the previous row, and plus the previous row shifted one column left and one column right, the elementwise minimum of the three is the new memo row. Alongside it the column each cell came from is stored as an int8 offset of -1, 0 or 1, chosen in the same order select_sections tries them, (j - 1, j, j + 1), so ties are broken the same way. Backtracking then follows the offsets up from the first minimum of the last row in O(1) per row instead of recomputing the sums.
+
+    Input:
+        stack: the matrices, stacked along the first axis.
+
+    Output:
+        A list with the result of select_sections for each matrix.
+
+    Time complexity:
+        where b is the number of matrices, n is the number of rows and m is the number of columns
+
+        Best Case: O(b * n * m), in n vectorised steps
+        Worst Case: O(b * n * m), in n vectorised steps
+
+    Space complexity:
+        Auxiliary: O(b * n * m) bytes for the int8 offsets and O(b * m) for the memo rows.
+    """
+    if np is None:
+        raise ImportError("select_sections_stacked needs numpy")
+
+    # sums of small integer types would wrap around, so integers are widened to 64 bits first
+    stack = np.asarray(stack)
+    stack = stack.astype(np.result_type(stack, np.int64), copy = False)
+    b, n, m = stack.shape
+
+    # parents[:, i, j] is the offset from column j to the column of row i - 1 its minimum came from
+    parents = np.zeros((b, n, m), dtype = np.int8)
+    previous = stack[:, 0]
+    for i in range(1, n):
+        row = stack[:, i]
+        from_middle = row + previous
+        from_left = row[:, 1:] + previous[:, :-1]
+        from_right = row[:, :-1] + previous[:, 1:]
+
+        current = from_middle.copy()
+        np.minimum(current[:, 1:], from_left, out = current[:, 1:])
+        np.minimum(current[:, :-1], from_right, out = current[:, :-1])
+
+        # the offsets are written from the last choice to the first, so where several neighbours give the minimum the earliest one wins
+        offsets = parents[:, i]
+        offsets[:, :-1][from_right == current[:, :-1]] = 1
+        offsets[from_middle == current] = 0
+        offsets[:, 1:][from_left == current[:, 1:]] = -1
+        previous = current
+
+    # argmin returns the first minimum, as the strict comparison of select_sections does
+    end_columns = np.argmin(previous, axis = 1)
+
+    # follows the offsets back up from the last row, reading them through a flat memoryview to get plain ints
+    flat_parents = memoryview(parents).cast('B').cast('b')
+    results = []
+    for k in range(b):
+        column = int(end_columns[k])
+        minimum_total_occupancy = previous[k, column].item()
+        base = k * n * m
+        sections_location = [None] * n
+        for i in range(n - 1, 0, -1):
+            sections_location[i] = (i, column)
+            column += flat_parents[base + i * m + column]
+        sections_location[0] = (0, column)
+        results.append([minimum_total_occupancy, sections_location])
+
+    return results
+
+def select_sections_timed(matrix):
+    """
+    Function description:
+        Runs select_sections_numpy on one matrix and times it, the task of the select_sections_batch worker processes.
+
+    Input:
+        matrix: the occupancy matrix, as a 2-D NumPy array.
+
+    Output:
+        A tuple (result, seconds).
+
+    Time complexity:
+        O(n * m) where n is the number of rows and m is the number of columns.
+
+    Space complexity:
+        Auxiliary: O(n * m) bytes.
+    """
+    start = time.perf_counter()
+    result = select_sections_numpy(matrix)
+    return result, time.perf_counter() - start
+
+def select_sections_batch(matrices, workers = None, min_group = 2):
+    """
+    Precondition:
+        matrices is an iterable of occupancy matrices, each meeting the precondition of select_sections, and numpy is installed.
+
+    Postcondition:
+        returns the result of select_sections for every matrix, in order, with the time each one took.
+
+    Function description:
+        Runs select_sections over many matrices, such as the floors of a planning cycle, grouping the matrices of the same size so each group is solved in one vectorised sweep.
+
+    Approach description:
+        The matrices are read once and grouped by their shape. A shape shared by at least min_group matrices is stacked into a 3-D array and solved by select_sections_stacked, the others are sent to a process pool one matrix each, and are solved there while the stacks are solved in this process. Every result is put back in the position of its matrix. The time of a matrix solved in a stack is its share of the time of the stack.
+
+    Input:
+        matrices: list or iterable of matrices, lists of lists or 2-D NumPy arrays.
+        workers: the number of worker processes for the odd sizes, defaults to the number of CPUs, with 1 they are solved in this process.
+        min_group: the number of matrices of a shape needed to stack them.
+
+    Output:
+        A list of tuples (result, seconds), result being the [minimum_total_occupancy, sections_location] of the matrix.
+
+    Time complexity:
+        O(s) where s is the total number of cells of the matrices, the stacks taking one vectorised step per row.
+
+    Space complexity:
+        Auxiliary: O(s) where s is the total number of cells of the matrices.
+    """
+    if np is None:
+        raise ImportError("select_sections_batch needs numpy")
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # groups the positions of the matrices by shape
+    arrays = []
+    groups = {}
+    for matrix in matrices:
+        matrix = np.asarray(matrix)
+        groups.setdefault(matrix.shape, []).append(len(arrays))
+        arrays.append(matrix)
+
+    results = [None] * len(arrays)
+    stacked = [positions for positions in groups.values() if len(positions) >= min_group]
+    odd = [position for positions in groups.values() if len(positions) < min_group for position in positions]
+
+    executor = ProcessPoolExecutor(max_workers = workers) if workers > 1 and len(odd) > 1 else None
+    try:
+        # the odd sizes are sent off first, so the pool works on them while the stacks are solved here
+        futures = {}
+        if executor is not None:
+            for position in odd:
+                futures[position] = executor.submit(select_sections_timed, arrays[position])
+        else:
+            for position in odd:
+                results[position] = select_sections_timed(arrays[position])
+
+        for positions in stacked:
+            start = time.perf_counter()
+            group_results = select_sections_stacked(np.stack([arrays[position] for position in positions]))
+            seconds = (time.perf_counter() - start) / len(positions)
+            for position, result in zip(positions, group_results):
+                results[position] = (result, seconds)
+
+        for position, future in futures.items():
+            results[position] = future.result()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return results
+
+def read_occupancy_rows(path):
+    """
+    Function description:
+        Lazily reads the rows of an occupancy matrix from a text file with one row per line, the values separated by commas or whitespace, blank lines are skipped.
+
+    Input:
+        path: the text file.
+
+    Output:
+        Generates each row as a list of numbers.
+
+    Time complexity:
+        O(n * m) where n is the number of rows and m is the number of columns.
+
+    Space complexity:
+        Auxiliary: O(m), one line is held at a time.
+    """
+    with open(path) as file:
+        for line in file:
+            fields = line.replace(',', ' ').split()
+            if fields:
+                yield [int(field) if field.lstrip('-').isdigit() else float(field) for field in fields]
+
+def select_sections_stream(rows, cost_only = False):
+    """
+    Precondition:
+        rows is a non-empty iterable of rows of positive integers, each row of the same length m.
+
+    Postcondition:
+        returns the same [minimum_total_occupancy, sections_location] as select_sections for the matrix of the rows, or just minimum_total_occupancy if cost_only is set.
+
+    Function description:
+        select_sections over rows read one at a time from an iterator, in O(m) memory for the costs.
+
+    Approach description:
+        Each row of the memo only depends on the one before it, so only the previous and current cost rows are kept and swapped after each row. The column each cell came from is one of three, stored as 2 bits per cell (0, 1 or 2 for j - 1, j and j + 1) in a bytearray that grows by ceil(m / 4) bytes a row, a 32nd of a memo of Python floats. Backtracking reads the 2 bit codes back up from the first minimum of the last row. With cost_only the parent table is not kept at all.
+
+    Input:
+        rows: iterable of rows, such as the generator of read_occupancy_rows.
+        cost_only: indicates if only the minimum total occupancy is returned.
+
+    Output:
+        Returns a list containing the minimum total occupancy probability and the list of section locations for each row, or just the minimum total occupancy probability.
+
+    Time complexity:
+        where n is the number of rows and m is the number of columns
+
+        Best Case: O(n * m)
+        Worst Case: O(n * m)
+
+    Space complexity:
+        Auxiliary: O(m) for the costs, and O(n * m) bits, n * m / 4 bytes, for the parents unless cost_only is set.
+    """
+    rows = iter(rows)
+    first_row = next(rows, None)
+    if first_row is None:
+        raise ValueError("select_sections_stream needs at least one row")
+
+    m = len(first_row)
+    row_bytes = (m + 3) // 4
+
+    # the cost rows are padded with inf on both sides, so column j of the matrix is index j + 1 and its neighbours need no bounds checks
+    previous = [float('inf')] + list(first_row) + [float('inf')]
+    current = [float('inf')] * (m + 2)
+    parents = None if cost_only else bytearray(row_bytes)
+    n = 1
+
+    for row in rows:
+        if len(row) != m:
+            raise ValueError(f"row {n} has {len(row)} columns, expected {m}")
+
+        # the neighbours are tried in the order j - 1, j, j + 1 with a strict comparison, so ties go to the same column as in select_sections
+        packed = bytearray(row_bytes)
+        for j in range(m):
+            value = row[j]
+            best = value + previous[j]
+            code = 0
+            candidate = value + previous[j + 1]
+            if best > candidate:
+                best = candidate
+                code = 1
+            candidate = value + previous[j + 2]
+            if best > candidate:
+                best = candidate
+                code = 2
+            current[j + 1] = best
+            if code:
+                packed[j >> 2] |= code << ((j & 3) << 1)
+
+        if parents is not None:
+            parents += packed
+        previous, current = current, previous
+        n += 1
+
+    # the first minimum of the last row, as the strict comparison of select_sections finds
+    column = 0
+    for j in range(1, m):
+        if previous[j + 1] < previous[column + 1]:
+            column = j
+    minimum_total_occupancy = previous[column + 1]
+    if cost_only:
+        return minimum_total_occupancy
+
+    # follows the 2 bit codes back up from the last row
+    sections_location = [None] * n
+    for i in range(n - 1, 0, -1):
+        sections_location[i] = (i, column)
+        code = (parents[i * row_bytes + (column >> 2)] >> ((column & 3) << 1)) & 3
+        column += code - 1
+    sections_location[0] = (0, column)
 
-    # reverse the order by iterating through the first half of the list, swapping each element with its corresponding element at the opposite end of the list e.g. first goes to last, second goes to second last, etc
-    for i in range(len(sections_location) // 2):
-        sections_location[i], sections_location[len(sections_location) - i - 1] = sections_location[len(sections_location) - i - 1], sections_location[i]
-        
     return [minimum_total_occupancy, sections_location]
 
+def section_window(num_columns, row, end_row, end_column):
+    """
+    Function description:
+        Returns the columns of a row that a path ending at (end_row, end_column) can pass through, a path moves at most one column per row so it is a window that narrows towards the end row.
+
+    Input:
+        num_columns: the number of columns of the matrix.
+        row: the row.
+        end_row: the last row of the path.
+        end_column: the column the path ends in, None if it is free.
+
+    Output:
+        A tuple (low, high) of the first and last column of the window.
+
+    Time complexity:
+        O(1)
+
+    Space complexity:
+        Auxiliary: O(1)
+    """
+    if end_column is None:
+        return 0, num_columns - 1
+    reach = end_row - row
+    return max(0, end_column - reach), min(num_columns - 1, end_column + reach)
+
+def section_costs(row, previous_low, previous, low, high):
+    """
+    Function description:
+        Computes one row of the select_sections memo over the columns low to high, along with the column each cell came from.
+
+    Input:
+        row: the occupancy row.
+        previous_low: the first column of previous.
+        previous: the memo values of the row before, covering every neighbour of the columns low to high.
+        low, high: the columns to compute.
+
+    Output:
+        A tuple (costs, codes), the memo values from column low and, for each, 0, 1 or 2 when it came from column j - 1, j or j + 1.
+
+    Time complexity:
+        O(w) where w is the number of columns computed.
+
+    Space complexity:
+        Auxiliary: O(w) where w is the number of columns computed.
+    """
+    last_column = len(row) - 1
+    costs = [0] * (high - low + 1)
+    codes = bytearray(high - low + 1)
+
+    # the neighbours are tried in the order j - 1, j, j + 1 with a strict comparison, so ties go to the same column as in select_sections
+    for j in range(low, high + 1):
+        value = row[j]
+        index = j - previous_low
+        best = value + previous[index - 1] if j > 0 else float('inf')
+        code = 0
+        candidate = value + previous[index]
+        if best > candidate:
+            best = candidate
+            code = 1
+        if j < last_column:
+            candidate = value + previous[index + 1]
+            if best > candidate:
+                best = candidate
+                code = 2
+        costs[j - low] = best
+        codes[j - low] = code
+
+    return costs, codes
+
+def split_sections(matrix, start_row, end_row, initial, end_column):
+    """
+    Function description:
+        Finds the column at the middle row of the select_sections path from start_row to end_row, without storing a parent per cell.
+
+    Approach description:
+        The memo is computed forward one row at a time, only over the window of columns that can still reach the end column. The row at the middle is kept, and from there on each cell also carries the middle row column that following its parents back leads to, so once the last row is reached the middle column of the path ending at the end column can be read off. With no end column the path ends at the first minimum of the last row.
+
+    Input:
+        matrix: the occupancy matrix.
+        start_row, end_row: the first and last row, at least two apart.
+        initial: tuple (low, costs) of the memo values of start_row from column low, covering its window.
+        end_column: the column of the path at end_row, None if it is free.
+
+    Output:
+        A tuple (middle_row, middle, middle_column, end_column, end_cost), middle is the (low, costs) of the middle row and end_cost the memo value at the end of the path.
+
+    Time complexity:
+        O(h * w) where h is the number of rows and w the width of the window, at most the number of columns.
+
+    Space complexity:
+        Auxiliary: O(w) where w is the width of the window.
+    """
+    num_columns = len(matrix[0])
+    middle_row = (start_row + end_row) // 2
+    previous_low, previous = initial
+    middle = None
+    origins = None
+
+    for r in range(start_row + 1, end_row + 1):
+        low, high = section_window(num_columns, r, end_row, end_column)
+        costs, codes = section_costs(matrix[r], previous_low, previous, low, high)
+
+        if r == middle_row:
+            middle = (low, costs)
+        elif r == middle_row + 1:
+            origins = [low + i + codes[i] - 1 for i in range(len(codes))]
+        elif r > middle_row:
+            origins = [origins[low + i + codes[i] - 1 - previous_low] for i in range(len(codes))]
+        previous_low, previous = low, costs
+
+    if end_column is None:
+        end_column = 0
+        for j in range(1, num_columns):
+            if previous[j] < previous[end_column]:
+                end_column = j
+
+    return middle_row, middle, origins[end_column - previous_low], end_column, previous[end_column - previous_low]
+
+def solve_sections(matrix, start_row, end_row, initial, end_column, base_rows = 64):
+    """
+    Function description:
+        Finds the columns of the select_sections path from start_row to end_row by divide and conquer on the rows.
+
+    Approach description:
+        Short pieces are solved directly with a parent per cell. Longer ones are split at the middle row by split_sections, the top half is then the same problem ending at the middle column, and the bottom half starts from the memo row kept at the middle and ends at the end column, so neither half needs the other.
+
+    Input:
+        matrix: the occupancy matrix.
+        start_row, end_row: the first and last row.
+        initial: tuple (low, costs) of the memo values of start_row from column low, covering its window.
+        end_column: the column of the path at end_row, None if it is free.
+        base_rows: the number of rows solved directly.
+
+    Output:
+        A tuple (columns, end_cost), the column of the path in each row from start_row to end_row and the memo value at its end.
+
+    Time complexity:
+        O(h * w * log(h / w)) where h is the number of rows and w the number of columns, O(h * w) once the rows are no more than the columns.
+
+    Space complexity:
+        Auxiliary: O(h + w * log h + base_rows * w) where h is the number of rows and w the number of columns.
+    """
+    if end_row - start_row <= max(base_rows, 1):
+        num_columns = len(matrix[0])
+        previous_low, previous = initial
+        lows = []
+        code_rows = []
+        for r in range(start_row + 1, end_row + 1):
+            low, high = section_window(num_columns, r, end_row, end_column)
+            previous, codes = section_costs(matrix[r], previous_low, previous, low, high)
+            previous_low = low
+            lows.append(low)
+            code_rows.append(codes)
+
+        if end_column is None:
+            end_column = 0
+            for j in range(1, num_columns):
+                if previous[j] < previous[end_column]:
+                    end_column = j
+
+        columns = [0] * (end_row - start_row + 1)
+        column = end_column
+        for r in range(end_row, start_row, -1):
+            columns[r - start_row] = column
+            i = r - start_row - 1
+            column += code_rows[i][column - lows[i]] - 1
+        columns[0] = column
+
+        return columns, previous[end_column - previous_low]
+
+    middle_row, middle, middle_column, end_column, end_cost = split_sections(matrix, start_row, end_row, initial, end_column)
+    top, _ = solve_sections(matrix, start_row, middle_row, initial, middle_column, base_rows)
+    bottom, _ = solve_sections(matrix, middle_row, end_row, middle, end_column, base_rows)
+    return top + bottom[1:], end_cost
+
+# the matrix of a select_sections_hirschberg worker process, set up once per process by init_sections_worker
+worker_matrix = None
+worker_base_rows = None
+
+def init_sections_worker(matrix, base_rows):
+    """
+    Function description:
+        Initialiser of the select_sections_hirschberg worker processes, the matrix is sent once per process rather than with every piece.
+
+    Input:
+        matrix: the occupancy matrix.
+        base_rows: the number of rows solved directly.
+
+    Output:
+        None
+
+    Time complexity:
+        O(1)
+
+    Space complexity:
+        Auxiliary: O(1)
+    """
+    global worker_matrix, worker_base_rows
+    worker_matrix = matrix
+    worker_base_rows = base_rows
+
+def split_sections_worker(piece):
+    """
+    Function description:
+        Splits a (start_row, end_row, initial, end_column) piece in a worker process, see split_sections.
+
+    Input:
+        piece: the piece.
+
+    Output:
+        See split_sections.
+
+    Time complexity:
+        See split_sections.
+
+    Space complexity:
+        See split_sections.
+    """
+    return split_sections(worker_matrix, *piece)
+
+def solve_sections_worker(piece):
+    """
+    Function description:
+        Solves a (start_row, end_row, initial, end_column) piece in a worker process, see solve_sections.
+
+    Input:
+        piece: the piece.
+
+    Output:
+        See solve_sections.
+
+    Time complexity:
+        See solve_sections.
+
+    Space complexity:
+        See solve_sections.
+    """
+    return solve_sections(worker_matrix, *piece, worker_base_rows)
+
+def select_sections_hirschberg(occupancy_probability, workers = 1, base_rows = 64):
+    """
+    Precondition:
+        occupancy_probability is a non-empty matrix of positive integers, dimensions are n * m and n > m.
+
+    Postcondition:
+        returns the same [minimum_total_occupancy, sections_location] as select_sections.
+
+    Function description:
+        select_sections with the path recovered by Hirschberg style divide and conquer, so no parent is stored per cell.
+
+    Approach description:
+        A forward pass over every row finds the end of the path and, by carrying the middle row column each cell's parents lead back to, the column of the path at the middle row. The rows above and below the middle are then two independent problems of half the height, see solve_sections, each only covering the columns that can still reach its end, which narrows as the pieces get shorter. With several workers the pieces are split level by level in a process pool until every worker has a few, then solved there, and the columns are joined in order.
+
+    Input:
+        occupancy_probability: matrix representing the occupancy probability.
+        workers: the number of worker processes, with 1 everything runs in this process.
+        base_rows: the number of rows a piece must be down to before it is solved with a parent per cell.
+
+    Output:
+        Returns a list containing the minimum total occupancy probability and the list of section locations for each row.
+
+    Time complexity:
+        where n is the number of rows and m is the number of columns
+
+        Best Case: O(n * m) when n <= m
+        Worst Case: O(n * m * log(n / m)), as the pieces taller than m rows still span every column
+
+    Space complexity:
+        Auxiliary: O(n + m * log n + base_rows * m), the path itself and one memo row per level of the recursion.
+    """
+    n = len(occupancy_probability)
+    initial = (0, list(occupancy_probability[0]))
+
+    if workers == 1:
+        columns, minimum_total_occupancy = solve_sections(occupancy_probability, 0, n - 1, initial, None, base_rows)
+    else:
+        with ProcessPoolExecutor(max_workers = workers, initializer = init_sections_worker, initargs = (occupancy_probability, base_rows)) as executor:
+            # splits the pieces a level at a time until there are enough to keep every worker busy
+            pieces = [(0, n - 1, initial, None)]
+            while len(pieces) < 4 * workers:
+                splittable = [piece for piece in pieces if piece[1] - piece[0] > max(base_rows, 1)]
+                if not splittable:
+                    break
+
+                splits = iter(executor.map(split_sections_worker, splittable))
+                next_pieces = []
+                for piece in pieces:
+                    start_row, end_row, piece_initial, _ = piece
+                    if end_row - start_row > max(base_rows, 1):
+                        middle_row, middle, middle_column, end_column, _ = next(splits)
+                        next_pieces.append((start_row, middle_row, piece_initial, middle_column))
+                        next_pieces.append((middle_row, end_row, middle, end_column))
+                    else:
+                        next_pieces.append(piece)
+                pieces = next_pieces
+
+            # neighbouring pieces share their boundary row, which is only kept once
+            columns = []
+            for piece_columns, end_cost in executor.map(solve_sections_worker, pieces):
+                columns.extend(piece_columns if not columns else piece_columns[1:])
+                minimum_total_occupancy = end_cost
+
+    return [minimum_total_occupancy, [(i, columns[i]) for i in range(n)]]
+
+def select_sections_top_k(occupancy_probability, k = 1, width = 1, forbidden = None):
+    """
+    Precondition:
+        occupancy_probability is a non-empty matrix of positive integers, dimensions are n * m, k and width are non-negative integers.
+
+    Postcondition:
+        returns up to k plans [total_occupancy, sections_location] in order of total occupancy, the first being the one select_sections returns when width is 1 and no cell is forbidden.
+
+    Function description:
+        Finds the k best section removal plans, where the section of each row may be up to width columns away from the one of the row before and the forbidden cells are never used.
+
+    Approach description:
+        A forward pass of the select_sections programme, over a neighbourhood of width columns either side, gives the best cost and best parent of every cell. The next best paths are then enumerated lazily with the recursive enumeration algorithm of Jimenez and Marzal over the lattice, with a virtual sink after the last row. Each cell keeps the list of its best paths found so far, each stored as (cost, parent cell, index of the parent's path), and a heap of candidates. The next path of a cell is the smallest candidate, and only after one is taken is the path that follows it at the same parent asked for, so a new path only touches the cells along it. Row 0 cells have the single path made of themselves.
+
+    Input:
+        occupancy_probability: matrix representing the occupancy probability
+        k: the number of plans.
+        width: the largest number of columns the section may move between consecutive rows.
+        forbidden: iterable of (row, column) cells that cannot be selected.
+
+    Output:
+        A list of up to k plans, each [total_occupancy, sections_location], fewer if there are not k plans.
+
+    Time complexity:
+        where n is the number of rows, m is the number of columns and w is the width
+
+        Best Case: O(n * m * w + k * n * log(w))
+        Worst Case: O(n * m * w + k * n * log(w)), the forward pass, then each plan touching one candidate heap per row
+
+    Space complexity:
+        Auxiliary: O(n * m + k * n * w) for the forward pass and the heaps of the cells the plans pass through.
+    """
+    n = len(occupancy_probability)
+    m = len(occupancy_probability[0])
+    forbidden = set(forbidden) if forbidden is not None else set()
+    inf = float('inf')
+
+    def occupancy(cell):
+        # the virtual sink, cell n * m, costs nothing to enter
+        return 0 if cell == n * m else occupancy_probability[cell // m][cell % m]
+
+    def predecessors(cell):
+        # the sink is entered from every cell of the last row, any other cell from the cells of the row before within width columns
+        if cell == n * m:
+            return range((n - 1) * m, n * m)
+        i, j = divmod(cell, m)
+        return range((i - 1) * m + max(j - width, 0), (i - 1) * m + min(j + width, m - 1) + 1)
+
+    # forward pass, best[cell] is the cost of the best path from row 0 to the cell and parent[cell] the cell before it, the neighbours are tried from the leftmost with a strict comparison, so ties go to the same column as in select_sections
+    best = [inf] * (n * m + 1)
+    parent = array('i', [-1]) * (n * m + 1)
+    for cell in range(n * m + 1):
+        if cell < n * m and (cell // m, cell % m) in forbidden:
+            continue
+        if cell < m:
+            best[cell] = occupancy(cell)
+            continue
+        value = occupancy(cell)
+        for previous in predecessors(cell):
+            candidate = value + best[previous]
+            if best[cell] > candidate:
+                best[cell] = candidate
+                parent[cell] = previous
+
+    sink = n * m
+    if best[sink] == inf or k <= 0:
+        return []
+
+    # paths[cell] are the best paths to the cell found so far, each (cost, parent cell, index of the parent's path)
+    paths = {}
+    candidates = {}
+    exhausted = set()
+    followed = set()
+
+    def cell_paths(cell):
+        if cell not in paths:
+            paths[cell] = [(best[cell], parent[cell], 0 if parent[cell] != -1 else -1)]
+            if cell < m:
+                exhausted.add(cell)
+        return paths[cell]
+
+    def find_path(cell, index):
+        # finds paths[cell][index], with an explicit stack of the (cell, index) paths still being worked out
+        stack = [(cell, index)]
+        while stack:
+            current, needed = stack[-1]
+            current_paths = cell_paths(current)
+            if len(current_paths) > needed or current in exhausted:
+                stack.pop()
+                continue
+
+            # the candidates start as the best path through every other parent
+            if current not in candidates:
+                value = occupancy(current)
+                heap = []
+                for previous in predecessors(current):
+                    if previous != parent[current] and best[previous] < inf:
+                        heap.append((value + best[previous], previous, 0))
+                heapq.heapify(heap)
+                candidates[current] = heap
+
+            # the path taken last is replaced as a candidate by the next path through the same parent, which may have to be worked out first
+            if current not in followed:
+                _, previous, previous_index = current_paths[-1]
+                previous_paths = cell_paths(previous)
+                if len(previous_paths) <= previous_index + 1 and previous not in exhausted:
+                    stack.append((previous, previous_index + 1))
+                    continue
+                if len(previous_paths) > previous_index + 1:
+                    heapq.heappush(candidates[current], (previous_paths[previous_index + 1][0] + occupancy(current), previous, previous_index + 1))
+                followed.add(current)
+
+            if candidates[current]:
+                current_paths.append(heapq.heappop(candidates[current]))
+                followed.discard(current)
+            else:
+                exhausted.add(current)
+
+        return index < len(cell_paths(cell))
+
+    plans = []
+    for index in range(k):
+        if not find_path(sink, index):
+            break
+
+        total_occupancy, cell, cell_index = paths[sink][index]
+        sections_location = [None] * n
+        while cell != -1:
+            sections_location[cell // m] = (cell // m, cell % m)
+            _, cell, cell_index = cell_paths(cell)[cell_index]
+        plans.append([total_occupancy, sections_location])
+
+    return plans
+
+class SectionsSolver():
+    def __init__(self, occupancy_probability) -> None:
+        """
+        Function description:
+            Constructor for SectionsSolver, a persistent select_sections that keeps its tables so a change to a few
+            cells only recomputes the cells it affects.
+
+            The forward table is the memo of select_sections, forward[i][j] being the least total occupancy of a path
+            from row 0 to (i, j). The backward table is the same from the last row up, backward[i][j] being the least
+            total occupancy of a path from (i, j) to the last row. A changed cell can only change the forward values in
+            the cone below it, which widens by a column each way per row, and the backward values in the cone above it,
+            and each cone stops growing at the first row where none of its values changed.
+
+        :Input:
+            occupancy_probability (list): matrix representing the occupancy probability, it is copied.
+
+        :Attributes:
+            occupancy: The copy of the matrix.
+            n, m: The number of rows and columns.
+            forward: The forward table.
+            backward: The backward table.
+            solution: The [minimum_total_occupancy, sections_location] of the current matrix, None until asked for after a change.
+
+        :Time complexity:
+            O(n * m) where n is the number of rows and m is the number of columns.
+
+        :Aux space complexity:
+            O(n * m) where n is the number of rows and m is the number of columns.
+        """
+        self.occupancy = [list(row) for row in occupancy_probability]
+        self.n = len(self.occupancy)
+        self.m = len(self.occupancy[0])
+        self.forward = [list(row) for row in self.occupancy]
+        self.backward = [list(row) for row in self.occupancy]
+        self.solution = None
+
+        for i in range(1, self.n):
+            for j in range(self.m):
+                self.forward[i][j] = self.cell_cost(self.forward, i, j, i - 1)
+        for i in range(self.n - 2, -1, -1):
+            for j in range(self.m):
+                self.backward[i][j] = self.cell_cost(self.backward, i, j, i + 1)
+
+    def cell_cost(self, table, i, j, neighbour_row):
+        """
+        Function description:
+            Computes an entry of a table from the row next to it, the occupancy of the cell plus the least of its neighbours
+            j - 1, j and j + 1, tried in that order with a strict comparison as select_sections does.
+
+        :Input:
+            table (list): The forward or backward table.
+            i, j (int): The cell.
+            neighbour_row (int): The row the entry is computed from, i - 1 for the forward table and i + 1 for the backward one.
+
+        :Output:
+            The value of the entry.
+
+        :Time complexity:
+            O(1)
+
+        :Aux space complexity:
+            O(1)
+        """
+        value = self.occupancy[i][j]
+        best = float('inf')
+        for k in range(max(j - 1, 0), min(j + 2, self.m)):
+            candidate = value + table[neighbour_row][k]
+            if best > candidate:
+                best = candidate
+        return best
+
+    def update_cone(self, table, i, j, step) -> int:
+        """
+        Function description:
+            Recomputes the entries of a table that depend on cell (i, j), row by row away from it in the direction of step,
+            over the columns next to the ones that changed in the row before.
+
+        :Input:
+            table (list): The forward table with step 1, or the backward table with step -1.
+            i, j (int): The changed cell.
+            step (int): The direction the table is filled in.
+
+        :Output:
+            The number of entries recomputed.
+
+        :Time complexity:
+            O(c) where c is the number of entries in the cone, at most r * m where r is the number of rows it reaches.
+
+        :Aux space complexity:
+            O(1)
+        """
+        first_row = 0 if step == 1 else self.n - 1
+        low = high = j
+        recomputed = 0
+        row = i
+        while 0 <= row < self.n:
+            changed_low = self.m
+            changed_high = -1
+            for column in range(low, high + 1):
+                if row == first_row:
+                    value = self.occupancy[row][column]
+                else:
+                    value = self.cell_cost(table, row, column, row - step)
+                recomputed += 1
+                if value != table[row][column]:
+                    table[row][column] = value
+                    changed_low = min(changed_low, column)
+                    changed_high = max(changed_high, column)
+
+            # the cone ends once a row is left unchanged, the rows after it read the same values as before
+            if changed_high == -1:
+                break
+            low = max(changed_low - 1, 0)
+            high = min(changed_high + 1, self.m - 1)
+            row += step
+
+        return recomputed
+
+    def update(self, i, j, value) -> int:
+        """
+        Function description:
+            Changes the occupancy of cell (i, j) and recomputes the forward and backward entries it affects.
+
+        :Input:
+            i, j (int): The cell.
+            value: Its new occupancy probability.
+
+        :Output:
+            The number of table entries recomputed.
+
+        :Time complexity:
+            O(c) where c is the number of entries in the two cones, O(n * m) at worst.
+
+        :Aux space complexity:
+            O(1)
+        """
+        if self.occupancy[i][j] == value:
+            return 0
+
+        self.occupancy[i][j] = value
+        self.solution = None
+        return self.update_cone(self.forward, i, j, 1) + self.update_cone(self.backward, i, j, -1)
+
+    def best_through(self, i, j):
+        """
+        Function description:
+            Returns the least total occupancy of a plan that selects cell (i, j), from the forward and backward tables.
+
+        :Input:
+            i, j (int): The cell.
+
+        :Output:
+            The least total occupancy of a plan through the cell.
+
+        :Time complexity:
+            O(1)
+
+        :Aux space complexity:
+            O(1)
+        """
+        return self.forward[i][j] + self.backward[i][j] - self.occupancy[i][j]
+
+    def solve(self) -> list:
+        """
+        Function description:
+            Returns the [minimum_total_occupancy, sections_location] of the current matrix, the same as select_sections,
+            backtracking through the forward table as it does. The answer is cached until the next change.
+
+        :Output:
+            A list containing the minimum total occupancy probability and the list of section locations for each row.
+
+        :Time complexity:
+            O(n + m) where n is the number of rows and m is the number of columns, O(1) once cached.
+
+        :Aux space complexity:
+            O(n) where n is the number of rows.
+        """
+        if self.solution is not None:
+            return self.solution
+
+        forward = self.forward
+        last_row = forward[-1]
+        column = 0
+        for j in range(1, self.m):
+            if last_row[j] < last_row[column]:
+                column = j
+
+        sections_location = [None] * self.n
+        for i in range(self.n - 1, 0, -1):
+            sections_location[i] = (i, column)
+            for k in range(max(column - 1, 0), min(column + 2, self.m)):
+                if forward[i][column] == self.occupancy[i][column] + forward[i - 1][k]:
+                    column = k
+                    break
+        sections_location[0] = (0, column)
+
+        self.solution = [last_row[sections_location[-1][1]], sections_location]
+        return self.solution
+
 if __name__ == "__main__":
     # Example 1 - Q1
     start = 0
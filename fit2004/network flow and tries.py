@@ -2,6 +2,7 @@
 Last modified: 26/5/2023
 Version: Final
 """
+from array import array
 from collections import deque
 
 # ==================== Q1 ====================
@@ -746,22 +747,795 @@ class ResidualNetwork:
         return min_residual
 
 
-def maxThroughput(connections, maxIn, maxOut, origin, targets):
+class FlowNetwork:
+    """
+    Class representing a residual network stored in flat arrays instead of NetworkVertex and NetworkEdge objects.
+
+    Every edge is a pair of arcs, the forward arc 2k and the backward arc 2k + 1, so the reverse of arc a is a ^ 1 and
+    the tail of arc a is the head of a ^ 1. The head, capacity and flow of every arc live in arrays indexed by the arc,
+    the flow is kept skew symmetric, flow[a ^ 1] == -flow[a], and the residual of an arc is capacity[a] - flow[a]. The
+    arcs leaving each vertex are listed in compressed sparse row order, the arcs of vertex u are arcs[offsets[u]] to
+    arcs[offsets[u + 1] - 1], which build fills in after the last add_edge.
+
+    Capacities and flows are 64 bit integers, an infinite capacity is stored as INFINITY which no flow can reach.
+
+    Input:
+        vertices (int): Number of vertices in the network.
+
+    Precondition:
+        None
+
+    Postcondition:
+        A FlowNetwork object is created with the given number of vertices and no edges.
+
+    Time complexity:
+        Best:
+            O(V) where V is the number of vertices
+
+        Worst:
+            O(V)
+
+    Space complexity:
+        Input:
+            O(1)
+
+        Aux:
+            O(V)
+    """
+    INFINITY = 2 ** 62
+
+    def __init__(self, vertices):
+        self.num_vertices = vertices
+        self.heads = array('i')
+        self.capacity = array('q')
+        self.flow = array('q')
+        self.offsets = array('q', [0] * (vertices + 1))
+        self.arcs = array('i')
+
+        self.super_source = None
+        self.super_sink = None
+
+    def add_edge(self, u, v, capacity, reverse_capacity=0):
+        """
+        Function description:
+            Adds an edge from u to v as the pair of arcs 2k and 2k + 1.
+
+        Precondition:
+            None
+
+        Postcondition:
+            The edge is added to the network, build has to be called again before solving.
+
+        Input:
+            u (int): Source vertex id.
+            v (int): Destination vertex id.
+            capacity (int): Capacity of the edge, float('inf') for an infinite capacity.
+            reverse_capacity (int): Capacity of the backward arc, 0 for a directed edge.
+
+        Output:
+            The index of the forward arc.
+
+        Time complexity:
+            Best:
+                O(1) amortised
+
+            Worst:
+                O(1) amortised
+
+        Space complexity:
+            Input:
+                O(1)
+
+            Aux:
+                O(1)
+        """
+        arc = len(self.heads)
+        self.heads.append(v)
+        self.heads.append(u)
+        self.capacity.append(min(capacity, self.INFINITY))
+        self.capacity.append(min(reverse_capacity, self.INFINITY))
+        self.flow.append(0)
+        self.flow.append(0)
+        return arc
+
+    def build(self):
+        """
+        Function description:
+            Lists the arcs leaving each vertex in compressed sparse row order.
+
+        Approach description:
+            A counting sort on the tails of the arcs, the arcs of each vertex keep the order they were added in.
+
+        Precondition:
+            None
+
+        Postcondition:
+            offsets and arcs hold the adjacency of every arc added so far.
+
+        Input:
+            None
+
+        Output:
+            None
+
+        Time complexity:
+            Best:
+                O(V + E) where V is the number of vertices and E is the number of edges
+
+            Worst:
+                O(V + E)
+
+        Space complexity:
+            Input:
+                O(1)
+
+            Aux:
+                O(V + E)
+        """
+        heads = self.heads
+        counts = [0] * (self.num_vertices + 1)
+        for arc in range(len(heads)):
+            counts[heads[arc ^ 1] + 1] += 1
+        for u in range(self.num_vertices):
+            counts[u + 1] += counts[u]
+        self.offsets = array('q', counts)
+
+        position = counts[:-1]
+        arcs = [0] * len(heads)
+        for arc in range(len(heads)):
+            tail = heads[arc ^ 1]
+            arcs[position[tail]] = arc
+            position[tail] += 1
+        self.arcs = array('i', arcs)
+
+    def residual(self, arc):
+        """
+        Function description:
+            Returns the residual of an arc.
+
+        Input:
+            arc (int): Index of the arc.
+
+        Output:
+            The residual of the arc.
+
+        Time complexity:
+            Best:
+                O(1)
+
+            Worst:
+                O(1)
+
+        Space complexity:
+            Input:
+                O(1)
+
+            Aux:
+                O(1)
+        """
+        return self.capacity[arc] - self.flow[arc]
+
+    def memory(self):
+        """
+        Function description:
+            Reports the memory held by the arrays of the network.
+
+        Input:
+            None
+
+        Output:
+            total (int): Number of bytes held by the arrays.
+            per_arc (float): total divided by the number of arcs, counting both arcs of every edge.
+
+        Time complexity:
+            Best:
+                O(1)
+
+            Worst:
+                O(1)
+
+        Space complexity:
+            Input:
+                O(1)
+
+            Aux:
+                O(1)
+        """
+        total = 0
+        for buffer in (self.heads, self.capacity, self.flow, self.offsets, self.arcs):
+            total += buffer.buffer_info()[1] * buffer.itemsize
+        return total, total / max(1, len(self.heads))
+
+    def ford_fulkerson(self, source, sink, limit=None):
+        """
+        Function description:
+            Performs the Ford-Fulkerson algorithm with breadth-first searches (Edmonds-Karp) on the arrays, starting from
+            the current flow.
+
+        Precondition:
+            build has been called after the last add_edge.
+
+        Postcondition:
+            The flow of every arc is a maximum flow from the source to the sink, or limit more than it was.
+
+        Input:
+            source (int): Id of the source vertex.
+            sink (int): Id of the sink vertex.
+            limit (int): The most flow to add, None for no limit.
+
+        Output:
+            The flow added from the source to the sink, the maximum flow of the network when it starts from no flow.
+
+        Time complexity:
+            Best:
+                O(V + E) where V is the number of vertices and E is the number of edges
+
+            Worst:
+                O(V * E^2)
+
+        Space complexity:
+            Input:
+                O(1)
+
+            Aux:
+                O(V)
+        """
+        heads, capacity, flow, offsets, arcs = self.heads, self.capacity, self.flow, self.offsets, self.arcs
+        max_flow = 0
+
+        while limit is None or max_flow < limit:
+            # the arc each vertex was discovered through, -1 if it is undiscovered
+            previous = [-1] * self.num_vertices
+            previous[source] = len(heads)
+            queue = deque([source])
+
+            while queue and previous[sink] < 0:
+                u = queue.popleft()
+                for i in range(offsets[u], offsets[u + 1]):
+                    arc = arcs[i]
+                    v = heads[arc]
+                    if previous[v] < 0 and capacity[arc] > flow[arc]:
+                        previous[v] = arc
+                        queue.append(v)
+
+            if previous[sink] < 0:
+                return max_flow
+
+            # find the bottleneck by walking back from the sink, then push it
+            bottleneck = self.INFINITY if limit is None else limit - max_flow
+            v = sink
+            while v != source:
+                arc = previous[v]
+                bottleneck = min(bottleneck, capacity[arc] - flow[arc])
+                v = heads[arc ^ 1]
+
+            v = sink
+            while v != source:
+                arc = previous[v]
+                flow[arc] += bottleneck
+                flow[arc ^ 1] -= bottleneck
+                v = heads[arc ^ 1]
+
+            max_flow += bottleneck
+
+        return max_flow
+
+    def dinic(self, source, sink):
+        """
+        Function description:
+            Performs Dinic's algorithm on the arrays.
+
+        Approach description:
+            Every phase labels the vertices with a breadth-first search from the source and then saturates the level graph
+            with a blocking flow, so one search serves every shortest augmenting path of that length instead of one path
+            per search. The blocking flow is an iterative depth-first search that keeps a current arc per vertex, which
+            only ever moves forward, and retreats only to the tail of the first saturated arc after each augmentation.
+            The distance from the source to the sink strictly increases each phase, so there are at most V phases.
+
+        Precondition:
+            build has been called after the last add_edge.
+
+        Postcondition:
+            The flow of every arc is a maximum flow from the source to the sink.
+
+        Input:
+            source (int): Id of the source vertex.
+            sink (int): Id of the sink vertex.
+
+        Output:
+            The maximum flow of the network.
+
+        Time complexity:
+            Best:
+                O(V + E) where V is the number of vertices and E is the number of edges
+
+            Worst:
+                O(V^2 * E)
+
+        Space complexity:
+            Input:
+                O(1)
+
+            Aux:
+                O(V)
+        """
+        heads, capacity, flow, offsets, arcs = self.heads, self.capacity, self.flow, self.offsets, self.arcs
+        n = self.num_vertices
+        max_flow = 0
+
+        while True:
+            # level graph
+            level = [-1] * n
+            level[source] = 0
+            queue = deque([source])
+            while queue:
+                u = queue.popleft()
+                if u == sink:
+                    break
+                for i in range(offsets[u], offsets[u + 1]):
+                    arc = arcs[i]
+                    v = heads[arc]
+                    if level[v] < 0 and capacity[arc] > flow[arc]:
+                        level[v] = level[u] + 1
+                        queue.append(v)
+
+            if level[sink] < 0:
+                return max_flow
+
+            # blocking flow
+            current = list(offsets)
+            path = []
+            u = source
+
+            while True:
+                if u == sink:
+                    bottleneck = min(capacity[arc] - flow[arc] for arc in path)
+                    for arc in path:
+                        flow[arc] += bottleneck
+                        flow[arc ^ 1] -= bottleneck
+                    max_flow += bottleneck
+
+                    # retreat to the tail of the first saturated arc
+                    for i in range(len(path)):
+                        if capacity[path[i]] == flow[path[i]]:
+                            del path[i:]
+                            break
+                    u = heads[path[-1]] if path else source
+                    continue
+
+                i = current[u]
+                end = offsets[u + 1]
+                next_level = level[u] + 1
+
+                # advance the current arc past anything saturated or not leading one level deeper
+                while i < end and (capacity[arcs[i]] == flow[arcs[i]] or level[heads[arcs[i]]] != next_level):
+                    i += 1
+                current[u] = i
+
+                if i < end:
+                    path.append(arcs[i])
+                    u = heads[arcs[i]]
+                elif path:
+                    # dead end, drop u from the level graph and skip the arc that led here
+                    level[u] = -1
+                    u = heads[path.pop() ^ 1]
+                    current[u] += 1
+                else:
+                    break
+
+    def push_relabel(self, source, sink, selection="highest"):
+        """
+        Function description:
+            Performs the push-relabel algorithm on the arrays.
+
+        Approach description:
+            The source first saturates all of its arcs, then any vertex holding more flow than it passes on is discharged,
+            pushing its excess along arcs to vertices exactly one below it and raising its own height when no such arc is
+            left. selection="highest" always discharges an active vertex of the greatest height, selection="fifo" discharges
+            them in the order they became active.
+
+            Two heuristics keep the heights close to the true distances to the sink. When the last vertex of some height
+            is relabelled no vertex above that height can reach the sink any more, so the gap heuristic lifts all of them to
+            V at once. Every V relabels a backward breadth-first search from the sink resets every height to the exact
+            distance. Only the first phase is run, a vertex of height V or more is never discharged, since the excess at the
+            sink is already the maximum flow when no active vertex below V is left.
+
+        Precondition:
+            build has been called after the last add_edge and every arc out of the source has a finite capacity.
+
+        Postcondition:
+            The flow of the arcs is a maximum preflow, the excess that cannot reach the sink is not returned to the source.
+
+        Input:
+            source (int): Id of the source vertex.
+            sink (int): Id of the sink vertex.
+            selection (str): Either "highest" or "fifo", the order active vertices are discharged in.
+
+        Output:
+            The maximum flow of the network.
+
+        Time complexity:
+            Best:
+                O(V + E) where V is the number of vertices and E is the number of edges
+
+            Worst:
+                O(V^2 * sqrt(E)) with highest label selection, O(V^3) with fifo selection
+
+        Space complexity:
+            Input:
+                O(1)
+
+            Aux:
+                O(V)
+        """
+        if selection not in ("highest", "fifo"):
+            raise ValueError("Unknown push-relabel selection: " + str(selection))
+
+        heads, capacity, flow, offsets, arcs = self.heads, self.capacity, self.flow, self.offsets, self.arcs
+        n = self.num_vertices
+        height = [0] * n
+        excess = [0] * n
+        current = list(offsets[:-1])
+        count = [0] * (n + 1)
+        highest = selection == "highest"
+        buckets = [[] for _ in range(n)]
+        queue = deque()
+        top = 0
+
+        def global_relabel():
+            # exact distances to the sink over arcs with residual, unreachable vertices are lifted to n
+            nonlocal top
+            for v in range(n):
+                height[v] = n
+            height[sink] = 0
+            bfs = deque([sink])
+            while bfs:
+                v = bfs.popleft()
+                for i in range(offsets[v], offsets[v + 1]):
+                    back = arcs[i] ^ 1
+                    u = heads[back ^ 1]
+                    if height[u] == n and u != source and capacity[back] > flow[back]:
+                        height[u] = height[v] + 1
+                        bfs.append(u)
+
+            for v in range(n + 1):
+                count[v] = 0
+            for v in range(n):
+                count[height[v]] += 1
+                current[v] = offsets[v]
+
+            # the active vertices are collected again as their heights have changed
+            for bucket in buckets:
+                bucket.clear()
+            queue.clear()
+            top = 0
+            for v in range(n):
+                if excess[v] > 0 and height[v] < n and v != sink and v != source:
+                    activate(v)
+
+        def activate(v):
+            nonlocal top
+            if highest:
+                buckets[height[v]].append(v)
+                if height[v] > top:
+                    top = height[v]
+            else:
+                queue.append(v)
+
+        # saturate every arc out of the source
+        for i in range(offsets[source], offsets[source + 1]):
+            arc = arcs[i]
+            amount = capacity[arc] - flow[arc]
+            if amount > 0:
+                flow[arc] += amount
+                flow[arc ^ 1] -= amount
+                excess[heads[arc]] += amount
+                excess[source] -= amount
+
+        global_relabel()
+        relabels = 0
+
+        while True:
+            # pick the next active vertex
+            if highest:
+                while top > 0 and not buckets[top]:
+                    top -= 1
+                if not buckets[top]:
+                    break
+                v = buckets[top].pop()
+                # entries left behind by the gap heuristic are skipped
+                if height[v] != top or excess[v] <= 0:
+                    continue
+            else:
+                if not queue:
+                    break
+                v = queue.popleft()
+                if height[v] >= n or excess[v] <= 0:
+                    continue
+
+            # discharge v until its excess is gone or it has to be relabelled
+            i = current[v]
+            end = offsets[v + 1]
+            target_height = height[v] - 1
+            while i < end:
+                arc = arcs[i]
+                w = heads[arc]
+                residual = capacity[arc] - flow[arc]
+                if residual > 0 and height[w] == target_height:
+                    amount = excess[v] if excess[v] < residual else residual
+                    flow[arc] += amount
+                    flow[arc ^ 1] -= amount
+                    excess[v] -= amount
+                    if excess[w] == 0 and w != sink and w != source:
+                        activate(w)
+                    excess[w] += amount
+                    if excess[v] == 0:
+                        break
+                i += 1
+            current[v] = i
+
+            if excess[v] == 0:
+                continue
+
+            # relabel v to one above its lowest neighbour with residual
+            old_height = height[v]
+            new_height = n
+            for i in range(offsets[v], end):
+                arc = arcs[i]
+                if capacity[arc] > flow[arc] and height[heads[arc]] + 1 < new_height:
+                    new_height = height[heads[arc]] + 1
+            count[old_height] -= 1
+            relabels += 1
+
+            if count[old_height] == 0:
+                # gap heuristic, nothing at or above old_height can reach the sink any more
+                for u in range(n):
+                    if old_height < height[u] < n:
+                        count[height[u]] -= 1
+                        height[u] = n
+                new_height = n
+
+            height[v] = new_height
+            count[new_height] += 1
+            current[v] = offsets[v]
+
+            if relabels >= n:
+                relabels = 0
+                global_relabel()
+            elif new_height < n:
+                activate(v)
+
+        return excess[sink]
+
+    def flow_value(self, source):
+        """
+        Function description:
+            Returns the net flow leaving the source.
+
+        Input:
+            source (int): Id of the source vertex.
+
+        Output:
+            The sum of the flow on the arcs leaving the source, arcs bringing flow back in count negatively.
+
+        Time complexity:
+            Best:
+                O(D) where D is the number of arcs leaving the source
+
+            Worst:
+                O(D)
+
+        Space complexity:
+            Input:
+                O(1)
+
+            Aux:
+                O(1)
+        """
+        return sum(self.flow[self.arcs[i]] for i in range(self.offsets[source], self.offsets[source + 1]))
+
+    def set_capacity(self, arc, capacity, source, sink):
+        """
+        Function description:
+            Changes the capacity of an arc and repairs the maximum flow from the existing flow instead of solving again.
+
+        Approach description:
+            When the capacity does not drop below the flow of the arc the flow stays feasible and Dinic's algorithm only
+            has to find the augmenting paths the change opened up, starting from the current flow.
+
+            Otherwise the excess flow is taken off the arc, which leaves its tail u with more flow coming in than going out
+            and its head v with less. That excess is first rerouted from u to v along other paths of the residual network,
+            which keeps the flow value, and whatever cannot be rerouted is cancelled by sending it from u back to the
+            source and from the sink back to v, which undoes it only along the paths that carried it. A final Dinic's
+            search picks up any path the cancelling opened up elsewhere.
+
+        Precondition:
+            build has been called after the last add_edge and the flow is a maximum flow from the source to the sink, as
+            left by ford_fulkerson, dinic or an earlier set_capacity, push_relabel only leaves a preflow.
+
+        Postcondition:
+            The flow is a maximum flow of the changed network.
+
+        Input:
+            arc (int): Index of the arc.
+            capacity (int): The new capacity of the arc, float('inf') for an infinite capacity.
+            source (int): Id of the source vertex.
+            sink (int): Id of the sink vertex.
+
+        Output:
+            The new maximum flow of the network, a RuntimeError is raised if the excess cannot all be cancelled, which
+            only happens when the precondition does not hold.
+
+        Time complexity:
+            Best:
+                O(V + E) where V is the number of vertices and E is the number of edges, a single search when the maximum
+                flow does not change
+
+            Worst:
+                O(V^2 * E)
+
+        Space complexity:
+            Input:
+                O(1)
+
+            Aux:
+                O(V)
+        """
+        capacity = min(capacity, self.INFINITY)
+        self.capacity[arc] = capacity
+        excess = self.flow[arc] - capacity
+
+        if excess > 0:
+            u = self.heads[arc ^ 1]
+            v = self.heads[arc]
+            self.flow[arc] -= excess
+            self.flow[arc ^ 1] += excess
+
+            # reroute what the other paths can carry, cancel the rest on both sides of the arc
+            excess -= self.ford_fulkerson(u, v, excess)
+
+            # a maximum flow always has room to send the excess back, anything less would break flow conservation
+            if excess > 0 and u != source:
+                cancelled = self.ford_fulkerson(u, source, excess)
+                if cancelled != excess:
+                    raise RuntimeError("only " + str(cancelled) + " of " + str(excess) + " cancelled back to the source, the flow was not a maximum flow")
+            if excess > 0 and v != sink:
+                cancelled = self.ford_fulkerson(sink, v, excess)
+                if cancelled != excess:
+                    raise RuntimeError("only " + str(cancelled) + " of " + str(excess) + " cancelled back from the sink, the flow was not a maximum flow")
+
+        self.dinic(source, sink)
+        return self.flow_value(source)
+
+
+def vertex_capacity(vertex, maxIn, maxOut, origin, is_target):
     """
     Function description:
-        Computes the maximum throughput of the network.
+        Returns the capacity of the edge between the 'in' and 'out' vertex of a vertex in build_flow_network.
+
+    Input:
+        vertex (int): Integer representing the vertex.
+        maxIn (list): List of integers representing the maximum in capacity of each vertex.
+        maxOut (list): List of integers representing the maximum out capacity of each vertex.
+        origin (int): Integer representing the origin vertex.
+        is_target (bool): Boolean representing whether the vertex is a target or not.
+
+    Output:
+        maxOut for the origin, maxIn for a target that can be reached and the smaller of the two for any other vertex.
+
+    Time complexity:
+        Best:
+            O(1)
+
+        Worst:
+            O(1)
+
+    Space complexity:
+        Input:
+            O(1)
+
+        Aux:
+            O(1)
+    """
+    if vertex == origin:
+        return maxOut[vertex]
+    if is_target and maxOut[vertex] > 0:
+        return maxIn[vertex]
+    return min(maxIn[vertex], maxOut[vertex])
+
+def build_flow_network(connections, maxIn, maxOut, origin, targets):
+    """
+    Function description:
+        Builds the network of maxThroughput as a FlowNetwork, splitting every vertex into two instead of three and without
+        creating any NetworkVertex or NetworkEdge.
 
     Approach description:
-        The maxThroughput function implements the Ford-Fulkerson algorithm to find the maximum flow or throughput in a network. It constructs a residual network by splitting each vertex into 'in', 'original', and 'out' vertices. The original network is represented using NetworkVertex and NetworkEdge classes, and the residual network is represented using the ResidualNetwork class.
+        split_vertex gives vertex i an 'in' to 'original' edge of capacity maxIn[i] followed by an 'original' to 'out' edge
+        of capacity maxOut[i], and nothing else touches the 'original' vertex of anything but the origin. Two edges in series
+        carry as much as the smaller of them, so vertex i only needs an 'in' vertex 2i and an 'out' vertex 2i + 1 joined by
+        one edge of capacity min(maxIn[i], maxOut[i]).
 
-        The function first initializes a residual network with the specified number of vertices. It then splits each vertex into 'in', 'original', and 'out' vertices, creating appropriate edges and capacities. Next, it creates the network by adding edges between the vertices based on the provided connections. If the network is residual, the capacities of the edges are set to infinity; otherwise, the capacities are set to the specified values.
+        The limits are the ones maxThroughput's ford_fulkerson ends up enforcing. A target's maxOut is never counted by
+        augment_path, so the edge of a target only carries maxIn, or nothing when its maxOut is 0 as the target is then
+        unreachable. The origin is only limited by maxOut, so its 'in' vertex becomes the source itself with an edge of
+        capacity maxOut[origin], which also removes the super source. Flow that comes back into the origin is never needed
+        for the maximum flow, as the part of the path after its first visit to the origin would do on its own. The super
+        sink is vertex 2V and the edges into the last vertex keep the infinite capacity create_network gives them.
 
-        After creating the network, the function adds a super sink and connects the 'out' vertices of the target vertices to the super sink. It also adds a super source and connects the 'in' vertices of the origin vertex to the super source.
+        That leaves 2V + 1 vertices and V + E + T edges, where T is the number of targets, against 3V + 2 vertices and
+        2V + E + T + 1 edges for the split network of ResidualNetwork.
 
-        The Ford-Fulkerson algorithm is then applied to find the maximum flow from the super source to the super sink. It iteratively performs a breadth-first search (BFS) on the residual network to find an augmenting path from the super source to the super sink. If such a path exists, the algorithm augments the flow along the path and updates the residual capacities of the edges. This process continues until no augmenting paths can be found.
+    Precondition:
+        The origin is not one of the targets.
+
+    Postcondition:
+        The network is built, super_source and super_sink are set.
+
+    Input:
+        connections (list): List of tuples representing the connections between vertices.
+        maxIn (list): List of integers representing the maximum in capacity of each vertex.
+        maxOut (list): List of integers representing the maximum out capacity of each vertex.
+        origin (int): Integer representing the origin vertex.
+        targets (list): List of integers representing the target vertices.
+
+    Output:
+        The FlowNetwork.
+
+    Time complexity:
+        Best:
+            O(V + E) where V is the number of vertices and E is the number of edges
+
+        Worst:
+            O(V + E)
+
+    Space complexity:
+        Input:
+            O(V + E)
+
+        Aux:
+            O(V + E)
+    """
+    vertices = len(maxIn)
+    network = FlowNetwork(2 * vertices + 1)
+    is_target = [False] * vertices
+    for target in targets:
+        is_target[target] = True
+
+    # the single edge from the 'in' to the 'out' vertex of every vertex
+    for i in range(vertices):
+        network.add_edge(i * 2, i * 2 + 1, vertex_capacity(i, maxIn, maxOut, origin, is_target[i]))
+
+    # the connections, edges into the last vertex have an infinite capacity as in create_network
+    for u, v, capacity in connections:
+        if v == (len(connections) - 1):
+            network.add_edge(u * 2 + 1, v * 2, float('inf'))
+        else:
+            network.add_edge(u * 2 + 1, v * 2, capacity)
+
+    network.super_sink = 2 * vertices
+    for target in targets:
+        network.add_edge(target * 2 + 1, network.super_sink, float('inf'))
+
+    network.super_source = origin * 2
+
+    network.build()
+    return network
+
+
+def maxThroughput(connections, maxIn, maxOut, origin, targets, algorithm="ford_fulkerson"):
+    """
+    Function description:
+        Computes the maximum throughput of the network.
+
+    Approach description:
+        The maxThroughput function builds the network with build_flow_network, which splits each vertex into an 'in' and an 'out' vertex joined by a single edge carrying its maxIn and maxOut limits, connects the 'out' vertex of every target to a super sink and uses the 'in' vertex of the origin as the source. Every edge is kept in a few flat arrays of a FlowNetwork rather than in NetworkEdge objects.
+
+        The Ford-Fulkerson algorithm is then applied to find the maximum flow from the source to the super sink. It iteratively performs a breadth-first search (BFS) on the residual network to find an augmenting path from the source to the super sink. If such a path exists, the algorithm augments the flow along the path and updates the residual capacities of the edges. This process continues until no augmenting paths can be found. algorithm="dinic" solves the same network with Dinic's algorithm, and algorithm="push_relabel" or "push_relabel_fifo" with the highest label or fifo push-relabel algorithm.
 
         Finally, it returns the maximum flow as the maximum throughput from the origin to the targets in the network.
 
+        algorithm="reference" keeps the original solution as a reference. It splits each vertex into 'in', 'original', and 'out' NetworkVertex objects of a ResidualNetwork, adds the connections, a super sink and a super source, and runs Ford-Fulkerson on NetworkEdge objects. build_flow_network applies the same vertex limits that solution ends up enforcing, so every algorithm gives the same maximum throughput.
+
     Precondition:
         Resdiual Network set up correctly
 
@@ -774,6 +1548,8 @@ def maxThroughput(connections, maxIn, maxOut, origin, targets):
         maxOut (list): List of integers representing the maximum out capacity of each vertex.
         origin (int): Integer representing the origin vertex.
         targets (list): List of integers representing the target vertices.
+        algorithm (str): One of "ford_fulkerson", "dinic", "push_relabel", "push_relabel_fifo" or "reference", the max flow
+            algorithm used to solve the network.
 
     Output:
         The maximum throughput of the network.
@@ -783,8 +1559,20 @@ def maxThroughput(connections, maxIn, maxOut, origin, targets):
             O(V * E^2) where V is the number of vertices and E is the number of edges
 
         Worst:
-            O(V * E^2)    
+            O(V * E^2), O(V^2 * E) with Dinic's algorithm or O(V^2 * sqrt(E)) with highest label push-relabel
     """
+    if algorithm in ("ford_fulkerson", "dinic", "push_relabel", "push_relabel_fifo"):
+        network = build_flow_network(connections, maxIn, maxOut, origin, targets)
+        if algorithm == "ford_fulkerson":
+            return network.ford_fulkerson(network.super_source, network.super_sink)
+        if algorithm == "dinic":
+            return network.dinic(network.super_source, network.super_sink)
+        selection = "highest" if algorithm == "push_relabel" else "fifo"
+        return network.push_relabel(network.super_source, network.super_sink, selection)
+
+    if algorithm != "reference":
+        raise ValueError("Unknown max flow algorithm: " + str(algorithm))
+
     # the number of vertices in the original network
     vertices = len(maxIn)
 
@@ -806,6 +1594,205 @@ def maxThroughput(connections, maxIn, maxOut, origin, targets):
     return network.ford_fulkerson(network.super_source, network.super_sink)
 
 
+class ThroughputNetwork:
+    """
+    Class representing a maxThroughput network that keeps its maximum flow between capacity changes.
+
+    The network is built with build_flow_network and solved once with Dinic's algorithm, after that every change of a
+    connection's capacity or of a maxIn or maxOut only changes the capacity of one arc and repairs the current flow with
+    FlowNetwork.set_capacity, so the throughput after a small change costs a fraction of solving from zero flow.
+
+    Input:
+        connections (list): List of tuples representing the connections between vertices.
+        maxIn (list): List of integers representing the maximum in capacity of each vertex.
+        maxOut (list): List of integers representing the maximum out capacity of each vertex.
+        origin (int): Integer representing the origin vertex.
+        targets (list): List of integers representing the target vertices.
+
+    Precondition:
+        The origin is not one of the targets.
+
+    Postcondition:
+        A ThroughputNetwork object is created and throughput holds the maximum throughput of the network.
+
+    Time complexity:
+        Best:
+            O(V + E) where V is the number of vertices and E is the number of edges
+
+        Worst:
+            O(V^2 * E)
+
+    Space complexity:
+        Input:
+            O(V + E)
+
+        Aux:
+            O(V + E)
+    """
+    def __init__(self, connections, maxIn, maxOut, origin, targets):
+        self.connections = list(connections)
+        self.maxIn = list(maxIn)
+        self.maxOut = list(maxOut)
+        self.origin = origin
+
+        self.is_target = [False] * len(maxIn)
+        for target in targets:
+            self.is_target[target] = True
+
+        self.network = build_flow_network(self.connections, self.maxIn, self.maxOut, origin, targets)
+        self.throughput = self.network.dinic(self.network.super_source, self.network.super_sink)
+
+    def set_connection(self, index, capacity):
+        """
+        Function description:
+            Changes the capacity of a connection and updates the throughput.
+
+        Precondition:
+            None
+
+        Postcondition:
+            throughput is the maximum throughput of the changed network.
+
+        Input:
+            index (int): Position of the connection in connections.
+            capacity (int): The new capacity of the connection.
+
+        Output:
+            The maximum throughput of the changed network.
+
+        Time complexity:
+            Best:
+                O(V + E) where V is the number of vertices and E is the number of edges
+
+            Worst:
+                O(V^2 * E)
+
+        Space complexity:
+            Input:
+                O(1)
+
+            Aux:
+                O(V)
+        """
+        u, v, _ = self.connections[index]
+        self.connections[index] = (u, v, capacity)
+
+        # edges into the last vertex always have an infinite capacity, see create_network
+        if v == (len(self.connections) - 1):
+            return self.throughput
+
+        # build_flow_network adds the edge of every vertex first, then the connections in order
+        return self.set_arc(2 * (len(self.maxIn) + index), capacity)
+
+    def set_max_in(self, vertex, capacity):
+        """
+        Function description:
+            Changes the maximum in capacity of a vertex and updates the throughput.
+
+        Precondition:
+            None
+
+        Postcondition:
+            throughput is the maximum throughput of the changed network.
+
+        Input:
+            vertex (int): Integer representing the vertex.
+            capacity (int): The new maximum in capacity of the vertex.
+
+        Output:
+            The maximum throughput of the changed network.
+
+        Time complexity:
+            Best:
+                O(V + E) where V is the number of vertices and E is the number of edges
+
+            Worst:
+                O(V^2 * E)
+
+        Space complexity:
+            Input:
+                O(1)
+
+            Aux:
+                O(V)
+        """
+        self.maxIn[vertex] = capacity
+        return self.set_arc(2 * vertex, vertex_capacity(vertex, self.maxIn, self.maxOut, self.origin, self.is_target[vertex]))
+
+    def set_max_out(self, vertex, capacity):
+        """
+        Function description:
+            Changes the maximum out capacity of a vertex and updates the throughput.
+
+        Precondition:
+            None
+
+        Postcondition:
+            throughput is the maximum throughput of the changed network.
+
+        Input:
+            vertex (int): Integer representing the vertex.
+            capacity (int): The new maximum out capacity of the vertex.
+
+        Output:
+            The maximum throughput of the changed network.
+
+        Time complexity:
+            Best:
+                O(V + E) where V is the number of vertices and E is the number of edges
+
+            Worst:
+                O(V^2 * E)
+
+        Space complexity:
+            Input:
+                O(1)
+
+            Aux:
+                O(V)
+        """
+        self.maxOut[vertex] = capacity
+        return self.set_arc(2 * vertex, vertex_capacity(vertex, self.maxIn, self.maxOut, self.origin, self.is_target[vertex]))
+
+    def set_arc(self, arc, capacity):
+        """
+        Function description:
+            Changes the capacity of an arc of the network and updates the throughput, nothing is done when the capacity
+            stays the same.
+
+        Precondition:
+            None
+
+        Postcondition:
+            throughput is the maximum throughput of the changed network.
+
+        Input:
+            arc (int): Index of the arc.
+            capacity (int): The new capacity of the arc.
+
+        Output:
+            The maximum throughput of the changed network.
+
+        Time complexity:
+            Best:
+                O(1)
+
+            Worst:
+                O(V^2 * E) where V is the number of vertices and E is the number of edges
+
+        Space complexity:
+            Input:
+                O(1)
+
+            Aux:
+                O(V)
+        """
+        network = self.network
+        if network.capacity[arc] != min(capacity, network.INFINITY):
+            self.throughput = network.set_capacity(arc, capacity, network.super_source, network.super_sink)
+        return self.throughput
+
+
 # ==================== Q2 ====================
 
 class Node:
@@ -0,0 +1,149 @@
+"""
+Tests for the max flow solutions in "network flow and tries.py", the file has spaces in its name so it is loaded by path
+rather than imported.
+"""
+import importlib.util
+import os
+import random
+import unittest
+
+path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "network flow and tries.py")
+spec = importlib.util.spec_from_file_location("network_flow_and_tries", path)
+flow = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(flow)
+
+ALGORITHMS = ["ford_fulkerson", "dinic", "push_relabel", "push_relabel_fifo"]
+
+
+def random_network(seed):
+    """ A small random maxThroughput instance, with some capacities set to 0. """
+    rng = random.Random(seed)
+    vertices = rng.randint(2, 10)
+    pairs = [(u, v) for u in range(vertices) for v in range(vertices) if u != v]
+    rng.shuffle(pairs)
+    connections = [(u, v, rng.choice([0, rng.randint(1, 30)])) for u, v in pairs[:rng.randint(1, len(pairs))]]
+    maxIn = [rng.choice([0, rng.randint(1, 30), rng.randint(1, 30)]) for _ in range(vertices)]
+    maxOut = [rng.choice([0, rng.randint(1, 30), rng.randint(1, 30)]) for _ in range(vertices)]
+    origin = rng.randrange(vertices)
+    targets = rng.sample([vertex for vertex in range(vertices) if vertex != origin], rng.randint(1, vertices - 1))
+    return connections, maxIn, maxOut, origin, targets
+
+
+class TestMaxThroughput(unittest.TestCase):
+    """ Testing every max flow algorithm against the reference solution on NetworkEdge objects. """
+
+    def testExample(self):
+        connections = [(0, 1, 3000), (1, 2, 2000), (1, 3, 1000), (0, 3, 2000), (3, 4, 2000), (3, 2, 1000)]
+        maxIn = [5000, 3000, 3000, 3000, 2000]
+        maxOut = [5000, 3000, 3000, 2500, 1500]
+        for algorithm in ALGORITHMS + ["reference"]:
+            self.assertEqual(flow.maxThroughput(connections, maxIn, maxOut, 0, [4, 2], algorithm), 4500)
+
+    def testRandomNetworks(self):
+        for seed in range(300):
+            network = random_network(seed)
+            expected = flow.maxThroughput(*network, algorithm="reference")
+            for algorithm in ALGORITHMS:
+                self.assertEqual(flow.maxThroughput(*network, algorithm=algorithm), expected, (seed, algorithm))
+
+    def testUnknownAlgorithm(self):
+        with self.assertRaises(ValueError):
+            flow.maxThroughput(*random_network(0), algorithm="simplex")
+
+    def testTwoWaySplit(self):
+        connections, maxIn, maxOut, origin, targets = random_network(1)
+        network = flow.build_flow_network(connections, maxIn, maxOut, origin, targets)
+        self.assertEqual(network.num_vertices, 2 * len(maxIn) + 1)
+        self.assertEqual(len(network.heads), 2 * (len(maxIn) + len(connections) + len(targets)))
+
+
+class TestFlowNetwork(unittest.TestCase):
+    """ Testing the flat array residual network. """
+
+    def testPairedArcs(self):
+        network = flow.FlowNetwork(3)
+        self.assertEqual(network.add_edge(0, 1, 5), 0)
+        self.assertEqual(network.add_edge(1, 2, float('inf')), 2)
+        network.build()
+        self.assertEqual(network.heads[1], 0)
+        self.assertEqual(network.capacity[2], flow.FlowNetwork.INFINITY)
+        self.assertEqual(network.dinic(0, 2), 5)
+        self.assertEqual(network.flow[0], -network.flow[1])
+        self.assertEqual(network.flow_value(0), 5)
+        # heads, capacity, flow, offsets and arcs, four entries each
+        self.assertEqual(network.memory(), (4 * 4 + 4 * 8 + 4 * 8 + 4 * 8 + 4 * 4, 32.0))
+
+    def testLimitedFordFulkerson(self):
+        network = flow.FlowNetwork(2)
+        network.add_edge(0, 1, 10)
+        network.build()
+        self.assertEqual(network.ford_fulkerson(0, 1, 4), 4)
+        self.assertEqual(network.ford_fulkerson(0, 1), 6)
+
+    def testSetCapacityNeedsMaximumFlow(self):
+        network = flow.FlowNetwork(3)
+        network.add_edge(0, 1, 5)
+        arc = network.add_edge(1, 2, 5)
+        network.build()
+        # flow on the second arc that never left the source cannot be cancelled back to it
+        network.flow[arc] = 5
+        network.flow[arc ^ 1] = -5
+        with self.assertRaises(RuntimeError):
+            network.set_capacity(arc, 0, 0, 2)
+
+    def testPushRelabelSelection(self):
+        with self.assertRaises(ValueError):
+            flow.build_flow_network(*random_network(0)).push_relabel(0, 1, "lowest")
+
+
+class TestThroughputNetwork(unittest.TestCase):
+    """ Testing warm updates of a ThroughputNetwork against a cold solve. """
+
+    def testWarmUpdatesMatchColdSolve(self):
+        for seed in range(150):
+            rng = random.Random(seed)
+            connections, maxIn, maxOut, origin, targets = random_network(seed)
+            network = flow.ThroughputNetwork(connections, maxIn, maxOut, origin, targets)
+            self.assertEqual(network.throughput, flow.maxThroughput(connections, maxIn, maxOut, origin, targets, "reference"))
+
+            for _ in range(20):
+                kind = rng.randrange(3)
+                capacity = rng.choice([0, rng.randint(0, 5), rng.randint(0, 35)])
+                if kind == 0:
+                    index = rng.randrange(len(connections))
+                    u, v, _ = connections[index]
+                    connections[index] = (u, v, capacity)
+                    throughput = network.set_connection(index, capacity)
+                elif kind == 1:
+                    vertex = rng.randrange(len(maxIn))
+                    maxIn[vertex] = capacity
+                    throughput = network.set_max_in(vertex, capacity)
+                else:
+                    vertex = rng.randrange(len(maxOut))
+                    maxOut[vertex] = capacity
+                    throughput = network.set_max_out(vertex, capacity)
+
+                expected = flow.maxThroughput(connections, maxIn, maxOut, origin, targets, "reference")
+                self.assertEqual(throughput, expected, seed)
+                self.assertEqual(network.throughput, expected, seed)
+
+    def testFlowStaysFeasible(self):
+        connections, maxIn, maxOut, origin, targets = random_network(7)
+        network = flow.ThroughputNetwork(connections, maxIn, maxOut, origin, targets)
+        rng = random.Random(7)
+        for _ in range(50):
+            network.set_max_in(rng.randrange(len(maxIn)), rng.randint(0, 30))
+            flat = network.network
+            balance = [0] * flat.num_vertices
+            for arc in range(len(flat.heads)):
+                self.assertLessEqual(flat.flow[arc], flat.capacity[arc])
+                self.assertEqual(flat.flow[arc], -flat.flow[arc ^ 1])
+                balance[flat.heads[arc]] += flat.flow[arc]
+            for vertex in range(flat.num_vertices):
+                if vertex not in (flat.super_source, flat.super_sink):
+                    self.assertEqual(balance[vertex], 0)
+            self.assertEqual(balance[flat.super_sink], network.throughput)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,434 @@
+"""
+Tests for the routing and dynamic programming solutions in "dijsktra and dynamic programming.py", the file has spaces in
+its name so it is loaded by path rather than imported.
+"""
+import importlib.util
+import itertools
+import os
+import random
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dijsktra and dynamic programming.py")
+spec = importlib.util.spec_from_file_location("dijsktra_and_dynamic_programming", path)
+routing = importlib.util.module_from_spec(spec)
+# registered so the worker processes can find the functions they are sent by name
+sys.modules[spec.name] = routing
+spec.loader.exec_module(routing)
+
+
+class TestLayeredGraph(unittest.TestCase):
+    """ Testing the k layer generalisation of optimalRoute. """
+
+    def testPassengerCountedOnce(self):
+        # driving back through location 1 must not pick its only passenger up a second time
+        roads = [(0, 1, 1, 1, 1), (1, 2, 1, 1, 1), (2, 1, 1, 1, 1), (1, 3, 100, 100, 1)]
+        graph = routing.LayeredGraph(roads, [1], 3)
+        self.assertEqual(graph.dijkstra(0, 3)[0], 101)
+        self.assertEqual(graph.route(0, 3), [0, 1, 3])
+
+    def testDistinctPassengersRaiseLayers(self):
+        roads = [(0, 1, 1, 1, 1), (1, 2, 1, 1, 1), (2, 1, 1, 1, 1), (1, 3, 100, 100, 1)]
+        graph = routing.LayeredGraph(roads, [1, 2], 3)
+        self.assertEqual(graph.dijkstra(0, 3), (4, [(0, 0), (1, 0), (2, 1), (1, 2), (3, 2)]))
+
+    def testStatesBounded(self):
+        roads = [(0, 1, 1, 1, 1), (1, 2, 1, 1, 1), (2, 1, 1, 1, 1), (1, 3, 100, 100, 1)]
+        # below the last layer a location is reached with no passengers or those of one of the two locations
+        self.assertEqual(routing.LayeredGraph(roads, [1, 2], 3).num_states, 4 * (3 + 1))
+        roads = [(0, 39) + (1,) * 12]
+        with self.assertRaises(ValueError):
+            routing.LayeredGraph(roads, list(range(40)))
+        self.assertEqual(routing.LayeredGraph([(0, 39, 1, 1)], list(range(40))).num_states, 40 * 2)
+
+    def testTwoLayersMatchOptimalRoute(self):
+        roads = [(0, 3, 5, 3), (3, 4, 35, 15), (3, 2, 2, 2), (4, 0, 15, 10), (2, 4, 30, 25), (2, 0, 2, 2), (0, 1, 10, 10), (1, 4, 30, 20)]
+        for passengers in ([], [2, 1], [4]):
+            for start in range(5):
+                for end in range(5):
+                    self.assertEqual(routing.optimalRouteLayers(start, end, passengers, roads),
+                                     routing.optimalRoute(start, end, passengers, roads))
+
+
+def grid_graph(width):
+    """ A width * width grid with two way roads of weights 1 to 20, frozen into a CSRGraph. """
+    graph = routing.Graph(width * width, compact = True)
+    weight = 0
+    for v in range(width * width):
+        for u in (v + 1, v + width):
+            if (u == v + 1 and u % width == 0) or u >= width * width:
+                continue
+            weight = weight % 20 + 7
+            graph.add_edge(v, u, weight, directed = False)
+    return graph.freeze()
+
+
+class TestGraphChanges(unittest.TestCase):
+    """ Testing that precomputed speed-ups are refused after a weight change. """
+
+    def testLandmarksRefusedAfterSetWeight(self):
+        graph = grid_graph(8)
+        landmarks = routing.Landmarks.build(graph, 4)
+        self.assertEqual(graph.astar(0, 63, landmarks)[0], graph.dijkstra(0, 63)[0])
+        graph.set_weight(0, 1, 0)
+        with self.assertRaises(ValueError):
+            graph.astar(0, 63, landmarks)
+        self.assertEqual(graph.astar(0, 63, routing.Landmarks.build(graph, 4))[0], graph.dijkstra(0, 63)[0])
+
+    def testHierarchyRefusedAfterSetWeight(self):
+        graph = grid_graph(8)
+        hierarchy = routing.ContractionHierarchy.build(graph)
+        self.assertEqual(hierarchy.dijkstra(0, 63)[0], graph.dijkstra(0, 63)[0])
+        graph.set_weight(0, 1, 0)
+        with self.assertRaises(ValueError):
+            hierarchy.dijkstra(0, 63)
+        self.assertEqual(routing.ContractionHierarchy.build(graph).dijkstra(0, 63)[0], graph.dijkstra(0, 63)[0])
+
+    def testAddEdgeAfterFreeze(self):
+        for compact in (True, False):
+            graph = routing.Graph(4, compact = compact)
+            for u, v, w in [(0, 1, 20), (1, 2, 20), (2, 3, 2)]:
+                graph.add_edge(u, v, w)
+            landmarks = graph.build_landmarks(2)
+            hierarchy = routing.ContractionHierarchy.build(graph.freeze())
+            tree = graph.shortest_path_tree(0)
+            self.assertEqual(graph.astar(0, 3, landmarks)[0], 42)
+
+            # the edge replaces the frozen graph, everything built on the old one is refused
+            graph.add_edge(0, 3, 1)
+            with self.assertRaises(ValueError):
+                graph.astar(0, 3, landmarks)
+            with self.assertRaises(ValueError):
+                hierarchy.dijkstra(0, 3)
+            with self.assertRaises(ValueError):
+                tree.distance(3)
+
+            self.assertEqual(graph.astar(0, 3, graph.build_landmarks(2))[0], 1)
+            self.assertEqual(routing.ContractionHierarchy.build(graph.freeze()).dijkstra(0, 3)[0], 1)
+            tree = graph.shortest_path_tree(0)
+            graph.set_weight(0, 3, 50)
+            self.assertEqual(tree.distance(3), 42)
+
+
+def object_graph():
+    """ The example roads of optimalRoute as an object mode Graph with two way roads. """
+    graph = routing.Graph(5)
+    for u, v, w in [(0, 3, 5), (3, 4, 35), (3, 2, 2), (4, 0, 15), (2, 4, 30), (2, 0, 2), (0, 1, 10), (1, 4, 30)]:
+        graph.add_edge(u, v, w, directed = False)
+    return graph
+
+
+class TestDijkstra(unittest.TestCase):
+    """ Testing the path and distance only searches of Graph and RoutePlanner. """
+
+    def testBuildPathBeforeSearch(self):
+        self.assertEqual(object_graph().build_path(3), [3])
+
+    def testDistanceMatchesPath(self):
+        for graph in (object_graph(), object_graph().freeze()):
+            for source in range(5):
+                for destination in range(5):
+                    self.assertEqual(graph.dijkstra_distance(source, destination), graph.dijkstra(source, destination)[0])
+
+    def testUnreachedDestination(self):
+        graph = routing.Graph(3)
+        graph.add_edge(0, 1, 4)
+        self.assertEqual(graph.dijkstra(0, 2), (float('inf'), [2]))
+        self.assertEqual(graph.dijkstra_distance(0, 2), float('inf'))
+
+    def testPriorityQueues(self):
+        graph = grid_graph(8)
+        expected = graph.dijkstra_distance(0, 63)
+        for queue in (routing.LazyHeapQueue, routing.IndexedHeapQueue, routing.BucketQueue, routing.PairingHeapQueue):
+            self.assertEqual(graph.dijkstra_distance(0, 63, queue), expected)
+        with self.assertRaises(TypeError):
+            routing.PriorityQueue(graph)
+
+    def testHierarchyTiesKeepDistance(self):
+        # every road weighs the same, so most queries have several shortest paths and the hierarchy may pick another
+        graph = routing.Graph(36, compact = True)
+        for v in range(36):
+            for u in (v + 1, v + 6):
+                if (u != v + 1 or u % 6 != 0) and u < 36:
+                    graph.add_edge(v, u, 1, directed = False)
+        graph = graph.freeze()
+        hierarchy = routing.ContractionHierarchy.build(graph)
+        for source in range(36):
+            for destination in range(36):
+                distance, path = hierarchy.dijkstra(source, destination)
+                self.assertEqual(distance, graph.dijkstra_distance(source, destination))
+                self.assertEqual((path[0], path[-1], len(path) - 1), (source, destination, distance))
+                for u, v in zip(path, path[1:]):
+                    self.assertIn(abs(u - v), (1, 6))
+
+    def testTravelTimeMatchesRoute(self):
+        roads = [(0, 3, 5, 3), (3, 4, 35, 15), (3, 2, 2, 2), (4, 0, 15, 10), (2, 4, 30, 25), (2, 0, 2, 2), (0, 1, 10, 10), (1, 4, 30, 20)]
+        planner = routing.RoutePlanner(roads, [2, 1])
+        solo = {(u, v): w for u, v, w, _ in roads}
+        carpool = {(u, v): w for u, v, _, w in roads}
+        for start in range(5):
+            for end in range(5):
+                route = planner.route(start, end)
+                # the route may switch to the carpool lane at a passenger, so the cheapest split is the travel time
+                best = min(sum(solo[edge] for edge in zip(route[:i + 1], route[1:i + 1])) +
+                           sum(carpool[edge] for edge in zip(route[i:], route[i + 1:]))
+                           if i == len(route) - 1 or route[i] in (2, 1) else float('inf')
+                           for i in range(len(route)))
+                self.assertEqual(planner.travel_time(start, end), best)
+
+    def testShortestPathsSurviveLaterQueries(self):
+        graph = grid_graph(6)
+        reference = grid_graph(6).dijkstra_many(0, range(36))
+        expected = [reference.path(v) for v in range(36)]
+
+        kept = graph.dijkstra_many(0, range(36))
+        also_kept = graph.dijkstra_many(35, [0])
+        landmarks = routing.Landmarks.build(graph, 2)
+        for source in range(1, 12):
+            graph.dijkstra_many(source, [35 - source])
+            graph.dijkstra(source, 20)
+            graph.bidirectional_dijkstra(source, 30)
+            graph.astar(source, 33, landmarks)
+
+        # the kept results still own their spaces, so the later queries labelled other ones
+        self.assertEqual([kept.path(v) for v in range(36)], expected)
+        self.assertEqual(also_kept.path(0), grid_graph(6).dijkstra(35, 0)[1])
+
+    def testSearchSpacesReused(self):
+        graph = grid_graph(6)
+        kept = graph.dijkstra_many(0, range(36))
+        for source in range(1, 12):
+            graph.dijkstra_many(source, [0])
+            graph.bidirectional_dijkstra(source, 30)
+        # one space stays with the kept result, the queries that were let go share the others
+        self.assertEqual(len(graph.spaces), 3)
+        self.assertFalse(kept.space.is_free())
+
+        space = kept.space
+        del kept
+        self.assertTrue(space.is_free())
+        for source in range(12):
+            graph.dijkstra_many(source, [0])
+        self.assertEqual(len(graph.spaces), 3)
+
+    def testRouteBatchWorkers(self):
+        roads = [(0, 3, 5, 3), (3, 4, 35, 15), (3, 2, 2, 2), (4, 0, 15, 10), (2, 4, 30, 25), (2, 0, 2, 2), (0, 1, 10, 10), (1, 4, 30, 20), (5, 0, 4, 4)]
+        planner = routing.RoutePlanner(roads, [2, 1])
+        queries = [(start, end) for start in range(6) for end in range(6)]
+        expected = [planner.route(start, end) for start, end in queries]
+        self.assertEqual(planner.route_batch(queries, workers = 2, chunksize = 5), expected)
+        # the workers attach to the hierarchy in shared memory as well, its routes may differ from dijkstra on ties
+        planner.build_hierarchy()
+        self.assertEqual(planner.route_batch(queries, workers = 2, chunksize = 5), [planner.route(start, end) for start, end in queries])
+
+
+class TestRoadFiles(unittest.TestCase):
+    """ Testing the binary road records of write_roads_binary. """
+
+    roads = [(0, 3, 5, 3), (3, 4, 35, 15), (3, 2, 2, 2), (4, 0, 15, 10), (2, 4, 30, 25), (2, 0, 2, 2), (0, 1, 10, 10), (1, 4, 30, 20)]
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "roads.bin")
+
+    def testTypecodeLoadsSameRoutes(self):
+        planner = routing.RoutePlanner(self.roads, [2, 1])
+        for typecode in ('q', 'i'):
+            routing.write_roads_binary(self.path, self.roads, typecode)
+            loaded = routing.RoutePlanner.from_file(self.path, [2, 1], chunk_size = 3, typecode = typecode)
+            for start in range(5):
+                for end in range(5):
+                    self.assertEqual(loaded.route(start, end), planner.route(start, end))
+
+    def testClosedEarly(self):
+        routing.write_roads_binary(self.path, self.roads)
+        chunks = routing.stream_roads_binary(self.path, chunk_size = 2)
+        a, b, c, d = next(chunks)
+        self.assertEqual(list(zip(a, b, c, d)), self.roads[:2])
+        # closing the generator must release every view of the mapping before it is closed
+        chunks.close()
+
+
+def random_matrix(rng, max_rows = 5, max_columns = 4):
+    """ A small occupancy matrix, with few distinct values at times so many plans tie. """
+    top = rng.choice([2, 5, 50])
+    columns = rng.randint(1, max_columns)
+    return [[rng.randint(1, top) for _ in range(columns)] for _ in range(rng.randint(1, max_rows))]
+
+
+def brute_force_plans(matrix, width = 1, forbidden = ()):
+    """ The column choices of every plan, with the total occupancy first, in order of total occupancy. """
+    plans = []
+    for columns in itertools.product(range(len(matrix[0])), repeat = len(matrix)):
+        if any(cell in forbidden for cell in enumerate(columns)):
+            continue
+        if any(abs(a - b) > width for a, b in zip(columns, columns[1:])):
+            continue
+        plans.append((sum(matrix[i][j] for i, j in enumerate(columns)), columns))
+    return sorted(plans)
+
+
+class TestSelectSections(unittest.TestCase):
+    """ Testing the variants of select_sections against brute force and against each other. """
+
+    def testTopKMatchesBruteForce(self):
+        for seed in range(300):
+            rng = random.Random(seed)
+            matrix = random_matrix(rng)
+            n, m = len(matrix), len(matrix[0])
+            width = rng.choice([0, 1, 2])
+            forbidden = {(rng.randrange(n), rng.randrange(m)) for _ in range(rng.randint(0, 3))} if seed % 2 else set()
+            everything = brute_force_plans(matrix, width, forbidden)
+            # k goes past the number of plans at times, then every plan is returned
+            k = rng.randint(1, 2 * len(everything) + 1)
+
+            plans = routing.select_sections_top_k(matrix, k, width, forbidden)
+            self.assertEqual([total for total, _ in plans], [total for total, _ in everything[:k]])
+            seen = set()
+            for total, sections in plans:
+                self.assertEqual([i for i, _ in sections], list(range(n)))
+                columns = tuple(j for _, j in sections)
+                self.assertIn((total, columns), everything)
+                self.assertNotIn(columns, seen)
+                seen.add(columns)
+            if width == 1 and not forbidden:
+                self.assertEqual(plans[0], routing.select_sections(matrix))
+
+    def testSolverUpdatesMatchFreshSolve(self):
+        for seed in range(100):
+            rng = random.Random(seed)
+            matrix = random_matrix(rng)
+            n, m = len(matrix), len(matrix[0])
+            solver = routing.SectionsSolver(matrix)
+            self.assertEqual(solver.solve(), routing.select_sections(matrix))
+
+            for _ in range(10):
+                i, j = rng.randrange(n), rng.randrange(m)
+                matrix[i][j] = rng.randint(1, 50)
+                solver.update(i, j, matrix[i][j])
+                self.assertEqual(solver.solve(), routing.select_sections(matrix))
+
+                plans = brute_force_plans(matrix)
+                for a in range(n):
+                    for b in range(m):
+                        self.assertEqual(solver.best_through(a, b), min(total for total, columns in plans if columns[a] == b))
+
+    def testStreamMatchesSelectSections(self):
+        for seed in range(200):
+            rng = random.Random(seed)
+            # 1 to 9 columns, so the last byte of packed parents is often only partly used
+            matrix = random_matrix(rng, max_rows = 30, max_columns = 9)
+            expected = routing.select_sections(matrix)
+            self.assertEqual(routing.select_sections_stream(iter(matrix)), expected)
+            self.assertEqual(routing.select_sections_stream((row for row in matrix), cost_only = True), expected[0])
+
+    def testStreamRejectsBadRows(self):
+        with self.assertRaises(ValueError):
+            routing.select_sections_stream(iter([[1, 2, 3], [4, 5, 6], [7, 8]]))
+        with self.assertRaises(ValueError):
+            routing.select_sections_stream(iter([]))
+
+    def testHirschbergMatchesSelectSections(self):
+        for seed in range(200):
+            rng = random.Random(seed)
+            matrix = random_matrix(rng, max_rows = 40, max_columns = 6)
+            expected = routing.select_sections(matrix)
+            for base_rows in (1, 2, 5, 64):
+                self.assertEqual(routing.select_sections_hirschberg(matrix, base_rows = base_rows), expected)
+
+    def testHirschbergWorkers(self):
+        rng = random.Random(0)
+        for rows, columns in ((97, 5), (40, 1), (3, 4)):
+            matrix = [[rng.randint(1, 3) for _ in range(columns)] for _ in range(rows)]
+            self.assertEqual(routing.select_sections_hirschberg(matrix, workers = 2, base_rows = 2), routing.select_sections(matrix))
+
+    def testTopKWithoutPlans(self):
+        self.assertEqual(routing.select_sections_top_k([[1, 2], [3, 4]], 5, 1, {(1, 0), (1, 1)}), [])
+        self.assertEqual(routing.select_sections_top_k([[1, 2], [3, 4]], 0), [])
+
+
+@unittest.skipIf(routing.np is None, "numpy is not installed")
+class TestTravelTimes(unittest.TestCase):
+    """ Testing the travel time matrices of RoutePlanner against single queries. """
+
+    # location 5 can leave but never be reached, and 6 is only reached through the carpool lane of 5
+    roads = [(0, 3, 5, 3), (3, 4, 35, 15), (3, 2, 2, 2), (4, 0, 15, 10), (2, 4, 30, 25), (2, 0, 2, 2), (0, 1, 10, 10),
+             (1, 4, 30, 20), (5, 0, 4, 4), (1, 6, 40, 1)]
+    passengers = [2, 1]
+
+    def setUp(self):
+        self.planner = routing.RoutePlanner(self.roads, self.passengers)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def expected(self, mode, origins, destinations):
+        if mode == "carpool":
+            return [[self.planner.travel_time(o, d) for d in destinations] for o in origins]
+        return [[self.planner.graph.dijkstra_distance(o, d) for d in destinations] for o in origins]
+
+    def testModes(self):
+        origins = [5, 0, 3, 6, 1]
+        destinations = [6, 5, 0, 4]
+        # the default dense_limit picks floyd_warshall for this graph, 0 always runs the searches
+        options = [(dict(workers = 1), 1), (dict(workers = 1, dense_limit = 0), 0), (dict(workers = 2, dense_limit = 0, chunksize = 2), 0)]
+        for mode in ("carpool", "solo"):
+            expected = self.expected(mode, origins, destinations)
+            self.assertIn(float('inf'), expected[1])
+            for i, (kwargs, dense) in enumerate(options):
+                with mock.patch.object(routing, "floyd_warshall", wraps = routing.floyd_warshall) as floyd_warshall:
+                    matrix = self.planner.travel_times(origins, destinations, mode, **kwargs)
+                self.assertEqual(floyd_warshall.call_count, dense)
+                self.assertEqual(matrix.tolist(), expected)
+
+                path = os.path.join(self.directory, f"{mode}{i}.dat")
+                matrix = self.planner.travel_times(origins, destinations, mode, path = path, **kwargs)
+                self.assertIsInstance(matrix, routing.np.memmap)
+                stored = routing.np.memmap(path, dtype = routing.np.float64, mode = "r", shape = matrix.shape)
+                self.assertEqual(stored.tolist(), expected)
+
+    def testFloydWarshall(self):
+        distances = routing.floyd_warshall(self.planner.graph)
+        for source in range(self.planner.graph.num_vertices):
+            self.assertEqual(distances[source].tolist(), self.planner.graph.dijkstra_many(source, []).all_distances())
+
+    def testDefaultsAndErrors(self):
+        matrix = self.planner.travel_times(workers = 1)
+        self.assertEqual(matrix.tolist(), self.expected("carpool", range(7), range(7)))
+        self.assertEqual(self.planner.travel_times([], [0], workers = 1).shape, (0, 1))
+        with self.assertRaises(ValueError):
+            self.planner.travel_times(mode = "bus")
+
+
+@unittest.skipIf(routing.np is None, "numpy is not installed")
+class TestSelectSectionsNumpy(unittest.TestCase):
+    """ Testing the NumPy versions of select_sections. """
+
+    def testSmallIntegerTypesDoNotOverflow(self):
+        matrix = routing.np.full((4, 3), 200, routing.np.uint8)
+        expected = routing.select_sections(matrix.tolist())
+        self.assertEqual(expected[0], 800)
+        self.assertEqual(routing.select_sections_numpy(matrix), expected)
+        self.assertEqual(routing.select_sections_stacked(routing.np.stack([matrix, matrix.astype(routing.np.int16)])), [expected, expected])
+
+    def testBatchMatchesSelectSections(self):
+        matrices = [routing.np.full((5, 2), 100, routing.np.int8), routing.np.full((5, 2), 100, routing.np.int8), [[3, 1], [2, 4], [5, 1]]]
+        results = routing.select_sections_batch(matrices, workers = 1)
+        for matrix, (result, _) in zip(matrices, results):
+            self.assertEqual(result, routing.select_sections(routing.np.asarray(matrix).tolist()))
+
+
+    def testBatchWorkersKeepOrder(self):
+        rng = random.Random(0)
+        # two stacked shapes interleaved with odd shapes, which go to the process pool
+        shapes = [(6, 3), (4, 2), (6, 3), (7, 5), (4, 2), (3, 1), (6, 3), (9, 4)]
+        matrices = [[[rng.randint(1, 9) for _ in range(columns)] for _ in range(rows)] for rows, columns in shapes]
+        serial = [result for result, _ in routing.select_sections_batch(matrices, workers = 1)]
+        self.assertEqual(serial, [routing.select_sections(matrix) for matrix in matrices])
+        self.assertEqual([result for result, _ in routing.select_sections_batch(matrices, workers = 2)], serial)
+
+if __name__ == "__main__":
+    unittest.main()